@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +43,7 @@ INSTALLED_APPS = [
     "quiz",
 ]
 MIDDLEWARE = [
+    "quiz.middleware.ProfilingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -58,6 +60,23 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [],
     "DEFAULT_PERMISSION_CLASSES": [],
 }
+# Per-request SQL/timing instrumentation (Server-Timing header + /api/metrics/)
+QUIZ_PROFILING = False
+# Serialized question/attempt payloads (ETag/304) live in the "default" cache,
+# an in-process LocMemCache unless CACHES says otherwise, so cached reads never
+# touch the database. When running more than one worker, point CACHES at a
+# shared backend (Redis, memcached) so attempt invalidations reach every
+# process (manage.py check --deploy warns with quiz.W001).
+QUIZ_CACHE_ALIAS = "default"
+QUIZ_QUESTION_CACHE_SIZE = 1000  # per-process LRU fallback
+QUIZ_QUESTION_CACHE_TIMEOUT = 3600
+# Seconds a process trusts the bank version it last read before asking the
+# database again (ETag checks skip SQL; other workers' edits show up after this)
+QUIZ_BANK_VERSION_TTL = 1.0
+# Seconds a started attempt stays open for submission (None: forever)
+QUIZ_ATTEMPT_TTL = 24 * 3600
+# Serve the play/attempt endpoints from quiz.async_views (run under ASGI)
+QUIZ_ASYNC_VIEWS = os.environ.get("QUIZ_ASYNC_VIEWS") == "1"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
@@ -88,6 +107,13 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Concurrent workers (gunicorn/uvicorn): take the write lock up
+        # front and wait for it, instead of failing with "database is locked".
+        "OPTIONS": {
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 20,
+            "init_command": "PRAGMA journal_mode=WAL;",
+        },
     }
 }
 
@@ -1,5 +1,5 @@
 import { api } from "./client";
-import { Attempt, AttemptPayload, Question, QuestionPayload } from "../types";
+import { Attempt, AttemptPayload, AttemptSummary, CursorPage, Question, QuestionPayload } from "../types";
 
 export async function startPlay(player_uuid: string) {
   const { data } = await api.post<Attempt>("/play/start/", { player_uuid });
@@ -17,8 +17,13 @@ export async function submitPlay(attempt_id: number, answers: AttemptPayload["an
   return data;
 }
 
-export async function listAttempts(player_uuid: string) {
-  const { data } = await api.get<Attempt[]>(`/attempts/`, { params: { player_uuid } });
+// pass the previous page's `next` link to continue from where it stopped
+export async function listAttempts(player_uuid: string, next?: string | null) {
+  const { data } = next
+    ? await api.get<CursorPage<AttemptSummary>>(next)
+    : await api.get<CursorPage<AttemptSummary>>(`/attempts/`, {
+        params: { player_uuid, view: "summary" }
+      });
   return data;
 }
 
@@ -44,7 +49,8 @@ export async function getQuestion(id: number) {
 }
 
 export async function updateQuestion(id: number, payload: QuestionPayload) {
-  // use PUT to replace choices cleanly (serializer re-creates them)
+  // PUT the full choices array: the server keeps choices by id, adds those
+  // without one and removes any left out
   const { data } = await api.put<Question>(`/questions/${id}/`, payload);
   return data;
 }
@@ -25,7 +25,7 @@ export default function AttemptDetail() {
             <div>Your answer:
               {aq.qtype === "text" && <pre>{aq.text_response ?? "—"}</pre>}
               {aq.qtype === "numeric" && <pre>{aq.numeric_response ?? "—"}</pre>}
-              {aq.qtype === "image" && (aq.image ? <div><img src={aq.image} style={{ maxWidth: 240 }} /></div> : "—")}
+              {aq.qtype === "image" && (aq.image_status === "pending" ? <div>Processing image…</div> : aq.image ? <div><img src={aq.image} style={{ maxWidth: 240 }} /></div> : "—")}
               {(aq.qtype === "single" || aq.qtype === "multiple") && (
                 <pre>{JSON.stringify(aq.selected_choice_ids || [])}</pre>
               )}
@@ -1,18 +1,29 @@
 import { useEffect, useState } from "react";
 import { listAttempts } from "../api/quiz";
-import { Attempt } from "../types";
+import { AttemptSummary } from "../types";
 import { Link } from "react-router-dom";
 import { usePlayer } from "../store/usePlayer";
 
 export default function Attempts() {
   const ensure = usePlayer((s) => s.ensure);
-  const [items, setItems] = useState<Attempt[]>([]);
+  const [items, setItems] = useState<AttemptSummary[]>([]);
+  const [next, setNext] = useState<string | null>(null);
 
   useEffect(() => {
     const player_uuid = ensure();
-    listAttempts(player_uuid).then(setItems);
+    listAttempts(player_uuid).then((page) => {
+      setItems(page.results);
+      setNext(page.next);
+    });
   }, [ensure]);
 
+  const loadMore = () => {
+    listAttempts(ensure(), next).then((page) => {
+      setItems((prev) => [...prev, ...page.results]);
+      setNext(page.next);
+    });
+  };
+
   return (
     <div>
       <h2>My Attempts</h2>
@@ -24,6 +35,7 @@ export default function Attempts() {
           </li>
         ))}
       </ul>
+      {next && <button onClick={loadMore}>Load more</button>}
     </div>
   );
 }
@@ -30,6 +30,7 @@ export interface AttemptQuestion {
   text_response?: string | null;
   numeric_response?: number | null;
   image?: string | null;
+  image_status?: "" | "pending" | "ready" | "invalid";
   is_correct: boolean;
   correct_choice_ids: number[];
   choices?: { id: number; text: string; is_correct: boolean }[]; // <— add this
@@ -41,9 +42,18 @@ export interface Attempt {
   created_at: string;
   score: number;
   total: number;
+  status: "started" | "submitted" | "expired";
+  submitted_at: string | null;
   attempt_questions: AttemptQuestion[];
 }
 
+export type AttemptSummary = Pick<Attempt, "id" | "created_at" | "score" | "total">;
+
+export interface CursorPage<T> {
+  next: string | null;
+  results: T[];
+}
+
 export interface AttemptPayload {
   answers: {
     [attemptQuestionId: string]: {
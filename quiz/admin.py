@@ -1,42 +1,125 @@
 # quiz/admin.py
 
-import csv
-import io
 import json
 
 from django import forms
 from django.contrib import admin
-from django.http import HttpRequest, HttpResponse
+from django.db.models import Count, F, FloatField, OuterRef, Q, Subquery
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.http import HttpRequest, StreamingHttpResponse
+from django.templatetags.static import static
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
-from .models import (Attempt, AttemptQuestion, Category, Choice, Player,
-                     Question)
+from . import search
+from .export import FORMATS, stream_export
+from .models import (
+    Attempt,
+    AttemptQuestion,
+    Category,
+    CategoryStats,
+    Choice,
+    ImageBlob,
+    Player,
+    PlayerStats,
+    Question,
+)
+from .pagination import EstimatedCountPaginator
+from .thumbnails import thumbnails
 
 # ---------- Common admin action ----------
 
 
-def export_as_csv(modeladmin, request: HttpRequest, queryset):
-    meta = modeladmin.model._meta
-    field_names = [f.name for f in meta.fields]
-    buf = io.StringIO()
-    writer = csv.writer(buf)
-    writer.writerow(field_names)
-    for obj in queryset:
-        writer.writerow([getattr(obj, f, "") for f in field_names])
-    resp = HttpResponse(buf.getvalue(), content_type="text/csv")
-    resp["Content-Disposition"] = f'attachment; filename="{meta.model_name}.csv"'
-    return resp
+def _export_action(fmt: str, label: str):
+    spec = FORMATS[fmt]
 
+    def action(modeladmin, request: HttpRequest, queryset):
+        # streamed straight from a DB cursor: memory stays flat
+        resp = StreamingHttpResponse(
+            stream_export(queryset, fmt), content_type=spec.content_type
+        )
+        name = modeladmin.model._meta.model_name
+        resp["Content-Disposition"] = f'attachment; filename="{name}.{spec.extension}"'
+        return resp
 
-export_as_csv.short_description = _("Export selected as CSV")
+    action.__name__ = f"export_as_{fmt.replace('.', '_')}"
+    action.short_description = label
+    return action
+
+
+export_as_csv = _export_action("csv", _("Export selected as CSV"))
+export_as_csv_gz = _export_action("csv.gz", _("Export selected as CSV (gzip)"))
+export_as_jsonl = _export_action("jsonl", _("Export selected as JSON Lines"))
+
+
+def thumbnail_html(obj: AttemptQuestion, style: str):
+    """Thumbnail linking to the original; a placeholder while it is built."""
+    if not obj.image:
+        return "-"
+    src = None
+    if obj.image_status != AttemptQuestion.IMAGE_PENDING:
+        src = thumbnails.url(obj.image.name)
+    src = src or static("quiz/thumb-placeholder.svg")
+    return format_html(
+        '<a href="{}"><img src="{}" style="{}" loading="lazy" /></a>',
+        obj.image.url,
+        src,
+        style,
+    )
+
+
+def ratio(numerator: str, denominator: str):
+    """``numerator / denominator`` as a float; NULL when the denominator is 0."""
+    return Cast(numerator, FloatField()) / NullIf(F(denominator), 0)
+
+
+def related_count(model, field: str, **filters):
+    """Correlated ``COUNT(*)`` of ``model`` rows whose ``field`` is the outer row.
+
+    A subquery per row of the page (an index lookup on the FK) instead of a
+    join + GROUP BY over the whole table; sortable like any other column.
+    """
+    rows = (
+        model.objects.filter(**{field: OuterRef("pk")}, **filters)
+        .order_by()
+        .values(field)
+        .annotate(n=Count("*"))
+        .values("n")
+    )
+    return Coalesce(Subquery(rows), 0)
 
 
 class SmartAdmin(admin.ModelAdmin):
     list_per_page = 50
     save_on_top = True
-    actions = [export_as_csv]
+    actions = [export_as_csv, export_as_csv_gz, export_as_jsonl]
     list_display_links = ("id",)
+    paginator = EstimatedCountPaginator
+    # "N of M selected" needs a second, unfiltered COUNT(*)
+    show_full_result_count = False
+    # name -> expression, added to the changelist queryset so computed
+    # columns cost no extra queries and can be sorted on
+    list_annotations = {}
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if self.list_annotations:
+            qs = qs.annotate(**self.list_annotations)
+        return qs
+
+    def full_text_filter(self, term: str):
+        """Q for ``term`` from the full-text index, or None to use LIKE."""
+        return None
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        condition = self.full_text_filter(term) if term else None
+        if condition is None:
+            return super().get_search_results(request, queryset, search_term)
+        if term.isdigit():
+            condition |= Q(pk=int(term))
+        # pk IN (subquery): no joins, so no duplicate rows to remove
+        return queryset.filter(condition), False
 
 
 # ---------- Inlines ----------
@@ -56,12 +139,7 @@ class AttemptQuestionInline(admin.TabularInline):
     raw_id_fields = ("question",)
 
     def image_thumb(self, obj: AttemptQuestion):
-        if obj.image:
-            return format_html(
-                '<img src="{}" style="max-height:80px;max-width:120px;" />',
-                obj.image.url,
-            )
-        return "-"
+        return thumbnail_html(obj, "max-height:80px;max-width:120px;")
 
     image_thumb.short_description = "Image"
 
@@ -113,6 +191,8 @@ class AttemptQuestionForm(forms.ModelForm):
             )
         if "correct_choice_ids" in self.fields:
             self.fields["correct_choice_ids"].widget = forms.Textarea(attrs={"rows": 4})
+        if "choices" in self.fields:
+            self.fields["choices"].widget = forms.Textarea(attrs={"rows": 4})
 
 
 # ---------- Admin registrations ----------
@@ -122,18 +202,20 @@ class AttemptQuestionForm(forms.ModelForm):
 class CategoryAdmin(SmartAdmin):
     list_display = ("id", "name", "question_count")
     search_fields = ("name",)
+    list_annotations = {"question_count": related_count(Question, "category")}
 
     def question_count(self, obj: Category) -> int:
-        # default reverse name since Question.category has no related_name
-        return obj.question_set.count()
+        return obj.question_count
 
     question_count.short_description = "Questions"
+    question_count.admin_order_field = "question_count"
 
 
 @admin.register(Question)
 class QuestionAdmin(SmartAdmin):
     inlines = [ChoiceInline]
     raw_id_fields = ("category",)
+    list_select_related = ("category",)
 
     def prompt_short(self, obj: Question) -> str:
         s = obj.prompt or ""
@@ -148,14 +230,47 @@ class QuestionAdmin(SmartAdmin):
         "difficulty",
         "category",
         "image_required",
+        "served",
+        "correct_rate",
+        "avg_response_length",
     )
     list_filter = ("qtype", "difficulty", "category", "image_required")
     search_fields = ("id", "prompt", "choices__text")
+    # one LEFT JOIN to QuestionStats; questions never served show "—"
+    list_annotations = {
+        "served": F("stats__served"),
+        "correct_rate": ratio("stats__correct", "stats__answered"),
+        "avg_response_length": ratio("stats__response_chars", "stats__responses"),
+    }
+
+    def served(self, obj: Question):
+        return obj.served or 0
+
+    served.short_description = "Served"
+    served.admin_order_field = "served"
+
+    def correct_rate(self, obj: Question) -> str:
+        return "—" if obj.correct_rate is None else f"{obj.correct_rate:.0%}"
+
+    correct_rate.short_description = "Correct rate"
+    correct_rate.admin_order_field = "correct_rate"
+
+    def avg_response_length(self, obj: Question) -> str:
+        value = obj.avg_response_length
+        return "—" if value is None else f"{value:.1f}"
+
+    avg_response_length.short_description = "Avg. response"
+    avg_response_length.admin_order_field = "avg_response_length"
+
+    def full_text_filter(self, term: str):
+        questions = search.matching(search.QUESTIONS, term)
+        return None if questions is None else Q(pk__in=questions)
 
 
 @admin.register(Choice)
 class ChoiceAdmin(SmartAdmin):
     raw_id_fields = ("question",)
+    list_select_related = ("question",)
     list_display_links = ("id", "question")  # allow jumping into question
     list_display = ("id", "question", "text", "is_correct")
     list_filter = (
@@ -172,34 +287,42 @@ class ChoiceAdmin(SmartAdmin):
 class PlayerAdmin(SmartAdmin):
     list_display = ("id", "player_uuid", "attempts_count")
     search_fields = ("player_uuid",)
+    list_annotations = {"attempts_count": related_count(Attempt, "player")}
 
     def attempts_count(self, obj: Player) -> int:
-        return obj.attempts.count()
+        return obj.attempts_count
 
     attempts_count.short_description = "Attempts"
+    attempts_count.admin_order_field = "attempts_count"
 
 
 @admin.register(Attempt)
 class AttemptAdmin(SmartAdmin):
     inlines = [AttemptQuestionInline]
     raw_id_fields = ("player",)
+    list_select_related = ("player",)
     list_display = ("id", "player", "created_at", "score", "total", "correct_ratio")
     list_filter = ("created_at",)
     search_fields = ("id", "player__player_uuid")
+    list_annotations = {
+        "correct_count": related_count(AttemptQuestion, "attempt", is_correct=True)
+    }
 
     def correct_ratio(self, obj: Attempt) -> str:
         total = obj.total or 0
-        correct = obj.attempt_questions.filter(is_correct=True).count()
+        correct = obj.correct_count
         pct = f"{(correct / total * 100):.0f}%" if total else "—"
         return f"{correct}/{total} ({pct})"
 
     correct_ratio.short_description = "Correct"
+    correct_ratio.admin_order_field = "correct_count"
 
 
 @admin.register(AttemptQuestion)
 class AttemptQuestionAdmin(SmartAdmin):
     form = AttemptQuestionForm
     raw_id_fields = ("attempt", "question")
+    list_select_related = ("attempt", "question")
     list_display_links = ("id", "attempt")
     list_display = (
         "id",
@@ -217,6 +340,17 @@ class AttemptQuestionAdmin(SmartAdmin):
     list_filter = ("qtype", "is_correct")
     search_fields = ("id", "attempt__id", "question__prompt", "text_response")
 
+    def full_text_filter(self, term: str):
+        answers = search.matching(search.ANSWERS, term)
+        if answers is None:
+            return None
+        condition = Q(pk__in=answers) | Q(
+            question_id__in=search.matching(search.QUESTIONS, term)
+        )
+        if term.isdigit():
+            condition |= Q(attempt_id=int(term))
+        return condition
+
     def text_resp_short(self, obj: AttemptQuestion) -> str:
         s = obj.text_response or ""
         return (s[:60] + "…") if len(s) > 60 else s
@@ -240,11 +374,56 @@ class AttemptQuestionAdmin(SmartAdmin):
     correct_preview.short_description = "Correct IDs"
 
     def image_thumb(self, obj: AttemptQuestion):
-        if obj.image:
-            return format_html(
-                '<img src="{}" style="max-height:70px;max-width:110px;" />',
-                obj.image.url,
-            )
-        return "-"
+        return thumbnail_html(obj, "max-height:70px;max-width:110px;")
 
     image_thumb.short_description = "Image"
+
+
+@admin.register(ImageBlob)
+class ImageBlobAdmin(SmartAdmin):
+    # refcounts are maintained by the play flow and signals, never by hand
+    list_display = ("id", "name", "refs", "created_at")
+    search_fields = ("name",)
+    readonly_fields = ("name", "refs", "created_at")
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(PlayerStats)
+class PlayerStatsAdmin(SmartAdmin):
+    # maintained by each submit; `manage.py rebuild_leaderboard` recomputes
+    list_display = (
+        "player",
+        "best_score",
+        "attempts",
+        "correct",
+        "answered",
+        "last_played_at",
+    )
+    list_display_links = ("player",)
+    list_select_related = ("player",)
+    search_fields = ("player__player_uuid",)
+    readonly_fields = list_display
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(CategoryStats)
+class CategoryStatsAdmin(SmartAdmin):
+    list_display = (
+        "id",
+        "player",
+        "category",
+        "correct",
+        "answered",
+        "last_played_at",
+    )
+    list_filter = ("category",)
+    list_select_related = ("player", "category")
+    search_fields = ("player__player_uuid",)
+    readonly_fields = list_display[1:]
+
+    def has_add_permission(self, request):
+        return False
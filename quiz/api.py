@@ -1,8 +1,18 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from .views import (AttemptDetailView, AttemptsView, PlayStartView,
-                    PlaySubmitView, QuestionViewSet)
+from .views import LeaderboardView, PlayerRankView, ProfilingStatsView, QuestionViewSet
+
+if getattr(settings, "QUIZ_ASYNC_VIEWS", False):
+    from .async_views import (
+        AttemptDetailView,
+        AttemptsView,
+        PlayStartView,
+        PlaySubmitView,
+    )
+else:
+    from .views import AttemptDetailView, AttemptsView, PlayStartView, PlaySubmitView
 
 router = DefaultRouter()
 router.register(r"questions", QuestionViewSet, basename="question")
@@ -12,5 +22,12 @@ urlpatterns = [
     path("play/submit/<int:attempt_id>/", PlaySubmitView.as_view(), name="play-submit"),
     path("attempts/", AttemptsView.as_view(), name="attempts"),
     path("attempts/<int:pk>/", AttemptDetailView.as_view(), name="attempt-detail"),
+    path("leaderboard/", LeaderboardView.as_view(), name="leaderboard"),
+    path(
+        "leaderboard/players/<uuid:player_uuid>/",
+        PlayerRankView.as_view(),
+        name="leaderboard-player",
+    ),
+    path("metrics/", ProfilingStatsView.as_view(), name="metrics"),
 ]
 urlpatterns += router.urls
@@ -0,0 +1,244 @@
+# quiz/async_views.py
+"""Native async versions of the play views, for ASGI deployments.
+
+Enabled with ``QUIZ_ASYNC_VIEWS`` (see ``quiz/api.py``). They answer with the
+same JSON, status codes and headers as their DRF twins in ``quiz/views.py``
+but talk to the database through Django's async ORM, so a request is not
+parked on a worker thread for its whole lifetime.
+"""
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import HttpResponseNotModified, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+
+from . import stats
+from .cache import attempt_cache, attempt_key, etag_matches
+from .grading import agrade_attempt, is_expired
+from .models import Attempt, AttemptQuestion, Player
+from .pagination import AttemptCursorPagination
+from .play import (
+    IMMUTABLE,
+    adraw_questions,
+    apply_answer,
+    closed_attempt_error,
+    discard_answer_image,
+    is_frozen,
+    new_attempt_questions,
+    parse_answers,
+    parse_strata,
+    prime_attempt_questions,
+    store_answer_image,
+    submitted_entry,
+    with_attempt_questions,
+)
+from .serializers import AttemptSerializer, AttemptSummarySerializer
+
+# --- Helpers ------------------------------------------------------------
+
+ATTEMPT_NOT_FOUND = {"detail": "No Attempt matches the given query."}
+
+
+def _json(data, status=200, headers=None) -> JsonResponse:
+    # compact UTF-8, as DRF's JSONRenderer writes it
+    return JsonResponse(
+        data,
+        status=status,
+        headers=headers,
+        safe=False,
+        json_dumps_params={"ensure_ascii": False, "separators": (",", ":")},
+    )
+
+
+def _request_data(request):
+    """The request body parsed the way DRF's ``request.data`` would be.
+
+    Raises ValueError for a malformed JSON body.
+    """
+    if request.content_type == "application/json":
+        return json.loads(request.body or b"{}")
+    data = request.POST.copy()
+    data.update(request.FILES)
+    return data
+
+
+def _closed_attempt_response(attempt: Attempt) -> JsonResponse:
+    body, code = closed_attempt_error(attempt)
+    return _json(body, status=code)
+
+
+async def _cache_submitted_attempt(attempt: Attempt, data) -> tuple:
+    entry = submitted_entry(attempt, data)
+    await attempt_cache.aset(attempt_key(attempt.pk), entry)
+    return entry
+
+
+async def _upsert_player(player_uuid) -> Player:
+    try:
+        return await Player.objects.aget(player_uuid=player_uuid)
+    except Player.DoesNotExist:
+        await Player.objects.abulk_create(
+            [Player(player_uuid=player_uuid)], ignore_conflicts=True
+        )
+        return await Player.objects.aget(player_uuid=player_uuid)
+
+
+@method_decorator(csrf_exempt, name="dispatch")  # as DRF's APIView
+class AsyncAPIView(View):
+    pass
+
+
+# --- Views --------------------------------------------------------------
+
+
+class PlayStartView(AsyncAPIView):
+    """Start a quiz attempt for a given player_uuid."""
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            data = _request_data(request)
+        except ValueError as exc:
+            return _json({"detail": f"JSON parse error - {exc}"}, status=400)
+        player_uuid = data.get("player_uuid") if isinstance(data, dict) else None
+        if not player_uuid:
+            return _json({"error": "player_uuid is required"}, status=400)
+
+        try:
+            strata = parse_strata(data)
+        except ValueError as exc:
+            return _json({"error": str(exc)}, status=400)
+
+        try:
+            selected = await adraw_questions(strata)
+        except ValueError:
+            return _json({"error": "Not enough questions in bank"}, status=400)
+
+        player = await _upsert_player(player_uuid)
+
+        # There are no async transactions, so instead of atomic() a failed
+        # insert of the questions removes the half-built attempt by hand.
+        attempt = await Attempt.objects.acreate(player=player, total=len(selected))
+        try:
+            aqs = await AttemptQuestion.objects.abulk_create(
+                new_attempt_questions(attempt, selected)
+            )
+            await stats.arecord_served([q.pk for q in selected])
+        except Exception:
+            await attempt.adelete()
+            raise
+
+        prime_attempt_questions(attempt, aqs)
+        return _json(AttemptSerializer(attempt).data, status=201)
+
+
+class PlaySubmitView(AsyncAPIView):
+    async def post(self, request, attempt_id, *args, **kwargs):
+        try:
+            attempt = await Attempt.objects.select_related("player").aget(id=attempt_id)
+        except Attempt.DoesNotExist:
+            return _json(ATTEMPT_NOT_FOUND, status=404)
+        if attempt.status == Attempt.STARTED and is_expired(attempt):
+            await Attempt.objects.filter(pk=attempt.pk, status=Attempt.STARTED).aupdate(
+                status=Attempt.EXPIRED
+            )
+            attempt.status = Attempt.EXPIRED
+        if attempt.status != Attempt.STARTED:
+            return _closed_attempt_response(attempt)
+
+        try:
+            data = _request_data(request)
+        except ValueError as exc:
+            return _json({"detail": f"JSON parse error - {exc}"}, status=400)
+        answers = parse_answers(data, request.FILES) or {}
+        answers = answers.get("answers", {})
+
+        image_name = None
+        if "image" in request.FILES:
+            image_name = await sync_to_async(store_answer_image)(request.FILES["image"])
+
+        try:
+            aqs = [
+                aq async for aq in attempt.attempt_questions.select_related("question")
+            ]
+            for aq in aqs:
+                payload = answers.get(str(aq.id)) or answers.get(aq.id) or {}
+                apply_answer(aq, payload, image_name)
+            claimed = await agrade_attempt(attempt, aqs)
+        except BaseException:
+            await sync_to_async(discard_answer_image)(image_name)
+            raise
+        if not claimed:
+            await sync_to_async(discard_answer_image)(image_name)
+            await attempt.arefresh_from_db(fields=["status"])
+            return _closed_attempt_response(attempt)
+
+        prime_attempt_questions(attempt, aqs)
+        data = AttemptSerializer(attempt).data
+        if is_frozen(attempt):
+            await _cache_submitted_attempt(attempt, data)
+        return _json(data)
+
+
+class AttemptsView(AsyncAPIView):
+    """Attempts for a player; ``?view=summary`` drops the nested questions."""
+
+    async def get(self, request, *args, **kwargs):
+        request = Request(request)  # query_params and absolute URIs
+        summary = request.query_params.get("view") == "summary"
+        qs = Attempt.objects.none()
+        player_uuid = request.query_params.get("player_uuid")
+        if player_uuid:
+            try:
+                player_id = await Player.objects.values_list("id", flat=True).aget(
+                    player_uuid=player_uuid
+                )
+            except (Player.DoesNotExist, ValidationError):
+                pass
+            else:
+                qs = Attempt.objects.filter(player_id=player_id)
+                qs = (
+                    qs.only("id", "created_at", "score", "total")
+                    if summary
+                    else with_attempt_questions(qs)
+                )
+
+        paginator = AttemptCursorPagination()
+        try:
+            rows = await paginator.apaginate_queryset(qs, request)
+        except NotFound as exc:
+            return _json({"detail": exc.detail}, status=404)
+        serializer_class = AttemptSummarySerializer if summary else AttemptSerializer
+        results = serializer_class(rows, many=True, context={"request": request})
+        return _json({"next": paginator.get_next_link(), "results": results.data})
+
+
+class AttemptDetailView(AsyncAPIView):
+    """Attempt review; submitted attempts are served from a frozen payload."""
+
+    async def get(self, request, pk, *args, **kwargs):
+        entry = await attempt_cache.aget(attempt_key(pk))
+        if entry is None:
+            try:
+                attempt = await with_attempt_questions(Attempt.objects.all()).aget(
+                    pk=pk
+                )
+            except Attempt.DoesNotExist:
+                return _json(ATTEMPT_NOT_FOUND, status=404)
+            data = AttemptSerializer(
+                attempt, context={"request": Request(request)}
+            ).data
+            if not is_frozen(attempt):
+                return _json(data)
+            entry = await _cache_submitted_attempt(attempt, data)
+
+        etag, data = entry
+        headers = {"ETag": etag, "Cache-Control": IMMUTABLE}
+        if etag_matches(request, etag):
+            return HttpResponseNotModified(headers=headers)
+        return _json(data, headers=headers)
@@ -0,0 +1,147 @@
+# quiz/cache.py
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.utils.cache import parse_etags
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Tiny thread-safe LRU map with hit/miss counters."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key, value) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# ---------- Question bank payloads ----------
+
+
+class PayloadCache:
+    """Cache of serialized API payloads.
+
+    Uses the Django cache named by ``alias``; without a usable one (unset,
+    missing or a DummyCache) it falls back to a per-process LRU of ``size``
+    entries.
+    """
+
+    def __init__(self, alias: Optional[str], size: int, timeout: Optional[int]):
+        self.alias = alias
+        self.timeout = timeout
+        self.local = LRUCache(size)
+
+    def _backend(self):
+        if self.alias is None or self.alias not in settings.CACHES:
+            return None
+        backend = caches[self.alias]
+        return None if isinstance(backend, DummyCache) else backend
+
+    def get(self, key: str, default=None):
+        backend = self._backend()
+        if backend is None:
+            return self.local.get(key, default)
+        return backend.get(key, default)
+
+    def set(self, key: str, value) -> None:
+        backend = self._backend()
+        if backend is None:
+            self.local.put(key, value)
+        else:
+            backend.set(key, value, self.timeout)
+
+    def delete(self, key: str) -> None:
+        backend = self._backend()
+        if backend is None:
+            self.local.delete(key)
+        else:
+            backend.delete(key)
+
+    async def aget(self, key: str, default=None):
+        backend = self._backend()
+        if backend is None:
+            return self.local.get(key, default)
+        return await backend.aget(key, default)
+
+    async def aset(self, key: str, value) -> None:
+        backend = self._backend()
+        if backend is None:
+            self.local.put(key, value)
+        else:
+            await backend.aset(key, value, self.timeout)
+
+    def get_or_set(self, key: str, compute: Callable[[], object]):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+
+# Question bank payloads: keys embed the bank version, so a bump (see
+# quiz.signals) orphans every stale entry at once.
+question_cache = PayloadCache(
+    alias=getattr(settings, "QUIZ_CACHE_ALIAS", "default"),
+    size=getattr(settings, "QUIZ_QUESTION_CACHE_SIZE", 1000),
+    timeout=getattr(settings, "QUIZ_QUESTION_CACHE_TIMEOUT", 3600),
+)
+
+# Submitted attempts never change, so their payloads are computed once.
+attempt_cache = PayloadCache(
+    alias=getattr(settings, "QUIZ_CACHE_ALIAS", "default"),
+    size=getattr(settings, "QUIZ_ATTEMPT_CACHE_SIZE", 10_000),
+    timeout=getattr(settings, "QUIZ_ATTEMPT_CACHE_TIMEOUT", 7 * 24 * 3600),
+)
+
+
+def attempt_key(pk) -> str:
+    return f"quiz:attempt:{pk}"
+
+
+def etag_matches(request, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires)."""
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+    tags = parse_etags(header)
+    if tags == ["*"]:
+        return True
+    return etag.removeprefix("W/") in {t.removeprefix("W/") for t in tags}
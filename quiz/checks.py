@@ -0,0 +1,24 @@
+# quiz/checks.py
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Warning, register
+
+
+@register(deploy=True)
+def shared_cache_check(app_configs, **kwargs):
+    """Cached payloads and their invalidation go through the "default"
+    cache; with a per-process backend every worker drifts on its own, which
+    is fine for a single worker only."""
+    backend = caches["default"]
+    if isinstance(backend, (LocMemCache, DummyCache)):
+        return [
+            Warning(
+                f"The default cache ({type(backend).__name__}) is not shared "
+                "between processes.",
+                hint="Run a single worker, or point CACHES['default'] at a "
+                "shared backend (Redis, memcached).",
+                id="quiz.W001",
+            )
+        ]
+    return []
@@ -0,0 +1,89 @@
+# quiz/export.py
+"""Constant-memory exports: rows are streamed from a DB cursor, encoded in
+small batches and (optionally) gzip-compressed on the fly."""
+
+import csv
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+CHUNK_SIZE = 2000  # rows fetched per round trip
+BATCH_ROWS = 500  # rows encoded per yielded chunk
+
+
+def export_columns(model) -> List[str]:
+    """Concrete columns; foreign keys as their ``*_id`` value (no joins)."""
+    return [f.attname for f in model._meta.concrete_fields]
+
+
+def iter_rows(queryset, columns, chunk_size: int = CHUNK_SIZE) -> Iterator[tuple]:
+    return queryset.values_list(*columns).iterator(chunk_size=chunk_size)
+
+
+class _Line:
+    """csv.writer target that hands back each line instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def csv_chunks(rows: Iterable[tuple], columns) -> Iterator[str]:
+    writer = csv.writer(_Line())
+    yield writer.writerow(columns)
+    batch = []
+    for row in rows:
+        batch.append(writer.writerow(row))
+        if len(batch) >= BATCH_ROWS:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+def jsonl_chunks(rows: Iterable[tuple], columns) -> Iterator[str]:
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    batch = []
+    for row in rows:
+        batch.append(encoder.encode(dict(zip(columns, row))) + "\n")
+        if len(batch) >= BATCH_ROWS:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+def gzipped(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class ExportFormat(NamedTuple):
+    content_type: str
+    extension: str
+    encode: Callable[[Iterable[tuple], List[str]], Iterator[str]]
+    gzip: bool = False
+
+
+FORMATS: Dict[str, ExportFormat] = {
+    "csv": ExportFormat("text/csv", "csv", csv_chunks),
+    "csv.gz": ExportFormat("application/gzip", "csv.gz", csv_chunks, gzip=True),
+    "jsonl": ExportFormat("application/x-ndjson", "jsonl", jsonl_chunks),
+}
+
+
+def stream_export(
+    queryset, fmt: str, columns=None, chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Encoded export of ``queryset`` as a lazy stream of byte chunks."""
+    spec = FORMATS[fmt]
+    columns = columns or export_columns(queryset.model)
+    chunks = (
+        text.encode("utf-8")
+        for text in spec.encode(iter_rows(queryset, columns, chunk_size), columns)
+    )
+    return gzipped(chunks) if spec.gzip else chunks
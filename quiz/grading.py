@@ -0,0 +1,139 @@
+# quiz/grading.py
+from collections import defaultdict
+from datetime import timedelta
+from math import isclose
+from typing import Callable, Dict, List
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import leaderboard, search, stats
+from .images import image_pipeline
+from .matching import DEFAULT_THRESHOLD, text_matcher
+from .models import Attempt, AttemptQuestion, ImageBlob, Question
+
+# --- Text helpers -------------------------------------------------------
+
+
+def fuzzy_equal(a: str, b: str, threshold: float = DEFAULT_THRESHOLD) -> bool:
+    return text_matcher.match(a, b, threshold)
+
+
+# --- Per-qtype batch graders --------------------------------------------
+# A grader marks every AttemptQuestion of its qtype in place. Rows must
+# have `question` loaded; choice keys come from the snapshot taken at start.
+
+
+def grade_choices(aqs: List[AttemptQuestion]) -> None:
+    for aq in aqs:
+        aq.is_correct = set(aq.selected_choice_ids) == set(aq.correct_choice_ids)
+
+
+def grade_numeric(aqs: List[AttemptQuestion]) -> None:
+    for aq in aqs:
+        answer = aq.question.numeric_answer
+        aq.is_correct = (
+            aq.numeric_response is not None
+            and answer is not None
+            and isclose(aq.numeric_response, answer, rel_tol=0, abs_tol=1e-6)
+        )
+
+
+def grade_text(aqs: List[AttemptQuestion]) -> None:
+    for aq in aqs:
+        answer = aq.question.text_answer
+        aq.is_correct = bool(
+            aq.text_response
+            and answer
+            and text_matcher.match(aq.text_response, answer, key=aq.question_id)
+        )
+
+
+def grade_image(aqs: List[AttemptQuestion]) -> None:
+    # receipt is enough; validation happens later in quiz/images.py
+    for aq in aqs:
+        aq.is_correct = bool(aq.image)
+
+
+GRADERS: Dict[str, Callable[[List[AttemptQuestion]], None]] = {
+    Question.SINGLE: grade_choices,
+    Question.MULTI: grade_choices,
+    Question.NUM: grade_numeric,
+    Question.TEXT: grade_text,
+    Question.IMAGE: grade_image,
+}
+
+# columns a submit may change on an AttemptQuestion
+ANSWER_FIELDS = [
+    "text_response",
+    "numeric_response",
+    "selected_choice_ids",
+    "image",
+    "image_status",
+    "is_correct",
+]
+
+
+def grade_batch(aqs: List[AttemptQuestion]) -> int:
+    """Grade rows in memory, one grader call per qtype; returns the score."""
+    by_qtype: Dict[str, List[AttemptQuestion]] = defaultdict(list)
+    for aq in aqs:
+        by_qtype[aq.qtype].append(aq)
+    for qtype, rows in by_qtype.items():
+        grader = GRADERS.get(qtype)
+        if grader is not None:
+            grader(rows)
+    return sum(1 for aq in aqs if aq.is_correct)
+
+
+def is_expired(attempt: Attempt) -> bool:
+    """True once a started attempt has outlived ``QUIZ_ATTEMPT_TTL`` seconds."""
+    ttl = getattr(settings, "QUIZ_ATTEMPT_TTL", None)
+    return bool(ttl) and attempt.created_at < timezone.now() - timedelta(seconds=ttl)
+
+
+@transaction.atomic
+def grade_attempt(attempt: Attempt, aqs: List[AttemptQuestion]) -> bool:
+    """Grade and submit an open attempt in two writes.
+
+    The submit is claimed with a conditional UPDATE on ``status``, so of two
+    racing submits exactly one wins; the loser gets False and writes nothing.
+    """
+    score = grade_batch(aqs)
+    now = timezone.now()
+    claimed = Attempt.objects.filter(pk=attempt.pk, status=Attempt.STARTED).update(
+        status=Attempt.SUBMITTED, submitted_at=now, score=score
+    )
+    if not claimed:
+        return False
+    AttemptQuestion.objects.bulk_update(aqs, ANSWER_FIELDS)
+    # bulk_update sends no signals; index the text answers it wrote and
+    # count the image references
+    search.index_rows(
+        search.ANSWERS, [(aq.pk, aq.text_response) for aq in aqs if aq.text_response]
+    )
+    ImageBlob.objects.retain(
+        aq.image.name
+        for aq in aqs
+        if aq.image and aq.image_status != AttemptQuestion.IMAGE_PENDING
+    )
+    # staged uploads get their references once processed
+    staged = {
+        aq.image.name for aq in aqs if aq.image_status == AttemptQuestion.IMAGE_PENDING
+    }
+    if staged:
+        transaction.on_commit(lambda: image_pipeline.schedule(staged))
+    attempt.score = score
+    attempt.status = Attempt.SUBMITTED
+    attempt.submitted_at = now
+    leaderboard.record_submit(attempt, aqs)
+    stats.record_submit(aqs)
+    return True
+
+
+async def agrade_attempt(attempt: Attempt, aqs: List[AttemptQuestion]) -> bool:
+    # Django has no async transactions; the claim and bulk_update must
+    # commit together, so they run as one unit on the ORM's sync thread.
+    return await sync_to_async(grade_attempt)(attempt, aqs)
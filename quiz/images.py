@@ -0,0 +1,149 @@
+# quiz/images.py
+"""Answer-image pipeline.
+
+Submits only stage the upload (a rename for large, disk-buffered uploads)
+and mark the rows ``pending``; grading depends on receipt alone. After the
+submit commits, a bounded thread pool verifies, downscales, re-encodes and
+strips metadata from the image, stores the result content-addressed and
+marks the rows ``ready`` (or ``invalid``) with the final size.
+"""
+
+import io
+import logging
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from .cache import attempt_cache, attempt_key
+from .models import AttemptQuestion, ImageBlob
+from .storage import answer_storage
+from .thumbnails import thumbnails
+
+logger = logging.getLogger(__name__)
+
+MAX_DIMENSION = getattr(settings, "QUIZ_IMAGE_MAX_DIMENSION", 2048)
+JPEG_QUALITY = 85
+
+# plain storage over the same MEDIA_ROOT: saving a disk-buffered upload
+# moves its temp file instead of copying it
+staging_storage = FileSystemStorage()
+
+
+class InvalidImage(Exception):
+    pass
+
+
+def stage_answer_image(upload) -> str:
+    """Park an upload under a unique name; O(1) for large uploads."""
+    ext = os.path.splitext(upload.name or "")[1].lower()
+    if not re.fullmatch(r"\.[a-z0-9]{1,5}", ext):
+        ext = ""
+    return staging_storage.save(f"answers/incoming/{uuid.uuid4().hex}{ext}", upload)
+
+
+def process_image(fh) -> Tuple[bytes, str]:
+    """Verify, cap, re-encode and strip an image; returns (data, extension)."""
+    try:
+        with Image.open(fh) as img:
+            img.verify()  # structural check only; the image must be reopened
+        fh.seek(0)
+        with Image.open(fh) as img:
+            img.draft("RGB", (MAX_DIMENSION, MAX_DIMENSION))
+            # bake the EXIF orientation into the pixels before EXIF is dropped
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((MAX_DIMENSION, MAX_DIMENSION))
+            icc_profile = img.info.get("icc_profile")
+            out = io.BytesIO()
+            if img.mode in ("RGBA", "LA") or "transparency" in img.info:
+                img.convert("RGBA").save(
+                    out, "PNG", optimize=True, icc_profile=icc_profile
+                )
+                return out.getvalue(), ".png"
+            img.convert("RGB").save(
+                out,
+                "JPEG",
+                quality=JPEG_QUALITY,
+                optimize=True,
+                icc_profile=icc_profile,
+            )
+            return out.getvalue(), ".jpg"
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as exc:
+        # UnidentifiedImageError is an OSError; verify() raises SyntaxError
+        raise InvalidImage(str(exc)) from exc
+
+
+class ImagePipeline:
+    def __init__(self, workers: int = 2):
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = {}  # staged name -> Future
+
+    def schedule(self, names: Iterable[str]) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="answer-images"
+                )
+            for name in names:
+                if name not in self._pending:
+                    self._pending[name] = self._executor.submit(self._run, name)
+
+    def _run(self, name: str) -> None:
+        close_old_connections()
+        try:
+            self.process(name)
+        except Exception:
+            logger.exception("Processing answer image %s failed", name)
+        finally:
+            close_old_connections()
+            with self._lock:
+                self._pending.pop(name, None)
+
+    def process(self, name: str) -> str:
+        """Process one staged image and settle its rows; returns the status."""
+        rows = AttemptQuestion.objects.filter(image=name)
+        if not rows.exists():
+            # the attempt was deleted before we got here
+            staging_storage.delete(name)
+            return ""
+        try:
+            with staging_storage.open(name, "rb") as fh:
+                data, ext = process_image(fh)
+        except InvalidImage as exc:
+            logger.info("Rejected answer image %s: %s", name, exc)
+            status, final, size = AttemptQuestion.IMAGE_INVALID, "", None
+        else:
+            final = answer_storage.save(f"answers/image{ext}", ContentFile(data))
+            status, size = AttemptQuestion.IMAGE_READY, len(data)
+
+        with transaction.atomic():
+            attempt_ids = set(rows.values_list("attempt_id", flat=True))
+            settled = rows.update(image=final, image_status=status, image_size=size)
+            ImageBlob.objects.retain([final] * settled)
+        if final and not settled and not ImageBlob.objects.filter(name=final).exists():
+            answer_storage.delete(final)  # rows vanished while we worked
+        staging_storage.delete(name)
+        for attempt_id in attempt_ids:
+            attempt_cache.delete(attempt_key(attempt_id))
+        if final:
+            thumbnails.schedule([final])
+        return status
+
+    def drain(self, timeout: Optional[float] = None) -> None:
+        """Wait for queued images (commands, tests)."""
+        with self._lock:
+            futures = list(self._pending.values())
+        wait(futures, timeout=timeout)
+
+
+image_pipeline = ImagePipeline(workers=getattr(settings, "QUIZ_IMAGE_WORKERS", 2))
@@ -0,0 +1,207 @@
+# quiz/leaderboard.py
+"""Leaderboard aggregates, maintained incrementally.
+
+Each submit adds its attempt to the player's ``PlayerStats`` row and to
+one ``CategoryStats`` row per category it touched, inside the submit's
+transaction. Reads walk the leaderboard indexes, so their cost depends on
+the number of players, never on attempt history. Edits that bypass the
+play flow (deleting attempts in the admin) leave the aggregates stale
+until ``manage.py rebuild_leaderboard``.
+
+Order: best score, then total correct, then the earlier player; the
+category board ranks by correct answers in that category. Ranks are
+1-based positions in that order. A rank is a count of the rows ahead
+on the covering leaderboard index, so it costs O(rank) index entries
+and no table reads: cheap near the top, a few milliseconds for a
+player a million places down.
+"""
+
+from collections import defaultdict
+from itertools import islice
+from typing import Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Max, Q, Sum, When
+from django.db.models.functions import Greatest
+
+from .models import Attempt, AttemptQuestion, CategoryStats, Player, PlayerStats
+
+MAX_LIMIT = 100
+
+
+def record_submit(attempt: Attempt, aqs: List[AttemptQuestion]) -> None:
+    """Fold a just-graded attempt into the aggregates (call inside its transaction).
+
+    Rows must have ``question`` loaded.
+    """
+    player_id, now = attempt.player_id, attempt.submitted_at
+    PlayerStats.objects.bulk_create(
+        [PlayerStats(player_id=player_id)], ignore_conflicts=True
+    )
+    PlayerStats.objects.filter(pk=player_id).update(
+        best_score=Greatest(F("best_score"), attempt.score),
+        attempts=F("attempts") + 1,
+        correct=F("correct") + attempt.score,
+        answered=F("answered") + len(aqs),
+        last_played_at=now,
+    )
+
+    per_category = defaultdict(lambda: [0, 0])  # category -> [correct, answered]
+    for aq in aqs:
+        if aq.question.category_id is not None:
+            counts = per_category[aq.question.category_id]
+            counts[0] += aq.is_correct
+            counts[1] += 1
+    if not per_category:
+        return
+    CategoryStats.objects.bulk_create(
+        [CategoryStats(player_id=player_id, category_id=c) for c in per_category],
+        ignore_conflicts=True,
+    )
+
+    def delta(index):
+        return Case(
+            *(When(category_id=c, then=n[index]) for c, n in per_category.items()),
+            default=0,
+            output_field=IntegerField(),
+        )
+
+    # one UPDATE for all categories of the attempt
+    CategoryStats.objects.filter(
+        player_id=player_id, category_id__in=per_category
+    ).update(
+        correct=F("correct") + delta(0),
+        answered=F("answered") + delta(1),
+        last_played_at=now,
+    )
+
+
+# ---------- Reads ----------
+
+
+def top(limit: int, category: Optional[int] = None):
+    """Leading rows with ``rank`` set; an index walk of ``limit`` rows."""
+    if category is None:
+        qs = PlayerStats.objects.order_by("-best_score", "-correct", "player_id")
+    else:
+        qs = CategoryStats.objects.filter(category_id=category).order_by(
+            "-correct", "player_id"
+        )
+    rows = list(qs[:limit])
+    for rank, row in enumerate(rows, 1):
+        row.rank = rank
+    return rows
+
+
+def ahead_of(row):
+    """Rows ranked above ``row`` (a PlayerStats or CategoryStats).
+
+    Every branch is a range on the leaderboard index, so counting them
+    only walks the entries ahead of ``row``.
+    """
+    if isinstance(row, PlayerStats):
+        return PlayerStats.objects.filter(
+            Q(best_score__gt=row.best_score)
+            | Q(best_score=row.best_score, correct__gt=row.correct)
+            | Q(
+                best_score=row.best_score,
+                correct=row.correct,
+                player_id__lt=row.player_id,
+            )
+        )
+    # correct__gte bounds the scan (plus ties); the OR alone would read the
+    # whole category
+    return CategoryStats.objects.filter(
+        category_id=row.category_id, correct__gte=row.correct
+    ).filter(
+        Q(correct__gt=row.correct) | Q(correct=row.correct, player_id__lt=row.player_id)
+    )
+
+
+def rank_of(player: Player, category: Optional[int] = None):
+    """The player's row with ``rank`` set, or None if they never submitted.
+
+    O(rank): the count walks every index entry ahead of the player.
+    """
+    if category is None:
+        row = PlayerStats.objects.filter(player=player).first()
+    else:
+        row = CategoryStats.objects.filter(player=player, category_id=category).first()
+    if row is not None:
+        row.rank = ahead_of(row).count() + 1
+    return row
+
+
+# ---------- Rebuild ----------
+
+
+def _insert(model, rows: Iterable, batch_size: int) -> int:
+    """bulk_create from a lazy iterable, one batch in memory at a time."""
+    rows, total = iter(rows), 0
+    while batch := list(islice(rows, batch_size)):
+        model.objects.bulk_create(batch)
+        total += len(batch)
+    return total
+
+
+def rebuild(batch_size: int = 5000) -> tuple:
+    """Recompute every aggregate from submitted attempts; returns row counts."""
+    submitted = Attempt.objects.filter(status=Attempt.SUBMITTED)
+    with transaction.atomic():
+        PlayerStats.objects.all().delete()
+        CategoryStats.objects.all().delete()
+
+        players = (
+            submitted.order_by()
+            .values("player_id")
+            .annotate(
+                best=Max("score"),
+                n=Count("id"),
+                correct_sum=Sum("score"),
+                last=Max("submitted_at"),
+            )
+        )
+        answered = dict(
+            AttemptQuestion.objects.filter(attempt__status=Attempt.SUBMITTED)
+            .order_by()
+            .values_list("attempt__player_id")
+            .annotate(n=Count("id"))
+        )
+        player_rows = (
+            PlayerStats(
+                player_id=row["player_id"],
+                best_score=row["best"],
+                attempts=row["n"],
+                correct=row["correct_sum"],
+                answered=answered.get(row["player_id"], 0),
+                last_played_at=row["last"],
+            )
+            for row in players.iterator(chunk_size=batch_size)
+        )
+        n_players = _insert(PlayerStats, player_rows, batch_size)
+
+        categories = (
+            AttemptQuestion.objects.filter(
+                attempt__status=Attempt.SUBMITTED,
+                question__category__isnull=False,
+            )
+            .order_by()
+            .values("attempt__player_id", "question__category_id")
+            .annotate(
+                correct=Count("id", filter=Q(is_correct=True)),
+                answered=Count("id"),
+                last=Max("attempt__submitted_at"),
+            )
+        )
+        category_rows = (
+            CategoryStats(
+                player_id=row["attempt__player_id"],
+                category_id=row["question__category_id"],
+                correct=row["correct"],
+                answered=row["answered"],
+                last_played_at=row["last"],
+            )
+            for row in categories.iterator(chunk_size=batch_size)
+        )
+        n_categories = _insert(CategoryStats, category_rows, batch_size)
+    return n_players, n_categories
@@ -0,0 +1,278 @@
+import io
+import json
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse
+from PIL import Image
+
+from quiz.images import image_pipeline
+from quiz.models import Category, Choice, Question
+from quiz.play import QUESTIONS_PER_ATTEMPT
+from quiz.thumbnails import thumbnails
+from quiz.versioning import bump_bank_version
+
+ENDPOINTS = ["start", "submit", "list", "detail"]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = "Benchmark the play flow: start -> submit -> list attempts -> detail"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=1000)
+        parser.add_argument("--players", type=int, default=50)
+        parser.add_argument(
+            "--rounds", type=int, default=1, help="Attempts played per player"
+        )
+        parser.add_argument(
+            "--image", action="store_true", help="Attach an image to every submit"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write JSON results to this file")
+        parser.add_argument(
+            "--in-place",
+            action="store_true",
+            help="Use the configured database instead of a throwaway test one",
+        )
+
+    def handle(self, *args, **options):
+        for option in ("players", "rounds"):
+            if options[option] < 1:
+                raise CommandError(f"--{option} must be at least 1")
+        if options["questions"] < QUESTIONS_PER_ATTEMPT:
+            raise CommandError(
+                f"--questions must be at least {QUESTIONS_PER_ATTEMPT} (one attempt)"
+            )
+        setup_test_environment()
+        try:
+            if options["in_place"]:
+                results = self.run(options)
+            else:
+                results = self.run_isolated(options)
+        finally:
+            teardown_test_environment()
+
+        self.report(results)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def run_isolated(self, options):
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with tempfile.TemporaryDirectory() as media_root:
+                with override_settings(MEDIA_ROOT=media_root):
+                    try:
+                        return self.run(options)
+                    finally:
+                        # before media_root goes away
+                        image_pipeline.drain()
+                        thumbnails.drain()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    # ---- seeding ----
+
+    def seed(self, n, rnd):
+        """Create n questions spread evenly across the five qtypes."""
+        categories = [
+            Category.objects.get_or_create(name=f"Bench {i}")[0] for i in range(5)
+        ]
+        qtypes = [qt for qt, _ in Question.TYPE_CHOICES]
+        difficulties = [d for d, _ in Question.DIFF_CHOICES]
+        questions = []
+        for i in range(n):
+            qtype = qtypes[i % len(qtypes)]
+            questions.append(
+                Question(
+                    prompt=f"Bench question {i}",
+                    qtype=qtype,
+                    category=rnd.choice(categories),
+                    difficulty=rnd.choice(difficulties),
+                    text_answer=f"answer {i}" if qtype == Question.TEXT else None,
+                    numeric_answer=float(i) if qtype == Question.NUM else None,
+                    image_required=qtype == Question.IMAGE,
+                )
+            )
+        Question.objects.bulk_create(questions, batch_size=1000)
+
+        choices = []
+        for q in questions:
+            if q.qtype not in (Question.SINGLE, Question.MULTI):
+                continue
+            n_correct = 1 if q.qtype == Question.SINGLE else 2
+            for j in range(4):
+                choices.append(
+                    Choice(question=q, text=f"choice {j}", is_correct=j < n_correct)
+                )
+        Choice.objects.bulk_create(choices, batch_size=1000)
+        bump_bank_version()  # bulk_create sends no signals
+        return {q.id: q for q in questions}
+
+    # ---- play flow ----
+
+    def answer_for(self, aq, question, rnd):
+        correct = rnd.random() < 0.5
+        if aq["qtype"] in (Question.SINGLE, Question.MULTI):
+            ids = aq["correct_choice_ids"] if correct else []
+            return {"selected_choice_ids": ids}
+        if aq["qtype"] == Question.TEXT:
+            return {"text_response": question.text_answer if correct else "nope"}
+        if aq["qtype"] == Question.NUM:
+            value = question.numeric_answer if correct else -1
+            return {"numeric_response": str(value)}
+        return {}
+
+    def image_upload(self):
+        buf = io.BytesIO()
+        Image.new("RGB", (64, 64), "steelblue").save(buf, "PNG")
+        return SimpleUploadedFile("bench.png", buf.getvalue(), "image/png")
+
+    def run(self, options):
+        rnd = random.Random(options["seed"])
+        bank = self.seed(options["questions"], rnd)
+        client = Client()
+        counter = QueryCounter()
+        samples = defaultdict(list)  # endpoint -> [(seconds, queries)]
+
+        def call(endpoint, method, url, **kwargs):
+            counter.count = 0
+            start = time.perf_counter()
+            with connection.execute_wrapper(counter):
+                resp = getattr(client, method)(url, **kwargs)
+            samples[endpoint].append((time.perf_counter() - start, counter.count))
+            if resp.status_code >= 400:
+                raise RuntimeError(
+                    f"{endpoint} returned {resp.status_code}: {resp.content[:200]!r}"
+                )
+            return resp.json()
+
+        wall_start = time.perf_counter()
+        for _ in range(options["players"]):
+            player_uuid = str(uuid.uuid4())
+            for _ in range(options["rounds"]):
+                attempt = call(
+                    "start",
+                    "post",
+                    reverse("play-start"),
+                    data={"player_uuid": player_uuid},
+                    content_type="application/json",
+                )
+                answers = {
+                    str(aq["id"]): self.answer_for(aq, bank[aq["question_id"]], rnd)
+                    for aq in attempt["attempt_questions"]
+                }
+                data = {"answers": json.dumps({"answers": answers})}
+                if options["image"]:
+                    data["image"] = self.image_upload()
+                call(
+                    "submit",
+                    "post",
+                    reverse("play-submit", args=[attempt["id"]]),
+                    data=data,
+                )
+                call(
+                    "list",
+                    "get",
+                    reverse("attempts"),
+                    data={"player_uuid": player_uuid},
+                )
+                call("detail", "get", reverse("attempt-detail", args=[attempt["id"]]))
+        wall = time.perf_counter() - wall_start
+
+        return {
+            "meta": self.meta(options, wall),
+            "endpoints": {name: self.summarize(samples[name]) for name in ENDPOINTS},
+        }
+
+    # ---- reporting ----
+
+    def summarize(self, rows):
+        latencies = sorted(t for t, _ in rows)
+        queries = [q for _, q in rows]
+        busy = sum(latencies)
+        return {
+            "requests": len(rows),
+            "throughput_rps": len(rows) / busy if busy else None,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "queries_avg": sum(queries) / len(queries),
+            "queries_max": max(queries),
+        }
+
+    def meta(self, options, wall):
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "database": connection.vendor,
+            "questions": options["questions"],
+            "players": options["players"],
+            "rounds": options["rounds"],
+            "image": options["image"],
+            "seed": options["seed"],
+            "wall_seconds": wall,
+        }
+
+    def report(self, results):
+        meta = results["meta"]
+        self.stdout.write(
+            f"{meta['players']} players x {meta['rounds']} rounds, "
+            f"{meta['questions']} questions, {meta['database']}, "
+            f"{meta['wall_seconds']:.2f}s wall"
+        )
+        header = (
+            f"{'endpoint':<8} {'reqs':>6} {'req/s':>9} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'p99 ms':>8} {'q avg':>6} {'q max':>6}"
+        )
+        self.stdout.write(header)
+        for name, r in results["endpoints"].items():
+            self.stdout.write(
+                f"{name:<8} {r['requests']:>6} {r['throughput_rps']:>9.1f} "
+                f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+                f"{r['queries_avg']:>6.1f} {r['queries_max']:>6}"
+            )
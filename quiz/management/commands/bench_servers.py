@@ -0,0 +1,302 @@
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.models import Question
+
+from .bench_play import ENDPOINTS
+from .bench_play import Command as BenchPlay
+from .bench_play import percentile
+
+# name -> (argv builder, extra environment)
+SERVERS = {
+    "wsgi": (
+        lambda port, workers, threads: [
+            "gunicorn",
+            "InstaHM_Django.wsgi:application",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(workers),
+            "--threads",
+            str(threads),
+        ],
+        {},
+    ),
+    "asgi": (
+        lambda port, workers, threads: [
+            "uvicorn",
+            "InstaHM_Django.asgi:application",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--loop",
+            "uvloop",
+            "--http",
+            "httptools",
+            "--no-access-log",
+        ],
+        {"QUIZ_ASYNC_VIEWS": "1"},
+    ),
+}
+
+
+def answered_right(aq, question, payload) -> bool:
+    """Whether bench_play's answer_for chose a right answer for ``aq``."""
+    if payload.get("selected_choice_ids"):
+        return True
+    if "text_response" in payload:
+        return payload["text_response"] == question.text_answer
+    if "numeric_response" in payload:
+        return float(payload["numeric_response"]) == question.numeric_answer
+    return False
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def fetch(url, method="GET", body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(
+        url, data=data, method=method, headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(req, timeout=60) as resp:
+        return json.loads(resp.read())
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare WSGI (gunicorn) and ASGI (uvicorn + async views) throughput "
+        "on the play flow at a given client concurrency"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--questions",
+            type=int,
+            default=1000,
+            help="Questions to seed first (0 plays against the existing bank)",
+        )
+        parser.add_argument("--players", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=64)
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--threads", type=int, default=8, help="gunicorn threads per worker"
+        )
+        parser.add_argument(
+            "--servers", default="wsgi,asgi", help="Comma-separated: wsgi, asgi"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write JSON results to this file")
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options["servers"].split(",") if name]
+        for name in names:
+            if name not in SERVERS:
+                raise CommandError(f"Unknown server {name!r}")
+            binary = SERVERS[name][0](0, 1, 1)[0]
+            if shutil.which(binary) is None:
+                raise CommandError(f"{binary} is not installed (see requirements.txt)")
+
+        rnd = random.Random(options["seed"])
+        if options["questions"]:
+            BenchPlay().seed(options["questions"], rnd)
+        bank = Question.objects.in_bulk()
+
+        results = {
+            "meta": {
+                "database": settings.DATABASES["default"]["ENGINE"].rsplit(".")[-1],
+                "questions": len(bank),
+                "players": options["players"],
+                "concurrency": options["concurrency"],
+                "workers": options["workers"],
+                "threads": options["threads"],
+                "seed": options["seed"],
+            },
+            "servers": {},
+        }
+        for name in names:
+            with self.server(name, options) as base_url:
+                results["servers"][name] = self.load(base_url, bank, options)
+
+        self.report(results)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    # ---- servers ----
+
+    @contextmanager
+    def server(self, name, options):
+        build, extra_env = SERVERS[name]
+        port = free_port()
+        proc = subprocess.Popen(
+            build(port, options["workers"], options["threads"]),
+            env={**os.environ, **extra_env},
+            stdout=subprocess.DEVNULL,
+            stderr=sys.stderr,
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            self.wait_ready(base_url, proc)
+            yield base_url
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    def wait_ready(self, base_url, proc, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise CommandError(f"Server exited with {proc.returncode}")
+            try:
+                fetch(f"{base_url}/api/attempts/")
+                return
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.2)
+        raise CommandError(f"Server at {base_url} did not come up in {timeout}s")
+
+    # ---- load ----
+
+    def load(self, base_url, bank, options):
+        samples = defaultdict(list)  # endpoint -> [seconds]
+        errors = defaultdict(int)
+        # submits whose score is missing or not what the answers earn: the
+        # answers were never graded, so the timings mean nothing
+        bad_scores = 0
+        lock = threading.Lock()
+        answer_for = BenchPlay().answer_for
+
+        def call(endpoint, path, method="GET", body=None):
+            start = time.perf_counter()
+            try:
+                data = fetch(base_url + path, method, body)
+            except (urllib.error.URLError, ConnectionError):
+                with lock:
+                    errors[endpoint] += 1
+                return None
+            elapsed = time.perf_counter() - start
+            with lock:
+                samples[endpoint].append(elapsed)
+            return data
+
+        def play(seed):
+            nonlocal bad_scores
+            rnd = random.Random(seed)
+            player_uuid = str(uuid.UUID(int=rnd.getrandbits(128)))
+            attempt = call(
+                "start", "/api/play/start/", "POST", {"player_uuid": player_uuid}
+            )
+            if attempt is None:
+                return
+            answers, expected = {}, 0
+            for aq in attempt["attempt_questions"]:
+                question = bank[aq["question_id"]]
+                answers[str(aq["id"])] = answer_for(aq, question, rnd)
+                expected += answered_right(aq, question, answers[str(aq["id"])])
+            # the same body as bench_play: an "answers" field holding JSON
+            result = call(
+                "submit",
+                f"/api/play/submit/{attempt['id']}/",
+                "POST",
+                {"answers": json.dumps({"answers": answers})},
+            )
+            if result is not None and result.get("score") != expected:
+                with lock:
+                    bad_scores += 1
+            call("list", f"/api/attempts/?player_uuid={player_uuid}")
+            call("detail", f"/api/attempts/{attempt['id']}/")
+
+        base_seed = options["seed"] * 1_000_003
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            list(pool.map(play, range(base_seed, base_seed + options["players"])))
+        wall = time.perf_counter() - wall_start
+
+        total = sum(len(rows) for rows in samples.values())
+        return {
+            "wall_seconds": wall,
+            "throughput_rps": total / wall if wall else None,
+            "errors": sum(errors.values()),
+            "bad_scores": bad_scores,
+            "endpoints": {
+                name: self.summarize(samples[name], errors[name], wall)
+                for name in ENDPOINTS
+            },
+        }
+
+    def summarize(self, latencies, errors, wall):
+        latencies = sorted(latencies)
+
+        def ms(pct):
+            value = percentile(latencies, pct)
+            return value * 1000 if value is not None else None
+
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "throughput_rps": len(latencies) / wall if wall else None,
+            "p50_ms": ms(50),
+            "p95_ms": ms(95),
+            "p99_ms": ms(99),
+        }
+
+    # ---- reporting ----
+
+    def report(self, results):
+        meta = results["meta"]
+        self.stdout.write(
+            f"{meta['players']} players at concurrency {meta['concurrency']}, "
+            f"{meta['workers']} workers, {meta['questions']} questions, "
+            f"{meta['database']}"
+        )
+        self.stdout.write(
+            f"{'server':<6} {'endpoint':<8} {'reqs':>6} {'errs':>5} {'req/s':>9} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        )
+        for name, run in results["servers"].items():
+            for endpoint, r in run["endpoints"].items():
+                if not r["requests"]:
+                    self.stdout.write(
+                        f"{name:<6} {endpoint:<8} {0:>6} {r['errors']:>5}"
+                    )
+                    continue
+                self.stdout.write(
+                    f"{name:<6} {endpoint:<8} {r['requests']:>6} {r['errors']:>5} "
+                    f"{r['throughput_rps']:>9.1f} {r['p50_ms']:>8.2f} "
+                    f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}"
+                )
+            self.stdout.write(
+                f"{name:<6} {'total':<8} {'':>6} {run['errors']:>5} "
+                f"{run['throughput_rps']:>9.1f}   ({run['wall_seconds']:.2f}s wall)"
+            )
+            if run["bad_scores"]:
+                self.stderr.write(
+                    f"{name}: {run['bad_scores']} submits scored differently than "
+                    "their answers earn; grading did not run as benchmarked"
+                )
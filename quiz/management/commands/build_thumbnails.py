@@ -0,0 +1,50 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from quiz.models import AttemptQuestion
+from quiz.thumbnails import THUMBNAIL_SIZE, build_thumbnail
+
+
+class Command(BaseCommand):
+    help = "Build missing thumbnails for answer images"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--force", action="store_true", help="Rebuild existing thumbnails too"
+        )
+
+    def handle(self, *args, **options):
+        # content-addressed names: each distinct blob is rendered once
+        names = (
+            AttemptQuestion.objects.exclude(image="")
+            .exclude(image__isnull=True)
+            .values_list("image", flat=True)
+            .distinct()
+            .iterator(chunk_size=2000)
+        )
+        counts = {"built": 0, "skipped": 0, "failed": 0}
+
+        def build(name):
+            try:
+                return "built" if build_thumbnail(name, options["force"]) else "skipped"
+            except Exception as exc:
+                self.stderr.write(f"{name}: {exc}")
+                return "failed"
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options["workers"]) as pool:
+            for outcome in pool.map(build, names):
+                counts[outcome] += 1
+        elapsed = time.perf_counter() - start
+
+        done = sum(counts.values())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{counts['built']} built, {counts['skipped']} already present, "
+                f"{counts['failed']} failed ({THUMBNAIL_SIZE[0]}x{THUMBNAIL_SIZE[1]}, "
+                f"{done / elapsed if elapsed else 0:.0f} images/s)"
+            )
+        )
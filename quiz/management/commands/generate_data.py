@@ -0,0 +1,455 @@
+import json
+import math
+import multiprocessing
+import random
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Dict, List, NamedTuple, Optional
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from quiz import search
+from quiz.models import Attempt, AttemptQuestion, Category, Choice, Player, Question
+from quiz.play import QUESTIONS_PER_ATTEMPT, choice_snapshot
+from quiz.versioning import bump_bank_version
+
+SHARD_PLAYERS = 1000  # players per unit of work; fixed so output is seed-stable
+
+
+class BankQuestion(NamedTuple):
+    id: int
+    qtype: str
+    prompt: str
+    text_answer: Optional[str]
+    numeric_answer: Optional[float]
+    choice_ids: List[int]
+    correct_ids: List[int]
+    choices: str  # the attempt snapshot, already JSON-encoded
+
+
+# loaded before the worker pool forks, then shared copy-on-write
+_bank: List[BankQuestion] = []
+
+
+def parse_weights(value: str, allowed) -> Dict[str, float]:
+    """``"easy=5,med=3,hard=2"`` -> {"easy": 5.0, ...}."""
+    weights = {}
+    for part in value.split(","):
+        key, _, weight = part.partition("=")
+        key = key.strip()
+        if key not in allowed:
+            raise CommandError(
+                f"Unknown key {key!r}; expected one of {sorted(allowed)}"
+            )
+        try:
+            weights[key] = float(weight)
+        except ValueError:
+            raise CommandError(f"Bad weight in {part!r}")
+    return weights
+
+
+def parse_range(value: str):
+    low, _, high = value.partition("-")
+    try:
+        low = int(low)
+        high = int(high or low)
+    except ValueError:
+        raise CommandError(f"Bad range {value!r}; expected N or MIN-MAX")
+    if low < 0 or high < low:
+        raise CommandError(f"Bad range {value!r}")
+    return low, high
+
+
+@contextmanager
+def explicit_created_at():
+    # bulk_create stamps auto_now_add fields with now(); let the generator
+    # spread attempts over time so date-ordered indexes see realistic data
+    field = Attempt._meta.get_field("created_at")
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def shard_random(seed: int, shard: int) -> random.Random:
+    return random.Random(f"{seed}:players:{shard}")
+
+
+def player_uuid(rnd: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rnd.getrandbits(128), version=4)
+
+
+def answer(rnd: random.Random, q: BankQuestion, correct: bool) -> dict:
+    if q.qtype in (Question.SINGLE, Question.MULTI):
+        if correct:
+            return {"selected_choice_ids": q.correct_ids}
+        wrong = [c for c in q.choice_ids if c not in q.correct_ids]
+        return {"selected_choice_ids": wrong[:1]}
+    if q.qtype == Question.TEXT:
+        return {"text_response": q.text_answer if correct else "no idea"}
+    if q.qtype == Question.NUM:
+        value = q.numeric_answer if correct else (q.numeric_answer or 0) + 1
+        return {"numeric_response": value}
+    return {}  # no image files are generated
+
+
+AQ_COLUMNS = [
+    "attempt_id",
+    "question_id",
+    "prompt",
+    "qtype",
+    "text_response",
+    "numeric_response",
+    "image",
+    "image_status",
+    "selected_choice_ids",
+    "is_correct",
+    "correct_choice_ids",
+    "choices",
+]
+
+
+def insert_rows(model, columns, rows, batch_size) -> None:
+    quote = connection.ops.quote_name
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        quote(model._meta.db_table),
+        ", ".join(quote(model._meta.get_field(c).column) for c in columns),
+        ", ".join(["%s"] * len(columns)),
+    )
+    with connection.cursor() as cursor:
+        for offset in range(0, len(rows), batch_size):
+            end = offset + batch_size
+            cursor.executemany(sql, rows[offset:end])
+
+
+def build_shard(task) -> int:
+    """Insert one shard of players with their attempts; returns AQ rows."""
+    shard, n_players, opts = task
+    rnd = shard_random(opts["seed"], shard)
+    now = timezone.now()
+    rows = 0
+    with transaction.atomic(), explicit_created_at():
+        players = [Player(player_uuid=player_uuid(rnd)) for _ in range(n_players)]
+        Player.objects.bulk_create(players, batch_size=opts["batch_size"])
+
+        attempts, per_attempt = [], []
+        low, high = opts["attempts"]
+        for player in players:
+            for _ in range(rnd.randint(low, high)):
+                created = now - timedelta(seconds=rnd.uniform(0, opts["days"] * 86400))
+                submitted = rnd.random() < opts["submitted"]
+                picked = [_bank[i] for i in rnd.sample(range(len(_bank)), opts["k"])]
+                answers = []
+                for q in picked:
+                    # no image is generated, and grading only credits
+                    # image questions on receipt of one
+                    correct = (
+                        submitted
+                        and rnd.random() < opts["correct"]
+                        and q.qtype != Question.IMAGE
+                    )
+                    answers.append(
+                        (q, answer(rnd, q, correct) if submitted else {}, correct)
+                    )
+                attempts.append(
+                    Attempt(
+                        player=player,
+                        created_at=created,
+                        total=len(picked),
+                        score=sum(1 for _, _, ok in answers if ok),
+                        status=Attempt.SUBMITTED if submitted else Attempt.STARTED,
+                        submitted_at=(
+                            created + timedelta(seconds=rnd.randint(20, 600))
+                            if submitted
+                            else None
+                        ),
+                    )
+                )
+                per_attempt.append(answers)
+        Attempt.objects.bulk_create(attempts, batch_size=opts["batch_size"])
+
+        # the bulk of the volume: plain tuples through executemany, skipping
+        # model instances and per-field preparation
+        aqs = [
+            (
+                attempt.pk,
+                q.id,
+                q.prompt,
+                q.qtype,
+                payload.get("text_response"),
+                payload.get("numeric_response"),
+                "",
+                "",
+                json.dumps(payload.get("selected_choice_ids", [])),
+                correct,
+                json.dumps(q.correct_ids),
+                q.choices,
+            )
+            for attempt, answers in zip(attempts, per_attempt)
+            for q, payload, correct in answers
+        ]
+        insert_rows(AttemptQuestion, AQ_COLUMNS, aqs, opts["batch_size"])
+        if attempts and search.available():
+            # raw inserts hand back no ids; the range may also cover another
+            # worker's attempts, which only re-indexes them
+            search.index_rows(
+                search.ANSWERS,
+                AttemptQuestion.objects.filter(
+                    attempt_id__gte=attempts[0].pk,
+                    attempt_id__lte=attempts[-1].pk,
+                    text_response__isnull=False,
+                ).values_list("id", "text_response"),
+            )
+        rows += len(aqs)
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic data set (questions, players, "
+        "attempts) for load and capacity testing"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--categories", type=int, default=20)
+        parser.add_argument("--questions", type=int, default=10_000)
+        parser.add_argument(
+            "--qtypes",
+            default="text=2,single=3,multi=2,numeric=2,image=1",
+            help="Relative qtype weights",
+        )
+        parser.add_argument(
+            "--difficulties",
+            default="easy=5,med=3,hard=2",
+            help="Relative difficulty weights",
+        )
+        parser.add_argument(
+            "--choices",
+            default="3-5",
+            help="Choices per choice question (N or MIN-MAX)",
+        )
+        parser.add_argument("--players", type=int, default=10_000)
+        parser.add_argument(
+            "--attempts", default="0-10", help="Attempts per player (N or MIN-MAX)"
+        )
+        parser.add_argument(
+            "--questions-per-attempt", type=int, default=QUESTIONS_PER_ATTEMPT
+        )
+        parser.add_argument(
+            "--submitted", type=float, default=0.9, help="Share of submitted attempts"
+        )
+        parser.add_argument(
+            "--correct", type=float, default=0.6, help="Share of correct answers"
+        )
+        parser.add_argument(
+            "--days", type=float, default=90, help="Spread attempts over N days"
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processes inserting players/attempts (fork; best on PostgreSQL)",
+        )
+
+    def handle(self, *args, **options):
+        self.rnd = random.Random(f"{options['seed']}:bank")
+        qtypes = parse_weights(options["qtypes"], dict(Question.TYPE_CHOICES))
+        difficulties = parse_weights(
+            options["difficulties"], dict(Question.DIFF_CHOICES)
+        )
+        choices = parse_range(options["choices"])
+        self.check_fresh(options)
+
+        start = time.perf_counter()
+        category_ids = self.make_categories(options["categories"])
+        if options["questions"]:
+            n_choices = self.make_questions(
+                options, category_ids, qtypes, difficulties, choices
+            )
+            self.report("questions", options["questions"], start)
+            self.report("choices", n_choices, start)
+
+        self.load_bank()
+        if options["players"]:
+            if len(_bank) < options["questions_per_attempt"]:
+                raise CommandError("Not enough questions for an attempt")
+            t = time.perf_counter()
+            rows = self.make_attempts(options)
+            self.report("attempt questions", rows, t)
+            # rows were bulk inserted: derive the aggregates from them in one pass
+            call_command("rebuild_leaderboard", stdout=self.stdout)
+            call_command("rebuild_question_stats", stdout=self.stdout)
+        self.stdout.write(
+            self.style.SUCCESS(f"Done in {time.perf_counter() - start:.1f}s")
+        )
+
+    def check_fresh(self, options) -> None:
+        """Refuse to run a seed twice: players would collide on their UUIDs
+        and the bank would be duplicated."""
+        seed = options["seed"]
+        if (
+            options["questions"]
+            and Question.objects.filter(prompt=f"Synthetic question {seed}-0").exists()
+        ) or (
+            options["players"]
+            and Player.objects.filter(
+                player_uuid=player_uuid(shard_random(seed, 0))
+            ).exists()
+        ):
+            raise CommandError(
+                f"Data for --seed {seed} already exists; use another seed "
+                "or an empty database"
+            )
+
+    def report(self, label, count, since):
+        elapsed = time.perf_counter() - since or 1e-9
+        self.stdout.write(
+            f"{count:>10} {label:<18} {elapsed:7.1f}s {count / elapsed:>9.0f} rows/s"
+        )
+
+    # ---- question bank ----
+
+    def make_categories(self, n) -> List[int]:
+        names = [f"Synthetic {i:03d}" for i in range(n)]
+        Category.objects.bulk_create(
+            [Category(name=name) for name in names], ignore_conflicts=True
+        )
+        return list(
+            Category.objects.filter(name__in=names)
+            .order_by("name")
+            .values_list("id", flat=True)
+        )
+
+    def make_questions(self, options, category_ids, qtypes, difficulties, choices):
+        rnd, batch_size = self.rnd, options["batch_size"]
+        type_keys, type_weights = list(qtypes), list(qtypes.values())
+        diff_keys, diff_weights = list(difficulties), list(difficulties.values())
+        n_choices = 0
+        for offset in range(0, options["questions"], batch_size):
+            count = min(batch_size, options["questions"] - offset)
+            questions = []
+            for i in range(offset, offset + count):
+                qtype = rnd.choices(type_keys, type_weights)[0]
+                questions.append(
+                    Question(
+                        prompt=f"Synthetic question {options['seed']}-{i}",
+                        qtype=qtype,
+                        category_id=rnd.choice(category_ids) if category_ids else None,
+                        difficulty=rnd.choices(diff_keys, diff_weights)[0],
+                        text_answer=f"answer {i}" if qtype == Question.TEXT else None,
+                        numeric_answer=(
+                            float(rnd.randint(0, 1000))
+                            if qtype == Question.NUM
+                            else None
+                        ),
+                        image_required=qtype == Question.IMAGE,
+                    )
+                )
+            with transaction.atomic():
+                Question.objects.bulk_create(questions)
+                rows = []
+                for q in questions:
+                    if q.qtype not in (Question.SINGLE, Question.MULTI):
+                        continue
+                    n = rnd.randint(*choices)
+                    n_correct = 1 if q.qtype == Question.SINGLE else rnd.randint(1, n)
+                    correct = set(rnd.sample(range(n), n_correct))
+                    rows += [
+                        Choice(question=q, text=f"Choice {j}", is_correct=j in correct)
+                        for j in range(n)
+                    ]
+                Choice.objects.bulk_create(rows)
+                n_choices += len(rows)
+                texts = {}
+                for choice in rows:
+                    texts.setdefault(choice.question_id, []).append(choice.text)
+                search.index_rows(
+                    search.QUESTIONS,
+                    [
+                        (q.pk, search.question_document(q.prompt, texts.get(q.pk, ())))
+                        for q in questions
+                    ],
+                )
+                transaction.on_commit(bump_bank_version)  # bulk_create: no signals
+        return n_choices
+
+    def load_bank(self) -> None:
+        choice_ids: Dict[int, List[int]] = {}
+        correct_ids: Dict[int, List[int]] = {}
+        snapshots: Dict[int, list] = {}
+        for choice in (
+            Choice.objects.values_list(
+                "question_id", "id", "text", "is_correct", named=True
+            )
+            .order_by("id")
+            .iterator(chunk_size=10_000)
+        ):
+            choice_ids.setdefault(choice.question_id, []).append(choice.id)
+            snapshots.setdefault(choice.question_id, []).append(choice)
+            if choice.is_correct:
+                correct_ids.setdefault(choice.question_id, []).append(choice.id)
+        _bank[:] = [
+            BankQuestion(
+                pk,
+                qtype,
+                prompt,
+                text,
+                number,
+                choice_ids.get(pk, []),
+                correct_ids.get(pk, []),
+                json.dumps(choice_snapshot(snapshots.get(pk, ()))),
+            )
+            for pk, qtype, prompt, text, number in Question.objects.values_list(
+                "id", "qtype", "prompt", "text_answer", "numeric_answer"
+            )
+            .order_by("id")
+            .iterator(chunk_size=10_000)
+        ]
+
+    # ---- players and attempts ----
+
+    def make_attempts(self, options) -> int:
+        opts = {
+            "seed": options["seed"],
+            "batch_size": options["batch_size"],
+            "attempts": parse_range(options["attempts"]),
+            "k": options["questions_per_attempt"],
+            "submitted": options["submitted"],
+            "correct": options["correct"],
+            "days": options["days"],
+        }
+        players = options["players"]
+        tasks = [
+            (shard, min(SHARD_PLAYERS, players - shard * SHARD_PLAYERS), opts)
+            for shard in range(math.ceil(players / SHARD_PLAYERS))
+        ]
+        rows = 0
+        if options["workers"] <= 1:
+            for done, task in enumerate(tasks, 1):
+                rows += build_shard(task)
+                self.progress(done, len(tasks), rows)
+            return rows
+
+        connections.close_all()  # children must open their own
+        with ProcessPoolExecutor(
+            options["workers"], mp_context=multiprocessing.get_context("fork")
+        ) as pool:
+            for done, shard_rows in enumerate(pool.map(build_shard, tasks), 1):
+                rows += shard_rows
+                self.progress(done, len(tasks), rows)
+        return rows
+
+    def progress(self, done, total, rows):
+        if done % 10 == 0 or done == total:
+            self.stderr.write(
+                f"  {done}/{total} player shards, {rows} attempt questions"
+            )
@@ -0,0 +1,227 @@
+import csv
+import gzip
+import json
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework import serializers
+
+from quiz import search
+from quiz.models import Category, Choice, Question
+from quiz.serializers import QuestionImportSerializer
+from quiz.versioning import bump_bank_version
+
+CSV_COLUMNS = [
+    "prompt",
+    "qtype",
+    "category",
+    "difficulty",
+    "text_answer",
+    "numeric_answer",
+    "image_required",
+    "choices",
+]
+
+
+def parse_csv_choices(value: str) -> list:
+    """A JSON array, or ``a|*b|c`` where ``*`` marks the correct choices."""
+    value = value.strip()
+    if value.startswith("["):
+        return json.loads(value)
+    return [
+        {
+            "text": part[1:] if part.startswith("*") else part,
+            "is_correct": part.startswith("*"),
+        }
+        for part in value.split("|")
+        if part
+    ]
+
+
+def csv_record(row: Dict[str, str]) -> dict:
+    record = {k: (v if v != "" else None) for k, v in row.items() if k in CSV_COLUMNS}
+    if record.get("prompt") is None:
+        record["prompt"] = ""
+    if record.get("image_required") is None:
+        record.pop("image_required", None)
+    if record.get("choices"):
+        record["choices"] = parse_csv_choices(record["choices"])
+    else:
+        record.pop("choices", None)
+    return record
+
+
+class Command(BaseCommand):
+    help = "Import a question bank (JSONL or CSV, optionally .gz) in bulk batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format", choices=["jsonl", "csv"], help="Default: from the file name"
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--start-line",
+            type=int,
+            default=1,
+            help="Resume at this record (1-based, CSV header not counted)",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Validate only, write nothing"
+        )
+        parser.add_argument(
+            "--progress", type=int, default=10_000, help="Report every N records"
+        )
+
+    def handle(self, *args, **options):
+        for option in ("batch_size", "progress"):
+            if options[option] < 1:
+                name = option.replace("_", "-")
+                raise CommandError(f"--{name} must be at least 1")
+        path = options["path"]
+        fmt = options["format"] or (
+            "csv" if path.removesuffix(".gz").endswith(".csv") else "jsonl"
+        )
+        self.dry_run = options["dry_run"]
+        self.categories: Dict[str, int] = dict(
+            Category.objects.values_list("name", "id")
+        )
+        validator = QuestionImportSerializer()
+
+        batch: List[Tuple[int, dict]] = []
+        seen = imported = 0
+        errors: List[Tuple[int, str]] = []
+        self.committed_line = options["start_line"] - 1
+        start = time.perf_counter()
+
+        for line, record in self.records(path, fmt):
+            if line < options["start_line"]:
+                continue
+            seen += 1
+            try:
+                if isinstance(record, Exception):
+                    raise serializers.ValidationError(str(record))
+                batch.append((line, validator.run_validation(record)))
+            except serializers.ValidationError as exc:
+                errors.append((line, json.dumps(exc.detail, ensure_ascii=False)))
+            if len(batch) >= options["batch_size"]:
+                imported += self.flush(batch)
+                batch = []
+            if seen % options["progress"] == 0:
+                rate = seen / (time.perf_counter() - start)
+                resume = (
+                    ""
+                    if self.dry_run
+                    else f" (resume with --start-line {self.committed_line + 1})"
+                )
+                self.stderr.write(
+                    f"line {line}: {seen} read, {imported} imported, "
+                    f"{len(errors)} invalid, {rate:.0f} rows/s{resume}"
+                )
+        imported += self.flush(batch)
+        elapsed = time.perf_counter() - start or 1e-9
+
+        for line, message in errors[:20]:
+            self.stderr.write(f"line {line}: {message}")
+        if len(errors) > 20:
+            self.stderr.write(f"... and {len(errors) - 20} more invalid records")
+        verb = "validated" if self.dry_run else "imported"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{imported} questions {verb}, {len(errors)} invalid, "
+                f"{seen} records in {elapsed:.1f}s ({seen / elapsed:.0f} rows/s)"
+            )
+        )
+
+    def records(self, path: str, fmt: str) -> Iterator[Tuple[int, object]]:
+        """(record number, dict) pairs; malformed input yields an exception."""
+        opener = gzip.open if path.endswith(".gz") else open
+        try:
+            fh = opener(path, "rt", encoding="utf-8", newline="")
+        except OSError as exc:
+            raise CommandError(str(exc))
+        with fh:
+            if fmt == "csv":
+                reader = csv.DictReader(fh)
+                missing = {"prompt", "qtype"} - set(reader.fieldnames or ())
+                if missing:
+                    raise CommandError(f"CSV header lacks {sorted(missing)}")
+                for line, row in enumerate(reader, 1):
+                    try:
+                        yield line, csv_record(row)
+                    except ValueError as exc:
+                        yield line, exc
+            else:
+                for line, text in enumerate(fh, 1):
+                    if not text.strip():
+                        continue
+                    try:
+                        record = json.loads(text)
+                    except ValueError as exc:
+                        yield line, exc
+                        continue
+                    if not isinstance(record, dict):
+                        yield line, ValueError("expected a JSON object")
+                        continue
+                    yield line, record
+
+    def category_id(self, name: Optional[str]) -> Optional[int]:
+        return self.categories.get(name) if name else None
+
+    def flush(self, batch: List[Tuple[int, dict]]) -> int:
+        if not batch or self.dry_run:
+            return len(batch)
+        with transaction.atomic():
+            new_names = {
+                attrs["category"]
+                for _, attrs in batch
+                if attrs.get("category") and attrs["category"] not in self.categories
+            }
+            if new_names:
+                Category.objects.bulk_create(
+                    [Category(name=name) for name in new_names], ignore_conflicts=True
+                )
+                self.categories.update(
+                    Category.objects.filter(name__in=new_names).values_list(
+                        "name", "id"
+                    )
+                )
+
+            questions, choice_rows = [], []
+            for _, attrs in batch:
+                choices = attrs.pop("choices", None) or []
+                category = attrs.pop("category", None)
+                question = Question(category_id=self.category_id(category), **attrs)
+                questions.append(question)
+                choice_rows.append(choices)
+            # bulk_create sets the new primary keys (PostgreSQL, SQLite 3.35+)
+            Question.objects.bulk_create(questions)
+            Choice.objects.bulk_create(
+                [
+                    Choice(
+                        question=question,
+                        text=choice["text"],
+                        is_correct=choice.get("is_correct", False),
+                    )
+                    for question, choices in zip(questions, choice_rows)
+                    for choice in choices
+                ]
+            )
+            # bulk_create sends no signals
+            search.index_rows(
+                search.QUESTIONS,
+                [
+                    (
+                        question.pk,
+                        search.question_document(
+                            question.prompt, [c["text"] for c in choices]
+                        ),
+                    )
+                    for question, choices in zip(questions, choice_rows)
+                ],
+            )
+            transaction.on_commit(bump_bank_version)
+        self.committed_line = batch[-1][0]
+        return len(batch)
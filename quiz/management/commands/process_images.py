@@ -0,0 +1,37 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from quiz.images import image_pipeline
+from quiz.models import AttemptQuestion
+
+
+class Command(BaseCommand):
+    help = (
+        "Process answer images still pending, e.g. queued by a process that "
+        "exited before its pipeline drained"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+
+    def handle(self, *args, **options):
+        names = list(
+            AttemptQuestion.objects.filter(image_status=AttemptQuestion.IMAGE_PENDING)
+            .values_list("image", flat=True)
+            .distinct()
+        )
+        counts = {}
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options["workers"]) as pool:
+            for status in pool.map(image_pipeline.process, names):
+                counts[status or "gone"] = counts.get(status or "gone", 0) + 1
+        elapsed = time.perf_counter() - start
+        summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(names)} images processed in {elapsed:.1f}s"
+                + (f" ({summary})" if summary else "")
+            )
+        )
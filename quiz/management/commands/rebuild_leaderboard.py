@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from quiz import leaderboard
+
+
+class Command(BaseCommand):
+    help = "Recompute the leaderboard aggregates from submitted attempts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        players, categories = leaderboard.rebuild(options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {players} player rows and {categories} category rows "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+        )
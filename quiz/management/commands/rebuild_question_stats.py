@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+
+from quiz import stats
+from quiz.models import Question
+
+
+class Command(BaseCommand):
+    help = "Recompute per-question counters from attempt history"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Questions per transaction (each one scans their answers)",
+        )
+
+    def handle(self, *args, **options):
+        start, chunk = time.perf_counter(), options["chunk_size"]
+        bounds = Question.objects.aggregate(first=Min("id"), last=Max("id"))
+        rows = 0
+        if bounds["first"] is not None:
+            for first in range(bounds["first"], bounds["last"] + 1, chunk):
+                rows += stats.rebuild_range(first, first + chunk - 1)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt stats for {rows} questions "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+        )
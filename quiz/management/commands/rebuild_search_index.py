@@ -0,0 +1,85 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from quiz import search
+from quiz.models import AttemptQuestion, Choice, Question
+
+
+class Command(BaseCommand):
+    help = "Drop and rebuild the full-text search index (questions and answers)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        db, batch_size = options["database"], options["batch_size"]
+        connection = connections[db]
+        start = time.perf_counter()
+        with transaction.atomic(using=db):
+            search.drop_tables(connection)
+            if not search.create_tables(connection):
+                raise CommandError(
+                    f"No full-text support on {connection.vendor}; "
+                    "the admin and API keep LIKE search"
+                )
+            questions = self.index_questions(db, batch_size)
+            answers = self.index_answers(db, batch_size)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {questions} questions and {answers} text answers "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+        )
+
+    def index_questions(self, db, batch_size) -> int:
+        total = 0
+        rows = Question.objects.using(db).order_by("id").values_list("id", "prompt")
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                total += self.flush_questions(db, batch)
+                batch = []
+        return total + self.flush_questions(db, batch)
+
+    def flush_questions(self, db, batch) -> int:
+        if not batch:
+            return 0
+        texts = {}
+        for question_id, text in (
+            Choice.objects.using(db)
+            .filter(question_id__gte=batch[0][0], question_id__lte=batch[-1][0])
+            .order_by("id")
+            .values_list("question_id", "text")
+        ):
+            texts.setdefault(question_id, []).append(text)
+        search.index_rows(
+            search.QUESTIONS,
+            [
+                (pk, search.question_document(prompt, texts.get(pk, ())))
+                for pk, prompt in batch
+            ],
+            db,
+        )
+        return len(batch)
+
+    def index_answers(self, db, batch_size) -> int:
+        rows = (
+            AttemptQuestion.objects.using(db)
+            .exclude(text_response__isnull=True)
+            .exclude(text_response="")
+            .order_by("id")
+            .values_list("id", "text_response")
+        )
+        total, batch = 0, []
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                search.index_rows(search.ANSWERS, batch, db)
+                total += len(batch)
+                batch = []
+        search.index_rows(search.ANSWERS, batch, db)
+        return total + len(batch)
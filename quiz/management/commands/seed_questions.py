@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 
+from quiz import search
 from quiz.models import Category, Choice, Question
 
 
@@ -117,4 +118,6 @@ class Command(BaseCommand):
             text_answer="Earth",
         )
 
+        # choices above are bulk-created, which sends no signals
+        search.index_questions(Question.objects.values_list("id", flat=True))
         self.stdout.write(self.style.SUCCESS("Seeded 10 questions."))
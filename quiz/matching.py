@@ -0,0 +1,142 @@
+# quiz/matching.py
+import hashlib
+import threading
+import time
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Dict, Hashable, Optional
+
+from django.conf import settings
+
+from .cache import LRUCache
+
+DEFAULT_THRESHOLD = 0.85
+
+
+def norm_text(s: str) -> str:
+    s = unicodedata.normalize("NFKC", s.strip().lower())
+    return " ".join(s.split())
+
+
+class TextMatcher:
+    """Fuzzy text-answer matcher with bounded cost.
+
+    Verdicts are identical to ``SequenceMatcher(None, norm(a), norm(b))
+    .ratio() >= threshold``; the cheaper upper bounds (length, then
+    ``quick_ratio``) only ever short-circuit a rejection. Responses longer
+    than ``max_input`` characters are rejected without being compared.
+    Verdicts are cached under a 16-byte digest of the compared texts, so
+    the cache costs the same per entry however long the answers are.
+    """
+
+    def __init__(self, max_input: int = 4096, cache_size: int = 50_000):
+        self.max_input = max_input
+        self._answers = LRUCache(cache_size // 10)
+        self._verdicts = LRUCache(cache_size)
+        self._counts: Dict[str, int] = dict.fromkeys(
+            ("calls", "oversize", "length_rejects", "quick_rejects", "full_ratio"), 0
+        )
+        self._ratio_ns = 0
+        self._total_ns = 0
+        self._lock = threading.Lock()  # counters, from every request thread
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    @staticmethod
+    def _verdict_key(a: str, b: str, threshold: float) -> bytes:
+        # the length prefix keeps ("ab", "c") and ("a", "bc") apart
+        text = f"{threshold!r}:{len(a)}:{a}{b}"
+        return hashlib.blake2b(
+            text.encode("utf-8", "surrogatepass"), digest_size=16
+        ).digest()
+
+    def answer_key(self, answer: str, key: Optional[Hashable] = None) -> str:
+        """Normalized answer, cached per question (``key``) or per text."""
+        cache_key = ("q", key) if key is not None else ("t", answer)
+        entry = self._answers.get(cache_key)
+        if entry is not None and entry[0] == answer:
+            return entry[1]
+        normalized = norm_text(answer)
+        self._answers.put(cache_key, (answer, normalized))
+        return normalized
+
+    def match(
+        self,
+        response: str,
+        answer: str,
+        threshold: float = DEFAULT_THRESHOLD,
+        key: Optional[Hashable] = None,
+    ) -> bool:
+        start = time.perf_counter_ns()
+        self._count("calls")
+        try:
+            if len(response) > self.max_input:
+                self._count("oversize")
+                return False
+            a = norm_text(response)
+            b = self.answer_key(answer, key)
+            cache_key = self._verdict_key(a, b, threshold)
+            verdict = self._verdicts.get(cache_key)
+            if verdict is None:
+                verdict = self._compare(a, b, threshold)
+                self._verdicts.put(cache_key, verdict)
+            return verdict
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            with self._lock:
+                self._total_ns += elapsed
+
+    def _compare(self, a: str, b: str, threshold: float) -> bool:
+        la, lb = len(a), len(b)
+        # same arithmetic as SequenceMatcher.real_quick_ratio()
+        if la + lb and 2.0 * min(la, lb) / (la + lb) < threshold:
+            self._count("length_rejects")
+            return False
+        sm = SequenceMatcher(None, a, b)
+        if sm.quick_ratio() < threshold:
+            self._count("quick_rejects")
+            return False
+        self._count("full_ratio")
+        start = time.perf_counter_ns()
+        try:
+            return sm.ratio() >= threshold
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            with self._lock:
+                self._ratio_ns += elapsed
+
+    def stats(self) -> dict:
+        def rate(lru: LRUCache) -> Optional[float]:
+            lookups = lru.hits + lru.misses
+            return lru.hits / lookups if lookups else None
+
+        with self._lock:
+            counts = dict(self._counts)
+            ratio_ns, total_ns = self._ratio_ns, self._total_ns
+        calls = counts["calls"]
+        return {
+            **counts,
+            "verdict_cache_size": len(self._verdicts),
+            "verdict_hit_rate": rate(self._verdicts),
+            "answer_key_hit_rate": rate(self._answers),
+            "avg_match_us": total_ns / calls / 1000 if calls else None,
+            "avg_full_ratio_us": (
+                ratio_ns / counts["full_ratio"] / 1000 if counts["full_ratio"] else None
+            ),
+        }
+
+    def reset(self) -> None:
+        self._answers.clear()
+        self._verdicts.clear()
+        with self._lock:
+            for name in self._counts:
+                self._counts[name] = 0
+            self._ratio_ns = self._total_ns = 0
+
+
+text_matcher = TextMatcher(
+    max_input=getattr(settings, "QUIZ_TEXT_MATCH_MAX_INPUT", 4096),
+    cache_size=getattr(settings, "QUIZ_TEXT_MATCH_CACHE_SIZE", 50_000),
+)
@@ -0,0 +1,194 @@
+# quiz/middleware.py
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+# ---------- Rolling per-view aggregates ----------
+
+
+class ViewStats:
+    """Cumulative totals plus a rolling window of recent requests per view."""
+
+    def __init__(self, window: int):
+        self._lock = threading.Lock()
+        self._window = window
+        self._views: Dict[str, dict] = {}
+
+    def record(self, view, total_ms, db_ms, queries, render_ms, serialize_ms, slowest):
+        with self._lock:
+            s = self._views.get(view)
+            if s is None:
+                s = self._views[view] = {
+                    "requests": 0,
+                    "total_ms": 0.0,
+                    "db_ms": 0.0,
+                    "queries": 0,
+                    "render_ms": 0.0,
+                    "serialize_ms": 0.0,
+                    "max_ms": 0.0,
+                    "slowest_sql": None,
+                    "recent": deque(maxlen=self._window),
+                }
+            s["requests"] += 1
+            s["total_ms"] += total_ms
+            s["db_ms"] += db_ms
+            s["queries"] += queries
+            s["render_ms"] += render_ms
+            s["serialize_ms"] += serialize_ms
+            s["max_ms"] = max(s["max_ms"], total_ms)
+            s["recent"].append(total_ms)
+            if slowest and (
+                s["slowest_sql"] is None or slowest[0] > s["slowest_sql"]["ms"]
+            ):
+                s["slowest_sql"] = {"ms": slowest[0], "sql": slowest[1][:500]}
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            out = {}
+            for view, s in self._views.items():
+                n = s["requests"]
+                recent = sorted(s["recent"])
+                out[view] = {
+                    "requests": n,
+                    "avg_ms": s["total_ms"] / n,
+                    "avg_db_ms": s["db_ms"] / n,
+                    "avg_queries": s["queries"] / n,
+                    "avg_render_ms": s["render_ms"] / n,
+                    "avg_serialize_ms": s["serialize_ms"] / n,
+                    "max_ms": s["max_ms"],
+                    "recent_p50_ms": recent[len(recent) // 2],
+                    "recent_p95_ms": recent[int(len(recent) * 0.95)],
+                    "slowest_sql": s["slowest_sql"],
+                }
+            return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._views.clear()
+
+
+view_stats = ViewStats(window=getattr(settings, "QUIZ_PROFILING_WINDOW", 1000))
+
+
+# ---------- Middleware ----------
+
+# the profiled request's timings, for code that never sees the request
+_current: ContextVar[Optional[dict]] = ContextVar("quiz_profiling", default=None)
+
+
+class SerializationTimer:
+    """Serializer mixin: time spent in ``to_representation`` goes to the
+    profiled request's ``serialize`` metric.
+
+    Only the outermost call is timed, so nested and ``many=True``
+    serializers add up to the time spent serializing, counted once. Lazy
+    queries fired while serializing also count in ``db``.
+    """
+
+    def to_representation(self, instance):
+        prof = _current.get()
+        if prof is None or prof["serializing"]:
+            return super().to_representation(instance)
+        prof["serializing"] = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            prof["serialize_ms"] += (time.perf_counter() - start) * 1000
+            prof["serializing"] = False
+
+
+class _QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest: Optional[tuple] = None  # (ms, sql)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            self.count += 1
+            self.total += ms
+            if self.slowest is None or ms > self.slowest[0]:
+                self.slowest = (ms, sql)
+
+
+class ProfilingMiddleware:
+    """Per-request SQL/timing instrumentation, emitted as ``Server-Timing``.
+
+    Enabled with ``QUIZ_PROFILING = True``; otherwise Django drops the
+    middleware at startup and requests pay nothing.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUIZ_PROFILING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = _QueryRecorder()
+        prof = request._profiling = {
+            "view": None,
+            "render_ms": 0.0,
+            "serialize_ms": 0.0,
+            "serializing": False,
+        }
+        token = _current.set(prof)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(recorder))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={recorder.total:.2f};desc="{recorder.count} queries"',
+                f"serialize;dur={prof['serialize_ms']:.2f}",
+                f"render;dur={prof['render_ms']:.2f}",
+                f"slowest-sql;dur={recorder.slowest[0] if recorder.slowest else 0:.2f}",
+                f"total;dur={total_ms:.2f}",
+            ]
+        )
+        if prof["view"]:
+            view_stats.record(
+                prof["view"],
+                total_ms,
+                recorder.total,
+                recorder.count,
+                prof["render_ms"],
+                prof["serialize_ms"],
+                recorder.slowest,
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "view_class", None) or getattr(
+            view_func, "cls", None
+        )
+        request._profiling["view"] = (
+            view_class.__name__ if view_class else view_func.__name__
+        )
+
+    def process_template_response(self, request, response):
+        # DRF responses render after this hook; time that render pass
+        start = time.perf_counter()
+
+        def done(rendered):
+            request._profiling["render_ms"] = (time.perf_counter() - start) * 1000
+
+        response.add_post_render_callback(done)
+        return response
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="attempt",
+            index=models.Index(
+                fields=["player", "-created_at", "-id"],
+                name="attempt_player_recent_idx",
+            ),
+        ),
+    ]
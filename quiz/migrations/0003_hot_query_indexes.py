@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0002_attempt_player_recent_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="choice",
+            index=models.Index(
+                fields=["question", "is_correct"], name="choice_question_correct_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="question",
+            index=models.Index(
+                fields=["category", "difficulty", "qtype"], name="question_stratum_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0003_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attempt",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("started", "Started"),
+                    ("submitted", "Submitted"),
+                    ("expired", "Expired"),
+                ],
+                default="started",
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="attempt",
+            name="submitted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:51
+
+from django.db import migrations, models
+
+import quiz.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0004_attempt_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImageBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, unique=True)),
+                ("refs", models.IntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="attemptquestion",
+            name="image",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=quiz.storage.ContentAddressedStorage(),
+                upload_to="answers/",
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0005_image_blobs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attemptquestion",
+            name="image_size",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="attemptquestion",
+            name="image_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("pending", "Pending"),
+                    ("ready", "Ready"),
+                    ("invalid", "Invalid"),
+                ],
+                default="",
+                max_length=10,
+            ),
+        ),
+    ]
@@ -0,0 +1,119 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:40
+
+from django.db import migrations, transaction
+
+# The index tables as quiz/search.py creates them at this point; frozen
+# here so the migration never depends on the runtime module.
+QUESTIONS = "quiz_question_fts"
+ANSWERS = "quiz_answer_fts"
+BATCH_SIZE = 2000
+
+CREATE = {
+    "sqlite": [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+        "USING fts5(body, tokenize = 'unicode61 remove_diacritics 2')"
+        for table in (QUESTIONS, ANSWERS)
+    ],
+    "postgresql": [
+        sql
+        for table in (QUESTIONS, ANSWERS)
+        for sql in (
+            f"CREATE TABLE IF NOT EXISTS {table} "
+            "(id bigint PRIMARY KEY, body tsvector NOT NULL)",
+            f"CREATE INDEX IF NOT EXISTS {table}_body_idx "
+            f"ON {table} USING GIN (body)",
+        )
+    ],
+}
+UPSERT = {
+    "sqlite": "INSERT OR REPLACE INTO {} (rowid, body) VALUES (%s, %s)",
+    "postgresql": "INSERT INTO {} (id, body) VALUES (%s, to_tsvector('simple', %s)) "
+    "ON CONFLICT (id) DO UPDATE SET body = EXCLUDED.body",
+}
+
+
+def create_tables(connection) -> bool:
+    statements = CREATE.get(connection.vendor)
+    if statements is None:
+        return False
+    try:
+        # a savepoint, so a failure leaves the migration's transaction usable
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+    except Exception:
+        if connection.vendor != "sqlite":
+            raise
+        return False  # SQLite compiled without FTS5
+    return True
+
+
+def batches(queryset):
+    """Rows of a ``values_list("id", ...)`` queryset, in keyset batches."""
+    last = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last).order_by("pk")[:BATCH_SIZE])
+        if not batch:
+            return
+        yield batch
+        last = batch[-1][0]
+
+
+def create_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if not create_tables(connection):
+        return  # no full-text support: the admin and API keep LIKE search
+    Question = apps.get_model("quiz", "Question")
+    Choice = apps.get_model("quiz", "Choice")
+    AttemptQuestion = apps.get_model("quiz", "AttemptQuestion")
+    db = connection.alias
+    upsert = UPSERT[connection.vendor]
+
+    with connection.cursor() as cursor:
+        for batch in batches(Question.objects.using(db).values_list("id", "prompt")):
+            texts = {}
+            for question_id, text in (
+                Choice.objects.using(db)
+                .filter(question_id__gte=batch[0][0], question_id__lte=batch[-1][0])
+                .order_by("id")
+                .values_list("question_id", "text")
+            ):
+                texts.setdefault(question_id, []).append(text)
+            documents = [
+                (pk, "\n".join([prompt or "", *texts.get(pk, ())]))
+                for pk, prompt in batch
+            ]
+            cursor.executemany(
+                upsert.format(QUESTIONS),
+                [(pk, text) for pk, text in documents if text.strip()],
+            )
+
+        answers = (
+            AttemptQuestion.objects.using(db)
+            .exclude(text_response__isnull=True)
+            .exclude(text_response="")
+            .values_list("id", "text_response")
+        )
+        for batch in batches(answers):
+            cursor.executemany(
+                upsert.format(ANSWERS),
+                [(pk, text) for pk, text in batch if text.strip()],
+            )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor in CREATE:
+        with schema_editor.connection.cursor() as cursor:
+            for table in (QUESTIONS, ANSWERS):
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0006_answer_image_status"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
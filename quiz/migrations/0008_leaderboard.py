@@ -0,0 +1,90 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0007_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlayerStats",
+            fields=[
+                (
+                    "player",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="quiz.player",
+                    ),
+                ),
+                ("best_score", models.IntegerField(default=0)),
+                ("attempts", models.IntegerField(default=0)),
+                ("correct", models.IntegerField(default=0)),
+                ("answered", models.IntegerField(default=0)),
+                ("last_played_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name_plural": "player stats",
+                "indexes": [
+                    models.Index(
+                        fields=["-best_score", "-correct", "player"],
+                        name="leaderboard_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="CategoryStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("correct", models.IntegerField(default=0)),
+                ("answered", models.IntegerField(default=0)),
+                ("last_played_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="player_stats",
+                        to="quiz.category",
+                    ),
+                ),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="category_stats",
+                        to="quiz.player",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "category stats",
+                "indexes": [
+                    models.Index(
+                        fields=["category", "-correct", "player"],
+                        name="category_leaderboard_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("player", "category"), name="category_stats_unique"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-17 22:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0008_leaderboard"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuestionStats",
+            fields=[
+                (
+                    "question",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="quiz.question",
+                    ),
+                ),
+                ("served", models.IntegerField(default=0)),
+                ("answered", models.IntegerField(default=0)),
+                ("correct", models.IntegerField(default=0)),
+                ("responses", models.IntegerField(default=0)),
+                ("response_chars", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "question stats",
+            },
+        ),
+    ]
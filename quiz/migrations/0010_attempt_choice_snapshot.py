@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0009_question_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attemptquestion",
+            name="choices",
+            field=models.JSONField(default=list),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.5 on 2026-10-17 22:41
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 2000
+
+
+def backfill_choices(apps, schema_editor):
+    """Snapshot choices into existing attempt questions, one batch per
+    transaction. Older attempts get the choices as they are now: what they
+    were shown at the time is no longer recorded anywhere."""
+    AttemptQuestion = apps.get_model("quiz", "AttemptQuestion")
+    Choice = apps.get_model("quiz", "Choice")
+    db = schema_editor.connection.alias
+    last = 0
+    while True:
+        with transaction.atomic(using=db):
+            batch = list(
+                AttemptQuestion.objects.using(db)
+                .filter(pk__gt=last)
+                .order_by("pk")
+                .only("id", "question_id")[:BATCH_SIZE]
+            )
+            if not batch:
+                return
+            last = batch[-1].pk
+            snapshots = {}
+            for question_id, pk, text, is_correct in (
+                Choice.objects.using(db)
+                .filter(question_id__in={aq.question_id for aq in batch})
+                .order_by("id")
+                .values_list("question_id", "id", "text", "is_correct")
+            ):
+                snapshots.setdefault(question_id, []).append(
+                    {"id": pk, "text": text, "is_correct": is_correct}
+                )
+            changed = []
+            for aq in batch:
+                if aq.question_id in snapshots:
+                    aq.choices = snapshots[aq.question_id]
+                    changed.append(aq)
+            AttemptQuestion.objects.using(db).bulk_update(changed, ["choices"])
+
+
+class Migration(migrations.Migration):
+    # each batch commits on its own: a large table is never held in one
+    # transaction, and a rerun after an interruption is harmless
+    atomic = False
+
+    dependencies = [
+        ("quiz", "0010_attempt_choice_snapshot"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_choices, migrations.RunPython.noop),
+    ]
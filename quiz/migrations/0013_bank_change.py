@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:20
+
+import time
+
+from django.db import migrations, models
+
+
+def initial_version(apps, schema_editor):
+    """Start the history with a full-reload marker, so every version a
+    process loads from is recorded and later bumps apply incrementally."""
+    BankChange = apps.get_model("quiz", "BankChange")
+    BankChange.objects.using(schema_editor.connection.alias).create(
+        version=time.time_ns() // 1000, question_ids=None
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0011_backfill_choice_snapshots"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BankChange",
+            fields=[
+                ("version", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("question_ids", models.JSONField(null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunPython(initial_version, migrations.RunPython.noop),
+    ]
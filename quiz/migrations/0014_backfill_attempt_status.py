@@ -0,0 +1,54 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:40
+
+from django.db import migrations, transaction
+from django.db.models import Exists, F, OuterRef, Q
+
+BATCH_SIZE = 2000
+
+
+def mark_submitted(apps, schema_editor):
+    """0004 left every older attempt "started", so they could be submitted
+    again and would later read as expired. Those with a score or any
+    recorded answer were submitted: mark them so, dated at their start
+    (the submit time was never recorded). Attempts started since 0004 have
+    no answers until their submit sets the status, and are left alone."""
+    Attempt = apps.get_model("quiz", "Attempt")
+    AttemptQuestion = apps.get_model("quiz", "AttemptQuestion")
+    db = schema_editor.connection.alias
+    answered = AttemptQuestion.objects.using(db).filter(
+        Q(text_response__isnull=False)
+        | Q(numeric_response__isnull=False)
+        | ~Q(selected_choice_ids=[])
+        | Q(image__gt=""),
+        attempt=OuterRef("pk"),
+    )
+    legacy = (
+        Attempt.objects.using(db)
+        .filter(status="started", submitted_at=None)
+        .filter(Q(score__gt=0) | Exists(answered))
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    last = 0
+    while True:
+        with transaction.atomic(using=db):
+            ids = list(legacy.filter(pk__gt=last)[:BATCH_SIZE])
+            if not ids:
+                return
+            last = ids[-1]
+            Attempt.objects.using(db).filter(pk__in=ids).update(
+                status="submitted", submitted_at=F("created_at")
+            )
+
+
+class Migration(migrations.Migration):
+    # one transaction per batch, as in 0011; a rerun only finds what is left
+    atomic = False
+
+    dependencies = [
+        ("quiz", "0013_bank_change"),
+    ]
+
+    operations = [
+        migrations.RunPython(mark_submitted, migrations.RunPython.noop),
+    ]
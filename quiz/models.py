@@ -1,6 +1,12 @@
 import uuid
+from collections import Counter
+from typing import Optional
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+
+from .storage import answer_storage
+from .thumbnails import thumbnails
 
 
 class Category(models.Model):
@@ -38,6 +44,15 @@ class Question(models.Model):
     numeric_answer = models.FloatField(null=True, blank=True)
     image_required = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # stratified draws and the question pool rebuild (covering scan)
+            models.Index(
+                fields=["category", "difficulty", "qtype"],
+                name="question_stratum_idx",
+            ),
+        ]
+
 
 class Choice(models.Model):
     question = models.ForeignKey(
@@ -46,21 +61,58 @@ class Choice(models.Model):
     text = models.CharField(max_length=255)
     is_correct = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["question", "is_correct"], name="choice_question_correct_idx"
+            ),
+        ]
+
 
 class Player(models.Model):
     player_uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
 
 
 class Attempt(models.Model):
+    STARTED = "started"
+    SUBMITTED = "submitted"
+    EXPIRED = "expired"
+    STATUS_CHOICES = [
+        (STARTED, "Started"),
+        (SUBMITTED, "Submitted"),
+        (EXPIRED, "Expired"),
+    ]
+
     player = models.ForeignKey(
         Player, related_name="attempts", on_delete=models.CASCADE
     )
     created_at = models.DateTimeField(auto_now_add=True)
     score = models.IntegerField(default=0)
     total = models.IntegerField(default=5)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STARTED)
+    submitted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # attempt history: WHERE player_id = ? ORDER BY created_at DESC, id DESC
+            models.Index(
+                fields=["player", "-created_at", "-id"],
+                name="attempt_player_recent_idx",
+            ),
+        ]
 
 
 class AttemptQuestion(models.Model):
+    # answer image processing, see quiz/images.py
+    IMAGE_PENDING = "pending"
+    IMAGE_READY = "ready"
+    IMAGE_INVALID = "invalid"
+    IMAGE_STATUS_CHOICES = [
+        (IMAGE_PENDING, "Pending"),
+        (IMAGE_READY, "Ready"),
+        (IMAGE_INVALID, "Invalid"),
+    ]
+
     attempt = models.ForeignKey(
         Attempt, related_name="attempt_questions", on_delete=models.CASCADE
     )
@@ -69,7 +121,151 @@ class AttemptQuestion(models.Model):
     qtype = models.CharField(max_length=10)
     text_response = models.TextField(null=True, blank=True)
     numeric_response = models.FloatField(null=True, blank=True)
-    image = models.ImageField(upload_to="answers/", null=True, blank=True)
+    image = models.ImageField(
+        upload_to="answers/", storage=answer_storage, null=True, blank=True
+    )
+    image_status = models.CharField(
+        max_length=10, choices=IMAGE_STATUS_CHOICES, blank=True, default=""
+    )
+    image_size = models.PositiveIntegerField(null=True, blank=True)
     selected_choice_ids = models.JSONField(default=list)
     is_correct = models.BooleanField(default=False)
     correct_choice_ids = models.JSONField(default=list)
+    # [{"id", "text", "is_correct"}, ...] as the question had them at start,
+    # so reads never join back into Question/Choice and survive bank edits
+    choices = models.JSONField(default=list)
+
+
+def _delete_blobs(names) -> None:
+    for name in names:
+        answer_storage.delete(name)
+        thumbnails.discard(name)
+
+
+class ImageBlobManager(models.Manager):
+    def retain(self, names) -> None:
+        """Add one reference per occurrence of each stored name."""
+        counts = Counter(name for name in names if name)
+        if not counts:
+            return
+        self.bulk_create(
+            [ImageBlob(name=name) for name in counts], ignore_conflicts=True
+        )
+        for name, n in counts.items():
+            self.filter(name=name).update(refs=F("refs") + n)
+
+    def release(self, names) -> None:
+        """Drop references; unreferenced blobs are deleted after commit."""
+        counts = Counter(name for name in names if name)
+        if not counts:
+            return
+        for name, n in counts.items():
+            self.filter(name=name).update(refs=F("refs") - n)
+        orphans = self.filter(name__in=counts, refs__lte=0)
+        names = list(orphans.values_list("name", flat=True))
+        if names:
+            orphans.filter(name__in=names).delete()
+            transaction.on_commit(lambda: _delete_blobs(names))
+
+
+class ImageBlob(models.Model):
+    """Reference count for a file in ``answer_storage``.
+
+    Names without a row (files stored before refcounting) are never deleted.
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+    refs = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ImageBlobManager()
+
+    def __str__(self):
+        return f"{self.name} ({self.refs})"
+
+
+class PlayerStats(models.Model):
+    """Leaderboard aggregates, updated by each submit (quiz/leaderboard.py)."""
+
+    player = models.OneToOneField(
+        Player, primary_key=True, related_name="stats", on_delete=models.CASCADE
+    )
+    best_score = models.IntegerField(default=0)
+    attempts = models.IntegerField(default=0)  # submitted attempts
+    correct = models.IntegerField(default=0)
+    answered = models.IntegerField(default=0)
+    last_played_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "player stats"
+        indexes = [
+            # top-N and rank: ORDER BY best_score DESC, correct DESC, player_id
+            models.Index(
+                fields=["-best_score", "-correct", "player"], name="leaderboard_idx"
+            ),
+        ]
+
+
+class CategoryStats(models.Model):
+    """Per-category answers of a player, ranked by correct answers."""
+
+    player = models.ForeignKey(
+        Player, related_name="category_stats", on_delete=models.CASCADE
+    )
+    category = models.ForeignKey(
+        Category, related_name="player_stats", on_delete=models.CASCADE
+    )
+    correct = models.IntegerField(default=0)
+    answered = models.IntegerField(default=0)
+    last_played_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "category stats"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["player", "category"], name="category_stats_unique"
+            ),
+        ]
+        indexes = [
+            # ORDER BY correct DESC, player_id within one category
+            models.Index(
+                fields=["category", "-correct", "player"],
+                name="category_leaderboard_idx",
+            ),
+        ]
+
+
+class QuestionStats(models.Model):
+    """Running per-question counters, updated by start and submit
+    (quiz/stats.py); ``manage.py rebuild_question_stats`` recomputes them."""
+
+    question = models.OneToOneField(
+        Question, primary_key=True, related_name="stats", on_delete=models.CASCADE
+    )
+    served = models.IntegerField(default=0)  # drawn into an attempt
+    answered = models.IntegerField(default=0)  # in a submitted attempt
+    correct = models.IntegerField(default=0)
+    responses = models.IntegerField(default=0)  # non-empty text responses
+    response_chars = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "question stats"
+
+    @property
+    def correct_rate(self) -> Optional[float]:
+        return self.correct / self.answered if self.answered else None
+
+    @property
+    def avg_response_length(self) -> Optional[float]:
+        return self.response_chars / self.responses if self.responses else None
+
+
+class BankChange(models.Model):
+    """One question-bank version (quiz/versioning.py), shared by every
+    process through the database; the newest row is the current version."""
+
+    version = models.BigIntegerField(primary_key=True)
+    # questions whose category, difficulty or type may have changed;
+    # null when anything may have (bulk writes)
+    question_ids = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
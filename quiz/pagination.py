@@ -0,0 +1,147 @@
+# quiz/pagination.py
+import base64
+import hashlib
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class AttemptCursorPagination(BasePagination):
+    """Keyset pagination over ``(created_at, id)``, newest first.
+
+    Each page is an index range scan that starts after the previous page's
+    last row, so page 10,000 costs the same as page 1, and attempts
+    inserted meanwhile never shift rows between pages.
+    """
+
+    page_size = 50
+    max_page_size = 200
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    ordering = ("-created_at", "-id")
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, obj) -> str:
+        raw = f"{obj.created_at.isoformat()}|{obj.pk}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+            created_at, pk = raw.decode().split("|")
+            return datetime.fromisoformat(created_at), int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound("Invalid cursor")
+
+    @staticmethod
+    def filter_after(queryset, created_at, pk):
+        """Rows strictly after (created_at, pk) in the page ordering."""
+        # the lte bound keeps the row-value comparison an index range scan
+        return queryset.filter(created_at__lte=created_at).filter(
+            Q(created_at__lt=created_at) | Q(id__lt=pk)
+        )
+
+    def _window(self, queryset, request):
+        self.request = request
+        self.size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            queryset = self.filter_after(queryset, *cursor)
+        # one extra row tells us whether there is a next page
+        return queryset.order_by(*self.ordering)[: self.size + 1]
+
+    def _page(self, rows):
+        size = self.size
+        self.next_cursor = (
+            self.encode_cursor(rows[size - 1]) if len(rows) > size else None
+        )
+        return rows[:size]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self._page(list(self._window(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request):
+        return self._page([row async for row in self._window(queryset, request)])
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class EstimatedCountPaginator(Paginator):
+    """Admin paginator that avoids an exact ``COUNT(*)`` on large tables.
+
+    An unfiltered changelist on PostgreSQL uses the planner's row estimate
+    (``pg_class.reltuples``). Otherwise the exact count is cached for
+    ``QUIZ_ADMIN_COUNT_TIMEOUT`` seconds per query. Results below
+    ``QUIZ_ADMIN_EXACT_COUNT_BELOW`` rows are always counted exactly, so
+    small tables never show stale totals.
+    """
+
+    exact_below = getattr(settings, "QUIZ_ADMIN_EXACT_COUNT_BELOW", 10_000)
+    timeout = getattr(settings, "QUIZ_ADMIN_COUNT_TIMEOUT", 60)
+
+    @cached_property
+    def count(self) -> int:
+        qs = self.object_list
+        if not isinstance(qs, QuerySet):
+            return super().count
+        estimate = self.estimate(qs)
+        if estimate is not None and estimate >= self.exact_below:
+            return estimate
+        sql, params = qs.query.sql_with_params()
+        digest = hashlib.md5(f"{qs.db}|{sql}|{params!r}".encode()).hexdigest()
+        key = f"quiz:admin-count:{digest}"
+        count = cache.get(key)
+        if count is None or count < self.exact_below:
+            count = qs.count()
+            if count >= self.exact_below:
+                cache.set(key, count, self.timeout)
+        return count
+
+    @staticmethod
+    def estimate(qs):
+        connection = connections[qs.db]
+        if connection.vendor != "postgresql" or qs.query.where:
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(qs.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+        # -1 (PostgreSQL 14+) or 0 until the table is first analyzed
+        return int(row[0]) if row and row[0] > 0 else None
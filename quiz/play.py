@@ -0,0 +1,277 @@
+# quiz/play.py
+"""Play-flow building blocks shared by the sync (DRF) and async views."""
+
+import json
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+
+from .images import stage_answer_image, staging_storage
+from .models import Attempt, AttemptQuestion, Player, Question
+from .pool import Stratum, question_pool
+
+QUESTIONS_PER_ATTEMPT = 5
+MAX_QUESTIONS_PER_ATTEMPT = getattr(settings, "QUIZ_MAX_QUESTIONS_PER_ATTEMPT", 50)
+
+STRATUM_FIELDS = ("category", "difficulty", "qtype")
+STRATUM_VALUES = {
+    "difficulty": {value for value, _ in Question.DIFF_CHOICES},
+    "qtype": {value for value, _ in Question.TYPE_CHOICES},
+}
+
+# submitted attempts never change, so clients may keep them for good
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def with_attempt_questions(qs):
+    """Load everything AttemptSerializer touches: the attempt row, then its
+    self-contained question rows from the attempt index."""
+    return qs.select_related("player").prefetch_related("attempt_questions")
+
+
+def _stratum_value(field: str, value):
+    if field == "category":
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid category: {value!r}")
+    if not isinstance(value, str) or value not in STRATUM_VALUES[field]:
+        raise ValueError(f"Invalid {field}: {value!r}")
+    return value
+
+
+def _count(value) -> int:
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"Invalid count: {value!r}")
+    try:
+        count = int(value)
+    except ValueError:
+        raise ValueError(f"Invalid count: {value!r}")
+    if count < 1:
+        raise ValueError(f"Invalid count: {value!r}")
+    return count
+
+
+def parse_strata(data) -> List[Stratum]:
+    """The question mix a start request asks for.
+
+    ``category``, ``difficulty`` and ``qtype`` each take a value that
+    filters every question, or one of them a ``{value: count}`` mapping
+    (``{"difficulty": {"easy": 2, "med": 2, "hard": 1}, "category": 3}``).
+    ``strata`` lists mixed draws instead:
+    ``[{"count": 2, "qtype": "text"}, {"count": 3, "category": 4}]``.
+    ``count`` sizes an unstratified draw. Raises ValueError when invalid.
+    """
+    if not hasattr(data, "get"):
+        data = {}
+    base, mapped = {}, None
+    for field in STRATUM_FIELDS:
+        value = data.get(field)
+        if value in (None, ""):
+            continue
+        if isinstance(value, dict):
+            if mapped is not None:
+                raise ValueError("Only one of category/difficulty/qtype can be a mix")
+            mapped = field
+        else:
+            base[field] = _stratum_value(field, value)
+
+    if data.get("strata") is not None:
+        if mapped is not None or not isinstance(data["strata"], list):
+            raise ValueError("strata must be a list of {count, category, ...}")
+        strata = []
+        for entry in data["strata"]:
+            if not isinstance(entry, dict):
+                raise ValueError("strata must be a list of {count, category, ...}")
+            fields = dict(base)
+            for field in STRATUM_FIELDS:
+                if entry.get(field) not in (None, ""):
+                    fields[field] = _stratum_value(field, entry[field])
+            strata.append(Stratum(_count(entry.get("count")), **fields))
+    elif mapped is not None:
+        strata = [
+            Stratum(_count(count), **base, **{mapped: _stratum_value(mapped, value)})
+            for value, count in data[mapped].items()
+        ]
+    else:
+        count = data.get("count")
+        count = QUESTIONS_PER_ATTEMPT if count in (None, "") else _count(count)
+        strata = [Stratum(count, **base)]
+
+    total = sum(stratum.count for stratum in strata)
+    if not strata or total > MAX_QUESTIONS_PER_ATTEMPT:
+        raise ValueError(f"An attempt takes 1 to {MAX_QUESTIONS_PER_ATTEMPT} questions")
+    return strata
+
+
+def drawn_questions():
+    """Columns a new attempt copies from its questions, plus their choices."""
+    return Question.objects.only("id", "prompt", "qtype").prefetch_related("choices")
+
+
+def draw_questions(strata) -> List[Question]:
+    """The questions for a new attempt, drawn from the pool, in draw order.
+
+    The pool can lag a delete until its bump lands; when a drawn question
+    is gone, catch up and draw again rather than start a short attempt.
+    Raises ValueError if the bank cannot fill ``strata``.
+    """
+    ids = question_pool.draw(strata)
+    by_id = drawn_questions().in_bulk(ids)
+    if len(by_id) != len(ids):
+        question_pool.refresh(force=True)
+        ids = question_pool.draw(strata)
+        by_id = drawn_questions().in_bulk(ids)
+        if len(by_id) != len(ids):
+            raise ValueError("Not enough questions in bank")
+    return [by_id[pk] for pk in ids]
+
+
+async def adraw_questions(strata) -> List[Question]:
+    ids = await question_pool.adraw(strata)
+    by_id = await drawn_questions().ain_bulk(ids)
+    if len(by_id) != len(ids):
+        await question_pool.arefresh(force=True)
+        ids = await question_pool.adraw(strata)
+        by_id = await drawn_questions().ain_bulk(ids)
+        if len(by_id) != len(ids):
+            raise ValueError("Not enough questions in bank")
+    return [by_id[pk] for pk in ids]
+
+
+def upsert_player(player_uuid) -> Player:
+    """Fetch or insert a Player; safe when concurrent starts share a UUID."""
+    try:
+        return Player.objects.get(player_uuid=player_uuid)
+    except Player.DoesNotExist:
+        # ON CONFLICT DO NOTHING: a racing insert of the same UUID wins quietly
+        Player.objects.bulk_create(
+            [Player(player_uuid=player_uuid)], ignore_conflicts=True
+        )
+        return Player.objects.get(player_uuid=player_uuid)
+
+
+def choice_snapshot(choices) -> List[dict]:
+    """What an attempt keeps of a question's choices."""
+    return [{"id": c.id, "text": c.text, "is_correct": c.is_correct} for c in choices]
+
+
+def new_attempt_questions(attempt: Attempt, selected) -> List[AttemptQuestion]:
+    """Unsaved AttemptQuestion rows snapshotting the selected questions."""
+    return [
+        AttemptQuestion(
+            attempt=attempt,
+            question=q,
+            prompt=q.prompt,
+            qtype=q.qtype,
+            correct_choice_ids=[c.id for c in q.choices.all() if c.is_correct],
+            choices=choice_snapshot(q.choices.all()),
+        )
+        for q in selected
+    ]
+
+
+def store_answer_image(upload) -> str:
+    """Stage an uploaded answer image once; rows then share its name.
+
+    The image is processed after the submit commits (see quiz/images.py).
+    """
+    return stage_answer_image(upload)
+
+
+def discard_answer_image(name: Optional[str]) -> None:
+    """Remove an image staged for a submit that did not go through."""
+    if name:
+        staging_storage.delete(name)
+
+
+def parse_answers(data, files) -> dict:
+    """
+    Accepts:
+      - multipart/form-data with 'answers' as a text field (JSON string)
+      - multipart/form-data with 'answers' as a file part
+      - application/json body: either {"answers": {...}} or just {...}
+    ``data`` is the parsed body with file parts merged in, as DRF's
+    ``request.data``. Returns a dict mapping attemptQuestionId -> answer dict.
+    """
+    # 1) Try JSON body directly
+    # When JSON body: data is already a dict
+    if isinstance(data, dict) and data:
+        raw = data.get("answers", data)
+        if isinstance(raw, dict):
+            return raw
+
+    # 2) Try text field in multipart/form-data
+    raw_field = data.get("answers")
+    if isinstance(raw_field, (str, bytes)):
+        try:
+            return json.loads(raw_field)
+        except Exception:
+            pass
+
+    # 3) Try file part in multipart/form-data
+    f = files.get("answers")
+    if f:
+        try:
+            content = f.read()
+            return json.loads(content.decode("utf-8"))
+        except Exception:
+            pass
+
+    # Nothing usable
+    return {}
+
+
+def apply_answer(aq: AttemptQuestion, payload: dict, image_name=None) -> None:
+    """Copy one answer payload onto its AttemptQuestion (no save)."""
+    # text
+    aq.text_response = payload.get("text_response")
+
+    # numeric (string -> float)
+    nr = payload.get("numeric_response", None)
+    if isinstance(nr, str):
+        nr = nr.strip()
+        nr = float(nr) if nr else None
+    if isinstance(nr, int):
+        nr = float(nr) if nr else None
+    aq.numeric_response = nr
+
+    # multiple/single choices (-> list[int])
+    sel = payload.get("selected_choice_ids", [])
+    try:
+        sel = [int(x) for x in sel]
+    except Exception:
+        sel = []
+    aq.selected_choice_ids = sel
+
+    if image_name:
+        aq.image = image_name
+        aq.image_status = AttemptQuestion.IMAGE_PENDING
+
+
+def closed_attempt_error(attempt: Attempt) -> Tuple[dict, int]:
+    if attempt.status == Attempt.EXPIRED:
+        return {"error": "Attempt has expired"}, 410
+    return {"error": "Attempt already submitted"}, 409
+
+
+def is_frozen(attempt: Attempt) -> bool:
+    """Submitted and with every answer image processed: it never changes."""
+    return attempt.status == Attempt.SUBMITTED and not any(
+        aq.image_status == AttemptQuestion.IMAGE_PENDING
+        for aq in attempt.attempt_questions.all()
+    )
+
+
+def submitted_entry(attempt: Attempt, data) -> tuple:
+    """The frozen (etag, payload) cache entry for a submitted attempt."""
+    stamp = int(attempt.submitted_at.timestamp() * 1_000_000)
+    return f'"attempt-{attempt.pk}-{stamp}"', data
+
+
+def prime_attempt_questions(attempt: Attempt, aqs) -> None:
+    """Serve attempt.attempt_questions from rows already in memory."""
+    qs = attempt.attempt_questions.all()
+    qs._result_cache = list(aqs)
+    qs._prefetch_done = True
+    attempt._prefetched_objects_cache = {"attempt_questions": qs}
@@ -0,0 +1,293 @@
+# quiz/pool.py
+import heapq
+import random
+import threading
+from array import array
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import Question
+from .versioning import aget_bank_version, bank_changes, get_bank_version
+
+BucketKey = Tuple[Optional[int], str, str]  # (category_id, difficulty, qtype)
+
+# weight of each difficulty in draws that span several (1 = proportional
+# to the number of questions, i.e. every matching question equally likely)
+DIFFICULTY_WEIGHTS = getattr(settings, "QUIZ_SAMPLER_DIFFICULTY_WEIGHTS", {})
+
+# past this many changed questions a full reload is cheaper
+MAX_INCREMENTAL = 100
+
+
+class Stratum(NamedTuple):
+    """Draw ``count`` questions matching the given fields (None: any)."""
+
+    count: int
+    category: Optional[int] = None
+    difficulty: Optional[str] = None
+    qtype: Optional[str] = None
+
+    def matches(self, key: BucketKey) -> bool:
+        category, difficulty, qtype = key
+        return (
+            (self.category is None or self.category == category)
+            and (self.difficulty is None or self.difficulty == difficulty)
+            and (self.qtype is None or self.qtype == qtype)
+        )
+
+
+class AliasTable:
+    """Walker's alias method over the buckets one stratum spans.
+
+    Picking a bucket by weight costs one table lookup, and a question
+    within it one index, so a draw is O(1) however many questions and
+    buckets match.
+    """
+
+    def __init__(self, buckets: List[array], weights: List[float]):
+        n = len(buckets)
+        total = sum(weights)
+        self.buckets = buckets
+        self.weights = weights
+        self.size = sum(len(ids) for ids in buckets)
+        self.prob = [w * n / total for w in weights]
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(self.prob) if p < 1]
+        large = [i for i, p in enumerate(self.prob) if p >= 1]
+        while small and large:
+            s, g = small.pop(), large[-1]
+            self.alias[s] = g
+            self.prob[g] -= 1 - self.prob[s]
+            if self.prob[g] < 1:
+                small.append(large.pop())
+        for i in small + large:  # float leftovers
+            self.prob[i] = 1.0
+
+    def draw(self) -> int:
+        i = random.randrange(len(self.prob))
+        if random.random() >= self.prob[i]:
+            i = self.alias[i]
+        ids = self.buckets[i]
+        return ids[random.randrange(len(ids))]
+
+    def sample(self, k: int, taken: Set[int]) -> List[int]:
+        """k distinct IDs not in ``taken`` (which grows by them)."""
+        if 2 * (k + len(taken)) <= self.size:
+            # at least half of the stratum is free: a few redraws at most
+            out = []
+            while len(out) < k:
+                pk = self.draw()
+                if pk not in taken:
+                    taken.add(pk)
+                    out.append(pk)
+            return out
+        # small stratum: weighted draw without replacement over what is
+        # left (Efraimidis-Spirakis keys), O(size) = O(k) here
+        free = [
+            (pk, weight / len(ids))  # a bucket's weight is spread over its IDs
+            for ids, weight in zip(self.buckets, self.weights)
+            for pk in ids
+            if pk not in taken
+        ]
+        if len(free) < k:
+            raise ValueError("Not enough questions in bank")
+        picked = heapq.nlargest(
+            k, free, key=lambda row: random.random() ** (1 / row[1])
+        )
+        out = [pk for pk, _ in picked]
+        taken.update(out)
+        return out
+
+
+class PoolState(NamedTuple):
+    buckets: Dict[BucketKey, array]
+    tables: Dict[tuple, Optional[AliasTable]]  # per stratum filter, lazily
+
+
+class QuestionPool:
+    """Per-process pool of question IDs, bucketed by category/difficulty/qtype.
+
+    The pool follows the bank version (see ``quiz.signals``): when the
+    bumps since the last refresh record which questions changed, only
+    those rows are re-read and moved between buckets, and only the alias
+    tables spanning the touched buckets are dropped; otherwise it reloads
+    everything. Drawing k IDs costs O(k) work no matter how many questions
+    are in the bank, plus an indexed version lookup once the remembered
+    version expires (see ``quiz.versioning``).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._state = PoolState({}, {})
+        # pk -> (bucket, position in it), for moving single questions;
+        # only refreshes (under the lock) read or write it
+        self._index: Dict[int, Tuple[BucketKey, int]] = {}
+
+    def refresh(self, force: bool = False) -> None:
+        version = get_bank_version()
+        if not force and version == self._version:
+            return
+        with self._lock:
+            if not force and version == self._version:
+                return
+            changed = None
+            if not force and self._version is not None:
+                changed = bank_changes(self._version, version)
+            if changed is None or len(changed) > MAX_INCREMENTAL:
+                buckets = self._load()
+                self._index = {
+                    pk: (key, i)
+                    for key, ids in buckets.items()
+                    for i, pk in enumerate(ids)
+                }
+                self._state = PoolState(buckets, {})
+            elif changed:
+                self._state = self._reload(changed)
+            # else: only choices or category names moved
+            self._version = version
+
+    async def arefresh(self, force: bool = False) -> None:
+        version = await aget_bank_version()
+        if force or version != self._version:
+            # rebuilds are rare; run them on the ORM's sync thread
+            await sync_to_async(self.refresh)(force)
+
+    @staticmethod
+    def rows(changed: Optional[Set[int]] = None):
+        """(id, category, difficulty, qtype) of every question, or of the
+        ``changed`` ones; both read the stratum index only."""
+        questions = Question.objects.all()
+        if changed is not None:
+            questions = questions.filter(pk__in=changed)
+        return questions.values_list("id", "category_id", "difficulty", "qtype")
+
+    @classmethod
+    def _load(cls) -> Dict[BucketKey, array]:
+        buckets: Dict[BucketKey, array] = defaultdict(lambda: array("q"))
+        rows = cls.rows().iterator(chunk_size=10_000)
+        for pk, category_id, difficulty, qtype in rows:
+            buckets[(category_id, difficulty, qtype)].append(pk)
+        return dict(buckets)
+
+    def _reload(self, changed: Set[int]) -> PoolState:
+        """Move the changed questions to their current buckets.
+
+        Only the changed rows are read. Touched buckets are copied before
+        the swap-remove/append (draws keep reading the old state without
+        the lock), and alias tables spanning none of them are kept.
+        """
+        now = {
+            pk: (category_id, difficulty, qtype)
+            for pk, category_id, difficulty, qtype in self.rows(changed)
+        }
+        state = self._state
+        buckets = dict(state.buckets)
+        touched: Set[BucketKey] = set()
+
+        def writable(key: BucketKey) -> array:
+            if key not in touched:
+                touched.add(key)
+                buckets[key] = array("q", buckets.get(key, ()))
+            return buckets[key]
+
+        for pk in changed:
+            old, new = self._index.get(pk), now.get(pk)
+            if old is not None and old[0] == new:
+                continue
+            if old is not None:
+                key, i = self._index.pop(pk)
+                ids = writable(key)
+                last = ids.pop()
+                if last != pk:
+                    ids[i] = last
+                    self._index[last] = (key, i)
+            if new is not None:
+                ids = writable(new)
+                self._index[pk] = (new, len(ids))
+                ids.append(pk)
+        for key in touched:
+            if not buckets[key]:
+                del buckets[key]
+        tables = {
+            spec: table
+            for spec, table in state.tables.items()
+            if not any(Stratum(0, *spec).matches(key) for key in touched)
+        }
+        return PoolState(buckets, tables)
+
+    @staticmethod
+    def _table(state: PoolState, stratum: Stratum) -> Optional[AliasTable]:
+        spec = stratum[1:]
+        if spec not in state.tables:
+            matching = [
+                (ids, len(ids) * DIFFICULTY_WEIGHTS.get(key[1], 1))
+                for key, ids in state.buckets.items()
+                if stratum.matches(key)
+            ]
+            matching = [(ids, w) for ids, w in matching if ids and w > 0]
+            state.tables[spec] = (
+                AliasTable(*map(list, zip(*matching))) if matching else None
+            )
+        return state.tables[spec]
+
+    def _draw(self, strata: Sequence[Stratum]) -> List[int]:
+        state = self._state
+        taken: Set[int] = set()
+        out: List[int] = []
+        for stratum in strata:
+            table = self._table(state, stratum)
+            if table is None or table.size < stratum.count:
+                raise ValueError("Not enough questions in bank")
+            out.extend(table.sample(stratum.count, taken))
+        return out
+
+    def count(
+        self,
+        category: Optional[int] = None,
+        difficulty: Optional[str] = None,
+        qtype: Optional[str] = None,
+    ) -> int:
+        self.refresh()
+        stratum = Stratum(0, category, difficulty, qtype)
+        return sum(
+            len(ids) for key, ids in self._state.buckets.items() if stratum.matches(key)
+        )
+
+    def draw(self, strata: Sequence[Stratum]) -> List[int]:
+        """Distinct question IDs, ``count`` per stratum, in stratum order.
+
+        Overlapping strata never repeat a question. Raises ValueError if
+        too few match.
+        """
+        self.refresh()
+        return self._draw(strata)
+
+    async def adraw(self, strata: Sequence[Stratum]) -> List[int]:
+        await self.arefresh()
+        return self._draw(strata)
+
+    def sample(
+        self,
+        k: int,
+        category: Optional[int] = None,
+        difficulty: Optional[str] = None,
+        qtype: Optional[str] = None,
+    ) -> List[int]:
+        """Draw k distinct question IDs; raises ValueError if too few match."""
+        return self.draw([Stratum(k, category, difficulty, qtype)])
+
+    async def asample(
+        self,
+        k: int,
+        category: Optional[int] = None,
+        difficulty: Optional[str] = None,
+        qtype: Optional[str] = None,
+    ) -> List[int]:
+        return await self.adraw([Stratum(k, category, difficulty, qtype)])
+
+
+question_pool = QuestionPool()
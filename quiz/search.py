@@ -0,0 +1,240 @@
+# quiz/search.py
+"""Full-text search over the question bank and text answers.
+
+Two side tables keyed by the indexed row's primary key:
+
+- ``quiz_question_fts``: a question's prompt plus its choice texts
+- ``quiz_answer_fts``: attempt-question text responses
+
+SQLite uses FTS5 virtual tables (bm25 ranking), PostgreSQL a ``tsvector``
+column with a GIN index (``ts_rank``). On other backends, or SQLite builds
+without FTS5, :func:`available` is False and callers keep their ``LIKE``
+search. Rows are kept in sync by signals, by grading (text answers) and
+explicitly by bulk writers; ``manage.py rebuild_search_index`` rebuilds
+both tables from scratch.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models.expressions import RawSQL
+
+from .matching import norm_text
+
+QUESTIONS = "quiz_question_fts"
+ANSWERS = "quiz_answer_fts"
+TABLES = (QUESTIONS, ANSWERS)
+
+MAX_TERMS = 8
+MAX_RESULTS = getattr(settings, "QUIZ_SEARCH_MAX_RESULTS", 200)
+
+
+def search_terms(text: str) -> List[str]:
+    """Word tokens of a user query; punctuation never reaches the engine."""
+    return re.findall(r"\w+", norm_text(text or ""))[:MAX_TERMS]
+
+
+def question_document(prompt: str, choice_texts: Iterable[str]) -> str:
+    return "\n".join([prompt or "", *choice_texts])
+
+
+# ---------- Backends ----------
+
+
+class SQLiteBackend:
+    def create(self, cursor, table: str) -> None:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+            "USING fts5(body, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+    def drop(self, cursor, table: str) -> None:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def upsert(self, cursor, table: str, rows) -> None:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {table} (rowid, body) VALUES (%s, %s)", rows
+        )
+
+    def delete(self, cursor, table: str, ids) -> None:
+        cursor.executemany(f"DELETE FROM {table} WHERE rowid = %s", [(i,) for i in ids])
+
+    def query(self, terms: Sequence[str]) -> str:
+        # every term must match, as a prefix: "pari" finds "Paris"
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def matching_sql(self, table: str) -> str:
+        return f"SELECT rowid FROM {table} WHERE {table} MATCH %s"
+
+    def ranked_sql(self, table: str) -> str:
+        return (
+            f"SELECT rowid FROM {table} WHERE {table} MATCH %s "
+            "ORDER BY rank LIMIT %s"
+        )
+
+
+class PostgresBackend:
+    config = "simple"  # language-neutral: no stemming, no stop words
+
+    def create(self, cursor, table: str) -> None:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} "
+            "(id bigint PRIMARY KEY, body tsvector NOT NULL)"
+        )
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_body_idx ON {table} USING GIN (body)"
+        )
+
+    def drop(self, cursor, table: str) -> None:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def upsert(self, cursor, table: str, rows) -> None:
+        cursor.executemany(
+            f"INSERT INTO {table} (id, body) "
+            f"VALUES (%s, to_tsvector('{self.config}', %s)) "
+            "ON CONFLICT (id) DO UPDATE SET body = EXCLUDED.body",
+            rows,
+        )
+
+    def delete(self, cursor, table: str, ids) -> None:
+        cursor.execute(f"DELETE FROM {table} WHERE id = ANY(%s)", [list(ids)])
+
+    def query(self, terms: Sequence[str]) -> str:
+        return " & ".join(f"{term}:*" for term in terms)
+
+    def matching_sql(self, table: str) -> str:
+        return f"SELECT id FROM {table} WHERE body @@ to_tsquery('{self.config}', %s)"
+
+    def ranked_sql(self, table: str) -> str:
+        return (
+            f"SELECT id FROM {table}, to_tsquery('{self.config}', %s) query "
+            "WHERE body @@ query ORDER BY ts_rank(body, query) DESC, id LIMIT %s"
+        )
+
+
+BACKENDS = {"sqlite": SQLiteBackend(), "postgresql": PostgresBackend()}
+
+_available: Dict[str, bool] = {}
+
+
+def backend(connection):
+    return BACKENDS.get(connection.vendor)
+
+
+def create_tables(connection) -> bool:
+    """Create the index tables if the backend supports them."""
+    engine = backend(connection)
+    if engine is None:
+        return False
+    with connection.cursor() as cursor:
+        try:
+            for table in TABLES:
+                engine.create(cursor, table)
+        except Exception:
+            if connection.vendor != "sqlite":
+                raise
+            return False  # SQLite compiled without FTS5
+    _available.pop(connection.alias, None)
+    return True
+
+
+def drop_tables(connection) -> None:
+    engine = backend(connection)
+    if engine is not None:
+        with connection.cursor() as cursor:
+            for table in TABLES:
+                engine.drop(cursor, table)
+    _available.pop(connection.alias, None)
+
+
+def available(using: str = DEFAULT_DB_ALIAS) -> bool:
+    if using not in _available:
+        connection = connections[using]
+        _available[using] = backend(connection) is not None and set(TABLES) <= set(
+            connection.introspection.table_names()
+        )
+    return _available[using]
+
+
+# ---------- Writes ----------
+
+
+def index_rows(
+    table: str, rows: Iterable[Tuple[int, str]], using: str = DEFAULT_DB_ALIAS
+) -> None:
+    """Upsert ``(pk, text)`` documents; empty text removes the document."""
+    if not available(using):
+        return
+    rows = list(rows)
+    engine = backend(connections[using])
+    with connections[using].cursor() as cursor:
+        present = [(pk, text) for pk, text in rows if text and text.strip()]
+        missing = [pk for pk, text in rows if not (text and text.strip())]
+        if present:
+            engine.upsert(cursor, table, present)
+        if missing:
+            engine.delete(cursor, table, missing)
+
+
+def remove_rows(table: str, ids: Iterable[int], using: str = DEFAULT_DB_ALIAS):
+    ids = list(ids)
+    if ids and available(using):
+        with connections[using].cursor() as cursor:
+            backend(connections[using]).delete(cursor, table, ids)
+
+
+def index_questions(ids: Iterable[int], using: str = DEFAULT_DB_ALIAS) -> None:
+    """Re-read questions and their choices; deleted ones leave the index."""
+    from .models import Choice, Question
+
+    ids = set(ids)
+    if not ids or not available(using):
+        return
+    prompts = dict(
+        Question.objects.using(using).filter(pk__in=ids).values_list("id", "prompt")
+    )
+    texts: Dict[int, List[str]] = {}
+    for question_id, text in (
+        Choice.objects.using(using)
+        .filter(question_id__in=prompts)
+        .order_by("id")
+        .values_list("question_id", "text")
+    ):
+        texts.setdefault(question_id, []).append(text)
+    index_rows(
+        QUESTIONS,
+        [(pk, question_document(p, texts.get(pk, ()))) for pk, p in prompts.items()],
+        using,
+    )
+    remove_rows(QUESTIONS, ids - set(prompts), using)
+
+
+# ---------- Reads ----------
+
+
+def matching(table: str, text: str, using: str = DEFAULT_DB_ALIAS):
+    """Subquery of matching primary keys for ``pk__in=``; None without FTS."""
+    if not available(using):
+        return None
+    terms = search_terms(text)
+    if not terms:
+        return RawSQL("SELECT NULL WHERE 1 = 0", [])
+    engine = backend(connections[using])
+    return RawSQL(engine.matching_sql(table), [engine.query(terms)])
+
+
+def ranked_ids(
+    table: str, text: str, limit: int = MAX_RESULTS, using: str = DEFAULT_DB_ALIAS
+) -> Optional[List[int]]:
+    """Best matches first; None when full-text search is unavailable."""
+    if not available(using):
+        return None
+    terms = search_terms(text)
+    if not terms:
+        return []
+    engine = backend(connections[using])
+    with connections[using].cursor() as cursor:
+        cursor.execute(engine.ranked_sql(table), [engine.query(terms), limit])
+        return [row[0] for row in cursor.fetchall()]
@@ -4,13 +4,30 @@ from typing import List, Optional
 from django.db import transaction
 from rest_framework import serializers
 
-from .models import (Attempt, AttemptQuestion, Category, Choice, Player,
-                     Question)
+from . import search
+from .middleware import SerializationTimer
+from .models import (
+    Attempt,
+    AttemptQuestion,
+    Category,
+    CategoryStats,
+    Choice,
+    Player,
+    PlayerStats,
+    Question,
+    QuestionStats,
+)
+from .versioning import bump_on_commit
+
+
+class TimedModelSerializer(SerializationTimer, serializers.ModelSerializer):
+    """ModelSerializer reporting its time to the profiling middleware."""
+
 
 # ---------- Category ----------
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedModelSerializer):
     class Meta:
         model = Category
         fields = ["id", "name"]
@@ -19,7 +36,7 @@ class CategorySerializer(serializers.ModelSerializer):
 # ---------- Choice (nested under Question) ----------
 
 
-class ChoiceSerializer(serializers.ModelSerializer):
+class ChoiceSerializer(TimedModelSerializer):
     id = serializers.IntegerField(required=False)
 
     class Meta:
@@ -30,11 +47,32 @@ class ChoiceSerializer(serializers.ModelSerializer):
 # ---------- Question (with nested choices) ----------
 
 
-class QuestionSerializer(serializers.ModelSerializer):
-    choices = ChoiceSerializer(many=True, read_only=True)
+class QuestionStatsSerializer(TimedModelSerializer):
+    correct_rate = serializers.FloatField(read_only=True)
+    avg_response_length = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = QuestionStats
+        fields = [
+            "served",
+            "answered",
+            "correct",
+            "correct_rate",
+            "responses",
+            "avg_response_length",
+        ]
+        read_only_fields = fields
+
+
+class QuestionSerializer(TimedModelSerializer):
+    # writable: choices with a known ``id`` are updated in place, others
+    # added, and those left out removed (see _sync_choices)
+    choices = ChoiceSerializer(many=True, required=False)
     category = serializers.PrimaryKeyRelatedField(
         queryset=Category.objects.all(), allow_null=True, required=False
     )
+    # only with context["include_stats"] (``?include=stats``)
+    stats = serializers.SerializerMethodField()
 
     class Meta:
         model = Question
@@ -48,8 +86,22 @@ class QuestionSerializer(serializers.ModelSerializer):
             "numeric_answer",
             "image_required",
             "choices",
+            "stats",
         ]
 
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.context.get("include_stats"):
+            fields.pop("stats", None)  # QuestionImportSerializer has none
+        return fields
+
+    def get_stats(self, obj: Question):
+        try:
+            stats = obj.stats
+        except QuestionStats.DoesNotExist:
+            stats = QuestionStats(question=obj)  # never served yet
+        return QuestionStatsSerializer(stats).data
+
     # ---- Validation rules aligned with spec ----
     def validate(self, attrs):
         # Determine effective values (handle partial update)
@@ -96,39 +148,86 @@ class QuestionSerializer(serializers.ModelSerializer):
 
         return attrs
 
+    @staticmethod
+    def _sync_choices(question: Question, choices_data: List[dict]) -> None:
+        """Make the question's choices match ``choices_data`` by ``id``.
+
+        At most one bulk_update, one bulk_create and one delete, so kept
+        choices keep their primary keys; nothing is written when they
+        already match. An ``id`` that is unknown (or belongs to another
+        question) is treated as a new choice.
+        """
+        existing = {c.id: c for c in question.choices.all()}
+        changed, added = [], []
+        for data in choices_data:
+            choice = existing.pop(data.get("id"), None)
+            text, is_correct = data["text"], data.get("is_correct", False)
+            if choice is None:
+                added.append(
+                    Choice(question=question, text=text, is_correct=is_correct)
+                )
+            elif (choice.text, choice.is_correct) != (text, is_correct):
+                choice.text, choice.is_correct = text, is_correct
+                changed.append(choice)
+        if not (existing or changed or added):
+            return
+        if existing:  # left out of the payload
+            Choice.objects.filter(pk__in=existing).delete()
+        if changed:
+            Choice.objects.bulk_update(changed, ["text", "is_correct"])
+        if added:
+            Choice.objects.bulk_create(added)
+        # bulk writes send no signals
+        search.index_questions([question.pk])
+        bump_on_commit([])
+
     @transaction.atomic
     def create(self, validated_data):
         choices_data: Optional[List[dict]] = validated_data.pop("choices", None)
         question = Question.objects.create(**validated_data)
         if choices_data:
-            for ch in choices_data:
-                Choice.objects.create(question=question, **ch)
+            self._sync_choices(question, choices_data)
         return question
 
     @transaction.atomic
     def update(self, instance, validated_data):
         choices_data: Optional[List[dict]] = validated_data.pop("choices", None)
 
-        # Update scalar fields
-        for field, value in validated_data.items():
-            setattr(instance, field, value)
-        instance.save()
+        # Update scalar fields; an unchanged question is not saved (and
+        # keeps the bank version, so cached payloads stay valid)
+        changed = [
+            field
+            for field, value in validated_data.items()
+            if getattr(instance, field) != value
+        ]
+        for field in changed:
+            setattr(instance, field, validated_data[field])
+        if changed:
+            instance.save()
 
-        # Synchronize choices if provided:
-        # simplest/robust approach: replace all
+        # Synchronize choices if provided (omitted: left as they are)
         if choices_data is not None:
-            instance.choices.all().delete()
-            for ch in choices_data:
-                ch.pop("id", None)  # avoid PK reuse confusion
-                Choice.objects.create(question=instance, **ch)
+            self._sync_choices(instance, choices_data)
 
         return instance
 
 
+class QuestionImportSerializer(QuestionSerializer):
+    """QuestionSerializer's rules for bank rows: category by name, choices
+    inline. Used by ``manage.py import_questions``; creates nothing itself."""
+
+    category = serializers.CharField(
+        max_length=100, required=False, allow_null=True, allow_blank=True
+    )
+
+    class Meta(QuestionSerializer.Meta):
+        fields = [f for f in QuestionSerializer.Meta.fields if f not in ("id", "stats")]
+
+
 # ---------- Player ----------
 
 
-class PlayerSerializer(serializers.ModelSerializer):
+class PlayerSerializer(TimedModelSerializer):
     class Meta:
         model = Player
         fields = ["player_uuid"]
@@ -137,11 +236,11 @@ class PlayerSerializer(serializers.ModelSerializer):
 # ---------- AttemptQuestion (review-friendly) ----------
 
 
-class AttemptQuestionSerializer(serializers.ModelSerializer):
-    question_id = serializers.IntegerField(source="question.id", read_only=True)
-    choices = ChoiceSerializer(
-        source="question.choices", many=True, read_only=True
-    )  # <— add this
+class AttemptQuestionSerializer(TimedModelSerializer):
+    # everything comes from the row itself (choices are a snapshot taken
+    # at start), so serializing never touches Question or Choice
+    question_id = serializers.IntegerField(read_only=True)
+    choices = serializers.JSONField(read_only=True)
 
     class Meta:
         model = AttemptQuestion
@@ -154,14 +253,16 @@ class AttemptQuestionSerializer(serializers.ModelSerializer):
             "text_response",
             "numeric_response",
             "image",
+            "image_status",
             "is_correct",
             "correct_choice_ids",
-            "choices",  # <— include choices
+            "choices",
         ]
         read_only_fields = [
             "question_id",
             "prompt",
             "qtype",
+            "image_status",
             "is_correct",
             "correct_choice_ids",
             "choices",
@@ -171,7 +272,7 @@ class AttemptQuestionSerializer(serializers.ModelSerializer):
 # ---------- Attempt (with nested attempt_questions) ----------
 
 
-class AttemptSerializer(serializers.ModelSerializer):
+class AttemptSerializer(TimedModelSerializer):
     attempt_questions = AttemptQuestionSerializer(many=True, read_only=True)
     player_uuid = serializers.UUIDField(source="player.player_uuid", read_only=True)
 
@@ -183,6 +284,8 @@ class AttemptSerializer(serializers.ModelSerializer):
             "created_at",
             "score",
             "total",
+            "status",
+            "submitted_at",
             "attempt_questions",
         ]
         read_only_fields = [
@@ -191,6 +294,49 @@ class AttemptSerializer(serializers.ModelSerializer):
             "created_at",
             "score",
             "total",
+            "status",
+            "submitted_at",
             "attempt_questions",
         ]
 
+
+class AttemptSummarySerializer(TimedModelSerializer):
+    """Slim list representation: no player or nested questions."""
+
+    class Meta:
+        model = Attempt
+        fields = ["id", "created_at", "score", "total"]
+        read_only_fields = fields
+
+
+# ---------- Leaderboard ----------
+# Entries identify players by id: the uuid is the player's credential.
+
+
+class PlayerStatsSerializer(TimedModelSerializer):
+    rank = serializers.IntegerField(read_only=True)
+    player = serializers.IntegerField(source="player_id", read_only=True)
+
+    class Meta:
+        model = PlayerStats
+        fields = [
+            "rank",
+            "player",
+            "best_score",
+            "attempts",
+            "correct",
+            "answered",
+            "last_played_at",
+        ]
+        read_only_fields = fields
+
+
+class CategoryStatsSerializer(TimedModelSerializer):
+    rank = serializers.IntegerField(read_only=True)
+    player = serializers.IntegerField(source="player_id", read_only=True)
+    category = serializers.IntegerField(source="category_id", read_only=True)
+
+    class Meta:
+        model = CategoryStats
+        fields = ["rank", "player", "category", "correct", "answered", "last_played_at"]
+        read_only_fields = fields
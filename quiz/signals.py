@@ -0,0 +1,98 @@
+# quiz/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import search
+from .cache import attempt_cache, attempt_key
+from .models import Attempt, AttemptQuestion, Category, Choice, ImageBlob, Question
+from .thumbnails import thumbnails
+from .versioning import bump_on_commit
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def question_bank_changed(sender, instance, signal, **kwargs):
+    # Bump after commit so other processes never rebuild from rows
+    # that could still be rolled back, once per transaction however many
+    # rows it writes. The bump records which questions may have changed
+    # stratum, so the question pool catches up in place.
+    if sender is Question:
+        changed = [instance.pk]
+    elif sender is Category and signal is post_delete:
+        changed = None  # SET_NULL on its questions skips signals
+    else:
+        changed = []
+    bump_on_commit(changed)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_search_document(sender, instance, **kwargs):
+    # deleted questions have no row to re-read and leave the index
+    search.index_questions([instance.pk])
+
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def choice_search_document(sender, instance, **kwargs):
+    search.index_questions([instance.question_id])
+
+
+@receiver(post_save, sender=AttemptQuestion)
+def answer_search_document(sender, instance, **kwargs):
+    search.index_rows(search.ANSWERS, [(instance.pk, instance.text_response)])
+
+
+@receiver(post_delete, sender=AttemptQuestion)
+def answer_search_removed(sender, instance, **kwargs):
+    search.remove_rows(search.ANSWERS, [instance.pk])
+
+
+@receiver(post_save, sender=Attempt)
+@receiver(post_delete, sender=Attempt)
+@receiver(post_save, sender=AttemptQuestion)
+@receiver(post_delete, sender=AttemptQuestion)
+def attempt_changed(sender, instance, created=False, **kwargs):
+    # The play flow writes through bulk/queryset updates, which send no
+    # signals; this catches edits made in the admin or the shell.
+    if created:
+        return
+    attempt_id = instance.pk if sender is Attempt else instance.attempt_id
+    transaction.on_commit(lambda: attempt_cache.delete(attempt_key(attempt_id)))
+
+
+@receiver(pre_save, sender=AttemptQuestion)
+def answer_image_before(sender, instance, update_fields=None, **kwargs):
+    # the new upload is only stored (and renamed) by FileField.pre_save,
+    # which runs after this; post_save compares the two names
+    instance._image_before = None
+    if instance.pk is not None and (update_fields is None or "image" in update_fields):
+        instance._image_before = (
+            AttemptQuestion.objects.filter(pk=instance.pk)
+            .values_list("image", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=AttemptQuestion)
+def answer_image_after(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and "image" not in update_fields:
+        return
+    old = getattr(instance, "_image_before", None) or None
+    new = instance.image.name if instance.image else None
+    if old != new:
+        ImageBlob.objects.release([old])
+        ImageBlob.objects.retain([new])
+        if new:
+            transaction.on_commit(lambda: thumbnails.schedule([new]))
+
+
+@receiver(post_delete, sender=AttemptQuestion)
+def answer_image_released(sender, instance, **kwargs):
+    if instance.image:
+        ImageBlob.objects.release([instance.image.name])
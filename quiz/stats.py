@@ -0,0 +1,92 @@
+# quiz/stats.py
+"""Per-question counters (``QuestionStats``).
+
+Start adds the drawn questions to ``served``; submit adds answered,
+correct and text-response lengths. Each costs two statements per attempt,
+however many questions are new: an INSERT that creates missing rows and
+skips existing ones, then one UPDATE with F-expressions, so concurrent
+attempts never lose increments. Reads cost one join, however large
+``AttemptQuestion`` grows.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, When
+from django.db.models.functions import Length
+
+from .models import Attempt, AttemptQuestion, QuestionStats
+
+COUNTERS = ("served", "answered", "correct", "responses", "response_chars")
+
+
+def _increment(deltas: Dict[int, Dict[str, int]]) -> None:
+    """Add ``{question_id: {counter: n}}`` in one INSERT and one UPDATE."""
+    if not deltas:
+        return
+    updates = {}
+    for counter in COUNTERS:
+        whens = [
+            When(question_id=pk, then=d[counter])
+            for pk, d in deltas.items()
+            if d.get(counter)
+        ]
+        if whens:
+            updates[counter] = F(counter) + Case(
+                *whens, default=0, output_field=IntegerField()
+            )
+    if not updates:
+        return
+    # rows exist before the UPDATE, so it never misses a first count
+    QuestionStats.objects.bulk_create(
+        [QuestionStats(question_id=pk) for pk in deltas], ignore_conflicts=True
+    )
+    QuestionStats.objects.filter(question_id__in=deltas).update(**updates)
+
+
+def record_served(question_ids: Iterable[int]) -> None:
+    _increment({pk: {"served": 1} for pk in question_ids})
+
+
+arecord_served = sync_to_async(record_served)
+
+
+def record_submit(aqs: List[AttemptQuestion]) -> None:
+    deltas: Dict[int, Dict[str, int]] = defaultdict(dict)
+    for aq in aqs:
+        d = deltas[aq.question_id]
+        d["answered"] = d.get("answered", 0) + 1
+        d["correct"] = d.get("correct", 0) + aq.is_correct
+        if aq.text_response:
+            d["responses"] = d.get("responses", 0) + 1
+            d["response_chars"] = d.get("response_chars", 0) + len(aq.text_response)
+    _increment(deltas)
+
+
+def rebuild_range(first_id: int, last_id: int) -> int:
+    """Recompute the stats of questions ``first_id..last_id`` from answers."""
+    submitted = Q(attempt__status=Attempt.SUBMITTED)
+    text = submitted & Q(text_response__isnull=False) & ~Q(text_response="")
+    rows = (
+        AttemptQuestion.objects.filter(
+            question_id__gte=first_id, question_id__lte=last_id
+        )
+        .order_by()
+        .values("question_id")
+        .annotate(
+            served=Count("id"),
+            answered=Count("id", filter=submitted),
+            correct=Count("id", filter=submitted & Q(is_correct=True)),
+            responses=Count("id", filter=text),
+            response_chars=Sum(Length("text_response"), filter=text, default=0),
+        )
+    )
+    stats = [QuestionStats(**row) for row in rows]
+    with transaction.atomic():
+        QuestionStats.objects.filter(
+            question_id__gte=first_id, question_id__lte=last_id
+        ).delete()
+        QuestionStats.objects.bulk_create(stats)
+    return len(stats)
@@ -0,0 +1,75 @@
+# quiz/storage.py
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File storage that keeps each distinct blob once, named by its digest.
+
+    Uploads are hashed (SHA-256) while they are streamed to a temporary file
+    in chunks; the file then lands at ``<dir>/<d[:2]>/<digest><ext>``, or is
+    dropped if that blob is already stored. The name asked for only supplies
+    the directory and extension. Reference counts live in
+    ``quiz.models.ImageBlob``; only blobs registered there are ever deleted.
+    """
+
+    chunk_size = 64 * 1024
+
+    def get_available_name(self, name, max_length=None):
+        # the final name comes from the content, see _save()
+        return name
+
+    def _save(self, name, content):
+        directory = posixpath.dirname(name)
+        ext = os.path.splitext(name)[1].lower()
+        staging = self.path(directory)
+        os.makedirs(staging, exist_ok=True)
+
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=staging, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                if hasattr(content, "seek"):
+                    content.seek(0)
+                for chunk in content.chunks(self.chunk_size):
+                    digest.update(chunk)
+                    out.write(chunk)
+            hexdigest = digest.hexdigest()
+            final = posixpath.join(directory, hexdigest[:2], hexdigest + ext)
+            final_path = self.path(final)
+            if os.path.exists(final_path):
+                os.unlink(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(tmp_path, self.file_permissions_mode)
+                # atomic: a concurrent save of the same bytes just replaces it
+                os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return final
+
+    def put(self, name: str, data: bytes) -> None:
+        """Write derived data (e.g. a thumbnail) under exactly ``name``."""
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.write(data)
+            if self.file_permissions_mode is not None:
+                os.chmod(tmp_path, self.file_permissions_mode)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+
+answer_storage = ContentAddressedStorage()
@@ -0,0 +1,165 @@
+"""Answer images: refcounted blobs and the background processing pipeline."""
+
+import io
+import json
+import tempfile
+import uuid
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from quiz.images import image_pipeline, staging_storage
+from quiz.models import Attempt, AttemptQuestion, Category, ImageBlob, Player, Question
+from quiz.pool import question_pool
+from quiz.storage import answer_storage
+from quiz.thumbnails import thumbnails
+
+
+class MediaTestCase(TestCase):
+    def setUp(self):
+        media = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        self.enterContext(mock.patch.object(thumbnails, "schedule"))
+
+
+class ImageBlobTests(MediaTestCase):
+    def refs(self, name):
+        return ImageBlob.objects.get(name=name).refs
+
+    def test_release_deletes_the_file_at_zero(self):
+        name = answer_storage.save("answers/image.jpg", ContentFile(b"jpeg"))
+        ImageBlob.objects.retain([name, name])
+        self.assertEqual(self.refs(name), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ImageBlob.objects.release([name])
+        self.assertEqual(self.refs(name), 1)
+        self.assertTrue(answer_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ImageBlob.objects.release([name])
+        self.assertFalse(ImageBlob.objects.filter(name=name).exists())
+        self.assertFalse(answer_storage.exists(name))
+
+    def test_same_content_is_stored_once(self):
+        first = answer_storage.save("answers/a.jpg", ContentFile(b"same"))
+        second = answer_storage.save("answers/b.jpg", ContentFile(b"same"))
+        self.assertEqual(first, second)
+        self.assertNotEqual(
+            answer_storage.save("answers/c.jpg", ContentFile(b"other")), first
+        )
+
+    def test_answer_rows_hold_references(self):
+        name = answer_storage.save("answers/image.png", ContentFile(b"png"))
+        question = Question.objects.create(
+            prompt="Draw a cat",
+            qtype=Question.IMAGE,
+            category=Category.objects.create(name="Art"),
+        )
+        attempt = Attempt.objects.create(player=Player.objects.create())
+        for _ in range(2):
+            AttemptQuestion.objects.create(
+                attempt=attempt, question=question, prompt="", qtype="image", image=name
+            )
+        self.assertEqual(self.refs(name), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AttemptQuestion.objects.first().delete()
+        self.assertEqual(self.refs(name), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            attempt.delete()  # cascades to the other row
+        self.assertFalse(ImageBlob.objects.exists())
+        self.assertFalse(answer_storage.exists(name))
+
+    def test_unregistered_files_are_kept(self):
+        name = answer_storage.save("answers/legacy.jpg", ContentFile(b"old"))
+        with self.captureOnCommitCallbacks(execute=True):
+            ImageBlob.objects.release([name])
+        self.assertTrue(answer_storage.exists(name))
+
+
+class AnswerImagePipelineTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        Question.objects.create(
+            prompt="Draw a cat",
+            qtype=Question.IMAGE,
+            category=Category.objects.create(name="Art"),
+            image_required=True,
+        )
+        question_pool.refresh(force=True)
+
+    def submit(self, upload):
+        resp = self.client.post(
+            "/api/play/start/",
+            {"player_uuid": str(uuid.uuid4()), "count": 1},
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 201, resp.content)
+        attempt = resp.json()
+        with mock.patch.object(image_pipeline, "schedule") as schedule:
+            with self.captureOnCommitCallbacks(execute=True):
+                resp = self.client.post(
+                    f"/api/play/submit/{attempt['id']}/",
+                    {"answers": json.dumps({"answers": {}}), "image": upload},
+                )
+        self.assertEqual(resp.status_code, 200, resp.content)
+        self.assertEqual(resp.json()["score"], 1)  # graded on receipt
+        (staged,) = schedule.call_args.args[0]
+        aq = AttemptQuestion.objects.get(attempt_id=attempt["id"])
+        self.assertEqual(aq.image_status, AttemptQuestion.IMAGE_PENDING)
+        self.assertEqual(aq.image.name, staged)
+        self.assertTrue(staging_storage.exists(staged))
+        status = image_pipeline.process(staged)
+        self.assertFalse(staging_storage.exists(staged))
+        aq.refresh_from_db()
+        self.assertEqual(aq.image_status, status)
+        return aq
+
+    def test_valid_upload_becomes_ready(self):
+        out = io.BytesIO()
+        Image.new("RGB", (3000, 1500), "red").save(out, "PNG")
+        aq = self.submit(SimpleUploadedFile("cat.png", out.getvalue()))
+
+        self.assertEqual(aq.image_status, AttemptQuestion.IMAGE_READY)
+        self.assertTrue(aq.image.name.endswith(".jpg"))
+        self.assertTrue(answer_storage.exists(aq.image.name))
+        self.assertEqual(aq.image_size, answer_storage.size(aq.image.name))
+        self.assertEqual(ImageBlob.objects.get(name=aq.image.name).refs, 1)
+        with Image.open(answer_storage.open(aq.image.name)) as img:
+            self.assertEqual(img.size, (2048, 1024))
+
+    def test_invalid_upload_ends_invalid(self):
+        aq = self.submit(SimpleUploadedFile("cat.png", b"not an image"))
+
+        self.assertEqual(aq.image_status, AttemptQuestion.IMAGE_INVALID)
+        self.assertFalse(aq.image)
+        self.assertIsNone(aq.image_size)
+        self.assertFalse(ImageBlob.objects.exists())
+
+    def test_lost_or_failed_submits_discard_the_upload(self):
+        for outcome in (False, RuntimeError("grading failed")):
+            resp = self.client.post(
+                "/api/play/start/",
+                {"player_uuid": str(uuid.uuid4()), "count": 1},
+                content_type="application/json",
+            )
+            attempt = resp.json()
+            # another submit claims the attempt first, or grading blows up
+            with mock.patch("quiz.views.grade_attempt", side_effect=[outcome]):
+                try:
+                    resp = self.client.post(
+                        f"/api/play/submit/{attempt['id']}/",
+                        {
+                            "answers": json.dumps({"answers": {}}),
+                            "image": SimpleUploadedFile("cat.png", b"png"),
+                        },
+                    )
+                except RuntimeError:
+                    pass
+                else:
+                    self.assertEqual(resp.status_code, 409, resp.content)
+            self.assertEqual(staging_storage.listdir("answers/incoming"), ([], []))
@@ -0,0 +1,138 @@
+"""The async play views answer exactly like their DRF twins."""
+
+import io
+import json
+import uuid
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import path
+
+from quiz import async_views, views
+from quiz.models import Question
+from quiz.pool import question_pool
+
+from .utils import answer_for, clear_caches
+
+urlpatterns = [
+    route
+    for name, module in (("sync", views), ("async", async_views))
+    for route in (
+        path(f"{name}/play/start/", module.PlayStartView.as_view()),
+        path(f"{name}/play/submit/<int:attempt_id>/", module.PlaySubmitView.as_view()),
+        path(f"{name}/attempts/", module.AttemptsView.as_view()),
+        path(f"{name}/attempts/<int:pk>/", module.AttemptDetailView.as_view()),
+    )
+]
+
+TWINS = ("sync", "async")
+
+
+def comparable(data):
+    """A start or submit payload without what differs between attempts."""
+    data = dict(data)
+    for field in ("id", "created_at", "submitted_at"):
+        data.pop(field, None)
+    data["attempt_questions"] = sorted(
+        (
+            {k: v for k, v in aq.items() if k != "id"}
+            for aq in data["attempt_questions"]
+        ),
+        key=lambda aq: aq["question_id"],
+    )
+    return data
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncParityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("seed_questions", stdout=io.StringIO())
+        cls.count = Question.objects.count()
+
+    def setUp(self):
+        clear_caches()
+        question_pool.refresh(force=True)
+        self.player_uuid = str(uuid.uuid4())
+
+    def start(self, twin, body):
+        return self.client.post(
+            f"/{twin}/play/start/", body, content_type="application/json"
+        )
+
+    def submit(self, twin, attempt):
+        questions = Question.objects.in_bulk(
+            [aq["question_id"] for aq in attempt["attempt_questions"]]
+        )
+        answers = {
+            str(aq["id"]): answer_for(aq, questions[aq["question_id"]], True)
+            for aq in attempt["attempt_questions"]
+        }
+        return self.client.post(
+            f"/{twin}/play/submit/{attempt['id']}/",
+            {"answers": json.dumps({"answers": answers})},
+        )
+
+    def same(self, responses, normalize=lambda data: data):
+        sync, async_ = responses
+        self.assertEqual(sync.status_code, async_.status_code)
+        self.assertEqual(sync.get("ETag"), async_.get("ETag"))
+        self.assertEqual(sync.get("Cache-Control"), async_.get("Cache-Control"))
+        if sync.status_code != 304:
+            self.assertEqual(normalize(sync.json()), normalize(async_.json()))
+
+    def test_play_flow(self):
+        body = {"player_uuid": self.player_uuid, "count": self.count}
+        started = [self.start(twin, body) for twin in TWINS]
+        self.same(started, comparable)
+        self.assertEqual(started[0].status_code, 201)
+
+        attempts = [resp.json() for resp in started]
+        submitted = [self.submit(twin, a) for twin, a in zip(TWINS, attempts)]
+        self.same(submitted, comparable)
+        self.assertEqual(submitted[0].status_code, 200)
+        self.assertGreater(submitted[0].json()["score"], 0)
+
+        # both twins read each attempt the same way, from the cache or not
+        for attempt in attempts:
+            url = "/{}/attempts/%d/" % attempt["id"]
+            detail = [self.client.get(url.format(twin)) for twin in TWINS]
+            self.same(detail)
+            etag = detail[0]["ETag"]
+            self.same(
+                [self.client.get(url.format(t), HTTP_IF_NONE_MATCH=etag) for t in TWINS]
+            )
+        resubmitted = [self.submit(twin, a) for twin, a in zip(TWINS, attempts)]
+        self.same(resubmitted)
+        self.assertEqual(resubmitted[0].status_code, 409)
+
+        for query in ("", "&view=summary", "&page_size=1", "&cursor=bad"):
+            pages = [
+                self.client.get(
+                    f"/{twin}/attempts/?player_uuid={self.player_uuid}{query}"
+                )
+                for twin in TWINS
+            ]
+            if query != "&cursor=bad":
+                self.assertTrue(pages[0].json()["results"])
+            self.same(
+                pages,
+                lambda data: dict(
+                    data, next=data.get("next") and data["next"].split("?")[1]
+                ),
+            )
+
+    def test_errors(self):
+        for body in (
+            {},
+            {"player_uuid": self.player_uuid, "count": self.count + 1},
+            {"player_uuid": self.player_uuid, "difficulty": "impossible"},
+        ):
+            self.same([self.start(twin, body) for twin in TWINS])
+        self.same([self.client.get(f"/{twin}/attempts/0/") for twin in TWINS])
+        self.same(
+            [
+                self.client.post(f"/{twin}/play/submit/0/", {"answers": "{}"})
+                for twin in TWINS
+            ]
+        )
@@ -0,0 +1,102 @@
+"""Attempt lifecycle: started, then submitted once or expired."""
+
+import importlib
+import io
+import json
+import uuid
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from quiz.models import Attempt, AttemptQuestion, Category, Player, Question
+from quiz.pool import question_pool
+
+from .utils import clear_caches, play
+
+backfill = importlib.import_module("quiz.migrations.0014_backfill_attempt_status")
+
+
+class SubmitOnceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("seed_questions", stdout=io.StringIO())
+
+    def setUp(self):
+        clear_caches()
+        question_pool.refresh(force=True)
+
+    def submit(self, attempt_id):
+        return self.client.post(
+            f"/api/play/submit/{attempt_id}/",
+            {"answers": json.dumps({"answers": {}})},
+        )
+
+    def test_second_submit_conflicts(self):
+        submitted = play(self, str(uuid.uuid4()))
+        self.assertGreater(submitted["score"], 0)
+
+        resp = self.submit(submitted["id"])
+        self.assertEqual(resp.status_code, 409)
+        self.assertEqual(resp.json(), {"error": "Attempt already submitted"})
+        attempt = Attempt.objects.get(pk=submitted["id"])
+        self.assertEqual(attempt.status, Attempt.SUBMITTED)
+        self.assertEqual(attempt.score, submitted["score"])
+
+    def test_submitted_attempt_is_frozen(self):
+        submitted = play(self, str(uuid.uuid4()))
+        url = f"/api/attempts/{submitted['id']}/"
+        with self.assertNumQueries(0):  # cached by the submit
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json(), submitted)
+        with self.assertNumQueries(0):
+            resp = self.client.get(url, HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(resp.status_code, 304)
+
+    def test_expired_attempt_is_gone(self):
+        started = play(self, str(uuid.uuid4()), submit=False)
+        Attempt.objects.filter(pk=started["id"]).update(
+            created_at=timezone.now() - timedelta(days=2)
+        )
+        for _ in range(2):
+            resp = self.submit(started["id"])
+            self.assertEqual(resp.status_code, 410)
+            self.assertEqual(resp.json(), {"error": "Attempt has expired"})
+        attempt = Attempt.objects.get(pk=started["id"])
+        self.assertEqual(attempt.status, Attempt.EXPIRED)
+        self.assertIsNone(attempt.submitted_at)
+
+
+class AttemptStatusBackfillTests(TestCase):
+    def test_only_answered_attempts_become_submitted(self):
+        question = Question.objects.create(
+            prompt="2 + 2?",
+            qtype=Question.NUM,
+            category=Category.objects.create(name="Maths"),
+        )
+        player = Player.objects.create()
+
+        def attempt(score=0, **answer):
+            attempt = Attempt.objects.create(player=player, score=score)
+            AttemptQuestion.objects.create(
+                attempt=attempt, question=question, prompt="", qtype="num", **answer
+            )
+            return attempt
+
+        scored = attempt(score=1)
+        answered = attempt(numeric_response=5)
+        blank = attempt()
+        backfill.mark_submitted(apps, SimpleNamespace(connection=connection))
+
+        for submitted in (scored, answered):
+            submitted.refresh_from_db()
+            self.assertEqual(submitted.status, Attempt.SUBMITTED)
+            self.assertEqual(submitted.submitted_at, submitted.created_at)
+        blank.refresh_from_db()
+        self.assertEqual(blank.status, Attempt.STARTED)
+        self.assertIsNone(blank.submitted_at)
@@ -0,0 +1,64 @@
+"""Attempt history: keyset pages never skip or repeat a row."""
+
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from quiz.models import Attempt, Player
+
+
+class AttemptCursorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.player = Player.objects.create()
+        start = timezone.now() - timedelta(hours=1)
+        for i in range(23):
+            attempt = Attempt.objects.create(player=cls.player)
+            # groups of three share a timestamp, so ids break the ties
+            Attempt.objects.filter(pk=attempt.pk).update(
+                created_at=start + timedelta(minutes=i // 3)
+            )
+        Attempt.objects.create(player=Player.objects.create())  # someone else
+
+    def walk(self, url, on_page=lambda: None):
+        seen = []
+        while url:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200, resp.content)
+            body = resp.json()
+            self.assertLessEqual(len(body["results"]), 5)
+            seen.extend(row["id"] for row in body["results"])
+            url = body["next"]
+            on_page()
+        return seen
+
+    def expected(self):
+        return list(
+            Attempt.objects.filter(player=self.player)
+            .order_by("-created_at", "-id")
+            .values_list("id", flat=True)
+        )
+
+    def test_pages_cover_every_attempt_once(self):
+        expected = self.expected()
+        for view in ("", "&view=summary"):
+            seen = self.walk(
+                f"/api/attempts/?player_uuid={self.player.player_uuid}"
+                f"&page_size=5{view}"
+            )
+            self.assertEqual(seen, expected)
+
+    def test_new_attempts_do_not_shift_pages(self):
+        expected = self.expected()
+        seen = self.walk(
+            f"/api/attempts/?player_uuid={self.player.player_uuid}&page_size=5",
+            on_page=lambda: Attempt.objects.create(player=self.player),
+        )
+        self.assertEqual(seen, expected)
+
+    def test_bad_cursor(self):
+        resp = self.client.get(
+            f"/api/attempts/?player_uuid={self.player.player_uuid}&cursor=garbage"
+        )
+        self.assertEqual(resp.status_code, 404)
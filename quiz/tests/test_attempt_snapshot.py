@@ -0,0 +1,102 @@
+"""Attempts carry their own choice snapshot: reads never join the bank."""
+
+import importlib
+import io
+import uuid
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from quiz.models import Attempt, AttemptQuestion, Choice, Player, Question
+from quiz.play import with_attempt_questions
+from quiz.pool import question_pool
+from quiz.serializers import AttemptSerializer
+
+from .utils import clear_caches
+
+backfill = importlib.import_module("quiz.migrations.0011_backfill_choice_snapshots")
+
+
+class AttemptSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("seed_questions", stdout=io.StringIO())
+        cls.question = Question.objects.filter(qtype=Question.SINGLE).first()
+
+    def setUp(self):
+        clear_caches()
+        question_pool.refresh(force=True)
+
+    def start(self):
+        resp = self.client.post(
+            "/api/play/start/",
+            {"player_uuid": str(uuid.uuid4()), "count": Question.objects.count()},
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 201, resp.content)
+        return resp.json()
+
+    def single(self, attempt):
+        return next(
+            aq
+            for aq in attempt["attempt_questions"]
+            if aq["question_id"] == self.question.pk
+        )
+
+    def test_reads_never_touch_questions(self):
+        attempt_id = self.start()["id"]
+        with CaptureQueriesContext(connection) as queries:
+            data = AttemptSerializer(
+                with_attempt_questions(Attempt.objects.all()).get(pk=attempt_id)
+            ).data
+        self.assertEqual(len(queries), 2)
+        for query in queries:
+            self.assertNotIn("quiz_question", query["sql"])
+            self.assertNotIn("quiz_choice", query["sql"])
+        shown = self.single(data)["choices"]
+        self.assertEqual(
+            shown,
+            [
+                {"id": c.id, "text": c.text, "is_correct": c.is_correct}
+                for c in self.question.choices.order_by("id")
+            ],
+        )
+
+    def test_snapshot_survives_recreated_choices(self):
+        attempt = self.start()
+        started = self.single(attempt)
+        self.question.choices.all().delete()
+        Choice.objects.create(question=self.question, text="New", is_correct=True)
+
+        detail = self.single(self.client.get(f"/api/attempts/{attempt['id']}/").json())
+        self.assertEqual(detail["choices"], started["choices"])
+        self.assertLessEqual(
+            set(detail["correct_choice_ids"]), {c["id"] for c in detail["choices"]}
+        )
+
+    def test_backfill(self):
+        attempt = Attempt.objects.create(player=Player.objects.create())
+        aq = AttemptQuestion.objects.create(
+            attempt=attempt,
+            question=self.question,
+            prompt=self.question.prompt,
+            qtype=self.question.qtype,
+        )
+        text = AttemptQuestion.objects.create(
+            attempt=attempt,
+            question=Question.objects.filter(qtype=Question.TEXT).first(),
+            prompt="",
+            qtype=Question.TEXT,
+        )
+        backfill.backfill_choices(apps, SimpleNamespace(connection=connection))
+        aq.refresh_from_db()
+        text.refresh_from_db()
+        self.assertEqual(
+            [c["id"] for c in aq.choices],
+            list(self.question.choices.order_by("id").values_list("id", flat=True)),
+        )
+        self.assertEqual(text.choices, [])
@@ -0,0 +1,61 @@
+"""bench_play: plays the whole flow and reports every endpoint."""
+
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from quiz.management.commands import bench_play
+
+from .utils import clear_caches
+
+
+class BenchPlayTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        # the test runner has already set the test environment up
+        for name in ("setup_test_environment", "teardown_test_environment"):
+            self.enterContext(mock.patch.object(bench_play, name))
+
+    def test_reports_every_endpoint(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.json")
+            out = io.StringIO()
+            call_command(
+                "bench_play",
+                questions=10,
+                players=3,
+                rounds=2,
+                in_place=True,
+                output=path,
+                stdout=out,
+            )
+            with open(path) as fh:
+                results = json.load(fh)
+
+        self.assertIn("3 players x 2 rounds, 10 questions", out.getvalue())
+        self.assertEqual(results["meta"]["players"], 3)
+        self.assertEqual(list(results["endpoints"]), bench_play.ENDPOINTS)
+        for name, row in results["endpoints"].items():
+            with self.subTest(endpoint=name):
+                self.assertEqual(row["requests"], 6)
+                self.assertLessEqual(row["p50_ms"], row["p99_ms"])
+                self.assertLessEqual(row["queries_avg"], row["queries_max"])
+        # submitted attempts are read back from the frozen payload
+        self.assertEqual(results["endpoints"]["detail"]["queries_max"], 0)
+
+    def test_counts_must_allow_a_play(self):
+        for options in ({"players": 0}, {"rounds": 0}, {"questions": 4}):
+            with self.subTest(**options), self.assertRaises(CommandError):
+                call_command("bench_play", in_place=True, **options)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(bench_play.percentile(values, 50), 50)
+        self.assertEqual(bench_play.percentile(values, 99), 99)
+        self.assertEqual(bench_play.percentile([7], 95), 7)
+        self.assertIsNone(bench_play.percentile([], 50))
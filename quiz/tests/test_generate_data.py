@@ -0,0 +1,110 @@
+"""generate_data: seed-stable content, one run per seed, consistent aggregates."""
+
+import io
+
+from django.core.management import CommandError, call_command
+from django.db.models import Count, Max, Q, Sum
+from django.test import TestCase
+
+from quiz.models import (
+    Attempt,
+    AttemptQuestion,
+    Category,
+    Player,
+    PlayerStats,
+    Question,
+    QuestionStats,
+)
+
+OPTIONS = {
+    "seed": 3,
+    "categories": 2,
+    "questions": 30,
+    "players": 6,
+    "attempts": "1-3",
+    "questions_per_attempt": 4,
+}
+
+
+def generate(**options):
+    out = io.StringIO()
+    call_command("generate_data", stdout=out, stderr=out, **{**OPTIONS, **options})
+
+
+class GenerateDataTests(TestCase):
+    def content(self):
+        """Everything the seed decides, without primary keys or clocks."""
+        return (
+            list(
+                Question.objects.order_by("pk").values_list(
+                    "prompt", "qtype", "difficulty", "category__name"
+                )
+            ),
+            list(Player.objects.order_by("pk").values_list("player_uuid", flat=True)),
+            list(
+                Attempt.objects.order_by("pk").values_list(
+                    "player__player_uuid", "status", "score", "total"
+                )
+            ),
+            list(
+                AttemptQuestion.objects.order_by("pk").values_list(
+                    "question__prompt", "is_correct", "text_response"
+                )
+            ),
+        )
+
+    def test_same_seed_same_content(self):
+        generate()
+        first = self.content()
+        self.assertEqual(len(first[1]), OPTIONS["players"])
+        Player.objects.all().delete()
+        Question.objects.all().delete()
+        Category.objects.all().delete()
+
+        generate()
+        self.assertEqual(self.content(), first)
+        generate(seed=4, questions=0)  # another seed adds players
+        self.assertEqual(Player.objects.count(), 2 * OPTIONS["players"])
+
+    def test_rerunning_a_seed_is_refused(self):
+        generate()
+        counts = Question.objects.count(), Player.objects.count()
+        for options in ({}, {"questions": 0}, {"players": 0}):
+            with self.subTest(**options), self.assertRaises(CommandError):
+                generate(**options)
+        self.assertEqual((Question.objects.count(), Player.objects.count()), counts)
+
+    def test_answers_and_aggregates_are_consistent(self):
+        generate(correct=1.0)
+        # image answers carry no file, so grading would never credit them
+        self.assertFalse(
+            AttemptQuestion.objects.filter(
+                qtype=Question.IMAGE, is_correct=True
+            ).exists()
+        )
+        self.assertTrue(AttemptQuestion.objects.filter(is_correct=True).exists())
+        for attempt in Attempt.objects.annotate(
+            correct=Count(
+                "attempt_questions", filter=Q(attempt_questions__is_correct=True)
+            )
+        ):
+            self.assertEqual(attempt.score, attempt.correct)
+
+        submitted = Attempt.objects.filter(status=Attempt.SUBMITTED)
+        expected = {
+            row["player_id"]: (row["best"], row["n"], row["correct"])
+            for row in submitted.values("player_id").annotate(
+                best=Max("score"), n=Count("id"), correct=Sum("score")
+            )
+        }
+        self.assertEqual(
+            {
+                s.player_id: (s.best_score, s.attempts, s.correct)
+                for s in PlayerStats.objects.all()
+            },
+            expected,
+        )
+        self.assertEqual(
+            QuestionStats.objects.aggregate(n=Sum("served"))["n"],
+            AttemptQuestion.objects.count(),
+        )
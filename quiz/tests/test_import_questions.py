@@ -0,0 +1,126 @@
+"""Bulk bank imports: validation, dry runs and resuming."""
+
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from quiz import search
+from quiz.models import Category, Choice, Question
+
+RECORDS = [
+    {
+        "prompt": "Capital of France?",
+        "qtype": "single",
+        "category": "Geo",
+        "difficulty": "easy",
+        "choices": [
+            {"text": "Paris", "is_correct": True},
+            {"text": "Lyon", "is_correct": False},
+        ],
+    },
+    {"prompt": "Bad type", "qtype": "essay", "difficulty": "easy"},
+    {
+        "prompt": "Longest river?",
+        "qtype": "text",
+        "text_answer": "Nile",
+        "category": "Geo",
+        "difficulty": "med",
+    },
+    {
+        "prompt": "No correct choice",
+        "qtype": "single",
+        "difficulty": "easy",
+        "choices": [{"text": "a", "is_correct": False}],
+    },
+    {
+        "prompt": "2 + 2?",
+        "qtype": "numeric",
+        "numeric_answer": 4,
+        "category": "Maths",
+        "difficulty": "easy",
+    },
+]
+
+
+class ImportQuestionsTests(TestCase):
+    def setUp(self):
+        tmp = self.enterContext(tempfile.TemporaryDirectory())
+        self.path = os.path.join(tmp, "bank.jsonl")
+        with open(self.path, "w", encoding="utf-8") as fh:
+            for record in RECORDS[:3]:
+                fh.write(json.dumps(record) + "\n")
+            fh.write("{not json\n")
+            for record in RECORDS[3:]:
+                fh.write(json.dumps(record) + "\n")
+
+    def run_import(self, path=None, **options):
+        out, err = io.StringIO(), io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "import_questions", path or self.path, stdout=out, stderr=err, **options
+            )
+        return out.getvalue(), err.getvalue()
+
+    def test_invalid_records_are_reported_and_skipped(self):
+        out, err = self.run_import(batch_size=2)
+        self.assertIn("3 questions imported, 3 invalid, 6 records", out)
+        for line in (2, 4, 5):
+            self.assertIn(f"line {line}:", err)
+        self.assertEqual(
+            set(Question.objects.values_list("prompt", flat=True)),
+            {"Capital of France?", "Longest river?", "2 + 2?"},
+        )
+        self.assertEqual(
+            set(Category.objects.values_list("name", flat=True)), {"Geo", "Maths"}
+        )
+        paris = Choice.objects.get(text="Paris")
+        self.assertTrue(paris.is_correct)
+        self.assertEqual(paris.question.category.name, "Geo")
+        if search.available():
+            self.assertEqual(
+                search.ranked_ids(search.QUESTIONS, "paris"), [paris.question_id]
+            )
+
+    def test_dry_run_writes_nothing(self):
+        out, _ = self.run_import(dry_run=True)
+        self.assertIn("3 questions validated, 3 invalid", out)
+        self.assertFalse(Question.objects.exists())
+        self.assertFalse(Category.objects.exists())
+
+    def test_resume_skips_committed_records(self):
+        _, err = self.run_import(batch_size=1, progress=1)
+        self.assertIn("resume with --start-line 4", err)  # after record 3
+        Question.objects.exclude(prompt="Capital of France?").delete()
+
+        out, _ = self.run_import(start_line=2)
+        self.assertIn("2 questions imported, 3 invalid, 5 records", out)
+        self.assertEqual(Question.objects.count(), 3)
+        self.assertEqual(
+            Question.objects.filter(prompt="Capital of France?").count(), 1
+        )
+
+    def test_counts_must_be_positive(self):
+        for options in ({"progress": 0}, {"batch_size": 0}):
+            with self.assertRaises(CommandError):
+                self.run_import(**options)
+        self.assertFalse(Question.objects.exists())
+
+    def test_csv(self):
+        path = os.path.join(os.path.dirname(self.path), "bank.csv")
+        with open(path, "w", encoding="utf-8", newline="") as fh:
+            fh.write("prompt,qtype,difficulty,choices\n")
+            fh.write('"Primes?",multi,easy,1|*2|*3|4\n')
+            fh.write("Empty,single,easy,\n")
+        out, _ = self.run_import(path)
+        self.assertIn("1 questions imported, 1 invalid", out)
+        question = Question.objects.get(prompt="Primes?")
+        self.assertEqual(
+            sorted(
+                question.choices.filter(is_correct=True).values_list("text", flat=True)
+            ),
+            ["2", "3"],
+        )
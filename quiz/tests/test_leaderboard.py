@@ -0,0 +1,92 @@
+"""Leaderboard aggregates: maintained by submits, equal to a full rebuild."""
+
+import io
+import uuid
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from quiz import leaderboard
+from quiz.models import Category, CategoryStats, PlayerStats
+
+from .utils import play
+
+
+class LeaderboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("seed_questions", stdout=io.StringIO())
+        cls.category = Category.objects.get(name="General")
+
+    def play(self, player_uuid, correct: bool):
+        return play(self, player_uuid, correct)
+
+    def snapshot(self):
+        players = list(
+            PlayerStats.objects.order_by("pk").values_list(
+                "player_id", "best_score", "attempts", "correct", "answered"
+            )
+        )
+        categories = list(
+            CategoryStats.objects.order_by("player_id", "category_id").values_list(
+                "player_id", "category_id", "correct", "answered"
+            )
+        )
+        return players, categories
+
+    def test_submits_match_rebuild(self):
+        alice, bob = str(uuid.uuid4()), str(uuid.uuid4())
+        scores = [self.play(alice, True)["score"], self.play(alice, False)["score"]]
+        self.play(bob, False)
+        self.assertGreater(scores[0], 0)
+        self.assertGreater(scores[0], scores[1])
+
+        stats = PlayerStats.objects.get(player__player_uuid=alice)
+        self.assertEqual(stats.attempts, 2)
+        self.assertEqual(stats.best_score, max(scores))
+        self.assertEqual(stats.correct, sum(scores))
+        self.assertEqual(stats.answered, 10)
+
+        incremental = self.snapshot()
+        call_command("rebuild_leaderboard", stdout=io.StringIO())
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_endpoints(self):
+        alice, bob = str(uuid.uuid4()), str(uuid.uuid4())
+        self.play(bob, False)
+        self.play(alice, True)
+
+        board = self.client.get("/api/leaderboard/").json()
+        self.assertEqual([row["rank"] for row in board], [1, 2])
+        self.assertGreaterEqual(board[0]["best_score"], board[1]["best_score"])
+        self.assertNotIn("player_uuid", board[0])
+
+        ranks = {
+            who: self.client.get(f"/api/leaderboard/players/{who}/").json()["rank"]
+            for who in (alice, bob)
+        }
+        self.assertEqual(sorted(ranks.values()), [1, 2])
+        self.assertEqual(
+            [row["player"] for row in board],
+            [
+                PlayerStats.objects.get(player__player_uuid=who).player_id
+                for who in sorted(ranks, key=ranks.get)
+            ],
+        )
+
+        by_category = self.client.get(
+            "/api/leaderboard/", {"category": self.category.pk, "limit": 1}
+        ).json()
+        self.assertEqual(len(by_category), 1)
+        self.assertEqual(by_category[0]["rank"], 1)
+        row = leaderboard.rank_of(
+            PlayerStats.objects.get(player__player_uuid=alice).player,
+            self.category.pk,
+        )
+        self.assertEqual(row.answered, 5)
+
+        missing = self.client.get(f"/api/leaderboard/players/{uuid.uuid4()}/")
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(
+            self.client.get("/api/leaderboard/", {"category": 999}).status_code, 404
+        )
@@ -0,0 +1,68 @@
+"""Fuzzy text matching: the fast paths never change a verdict."""
+
+import random
+import threading
+from difflib import SequenceMatcher
+
+from django.test import SimpleTestCase
+
+from quiz.matching import TextMatcher, norm_text
+
+
+class TextMatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.matcher = TextMatcher(max_input=4096, cache_size=1000)
+
+    def assertSameVerdict(self, a, b, threshold):
+        expected = (
+            SequenceMatcher(None, norm_text(a), norm_text(b)).ratio() >= threshold
+        )
+        for _ in range(2):  # computed, then from the verdict cache
+            self.assertEqual(
+                self.matcher.match(a, b, threshold), expected, (a[:20], b[:20])
+            )
+
+    def test_verdicts_match_sequence_matcher(self):
+        rng = random.Random(5)
+        longest = "".join(rng.choice("ab c") for _ in range(4096))
+        pairs = [
+            ("", ""),
+            ("", "Paris"),
+            ("Paris", ""),
+            ("   ", ""),
+            (" \t\n ", "   "),
+            ("   ", "Paris"),
+            ("paris", " PARIS "),
+            ("Pariss", "Paris"),
+            ("Lyon", "Paris"),
+            ("ab", "ba"),
+            (longest, longest),
+            (longest, longest[:-300]),
+            (longest, longest[::-1]),
+            ("x" * 4096, "x" * 4000 + "y" * 96),
+        ]
+        for threshold in (0.0, 0.5, 0.85, 1.0):
+            for a, b in pairs:
+                self.assertSameVerdict(a, b, threshold)
+
+    def test_oversize_is_rejected(self):
+        answer = "x" * 4097
+        self.assertFalse(self.matcher.match(answer, answer))
+        self.assertEqual(self.matcher.stats()["oversize"], 1)
+
+    def test_cache_keys_do_not_collide(self):
+        self.assertTrue(self.matcher.match("ab", "ab", 1.0))
+        self.assertFalse(self.matcher.match("a", "bab", 1.0))
+        self.assertFalse(self.matcher.match("ab", "ab ", 1.1))
+
+    def test_counters_are_exact_across_threads(self):
+        def grade():
+            for i in range(500):
+                self.matcher.match(f"answer {i % 50}", "answer 7")
+
+        threads = [threading.Thread(target=grade) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.matcher.stats()["calls"], 4000)
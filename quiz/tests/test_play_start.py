@@ -0,0 +1,49 @@
+"""Starting an attempt: a fixed number of queries, one player per UUID."""
+
+import io
+import uuid
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from quiz.models import Attempt, Player, Question
+from quiz.pool import question_pool
+
+from .utils import play
+
+
+class PlayStartTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("seed_questions", stdout=io.StringIO())
+
+    def setUp(self):
+        question_pool.refresh(force=True)
+
+    def test_queries_do_not_grow_with_count(self):
+        player_uuid = str(uuid.uuid4())
+        total = Question.objects.count()
+        # from here on the player exists; stats rows are still created on
+        # demand for most questions, in the same statements either way
+        play(self, player_uuid, submit=False)
+        used = []
+        for count in (1, total):
+            with CaptureQueriesContext(connection) as queries:
+                attempt = play(self, player_uuid, submit=False, count=count)
+            self.assertEqual(len(attempt["attempt_questions"]), count)
+            used.append(len(queries))
+        self.assertEqual(used[0], used[1])
+
+    def test_same_uuid_reuses_the_player(self):
+        player_uuid = str(uuid.uuid4())
+        first = play(self, player_uuid, submit=False)
+        second = play(self, player_uuid, submit=False)
+        self.assertNotEqual(first["id"], second["id"])
+        player = Player.objects.get(player_uuid=player_uuid)
+        self.assertEqual(
+            set(Attempt.objects.filter(player=player).values_list("id", flat=True)),
+            {first["id"], second["id"]},
+        )
+        self.assertEqual(Player.objects.count(), 1)
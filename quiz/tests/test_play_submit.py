@@ -0,0 +1,69 @@
+"""Submitting an attempt: a fixed number of queries, however many answers."""
+
+import json
+import uuid
+
+from django.test import TestCase
+
+from quiz import search
+from quiz.models import Category, Choice, Question
+from quiz.pool import question_pool
+
+from .utils import answer_for, clear_caches, play
+
+
+class PlaySubmitTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="General")
+        for i in range(10):
+            Question.objects.create(
+                prompt=f"Say {i}",
+                qtype=Question.TEXT,
+                text_answer=str(i),
+                category=category,
+            )
+            Question.objects.create(
+                prompt=f"{i} + 1?",
+                qtype=Question.NUM,
+                numeric_answer=i + 1,
+                category=category,
+            )
+            question = Question.objects.create(
+                prompt=f"Pick {i}", qtype=Question.MULTI, category=category
+            )
+            Choice.objects.bulk_create(
+                Choice(question=question, text=str(n), is_correct=n == i)
+                for n in range(10)
+            )
+
+    def setUp(self):
+        clear_caches()
+        question_pool.refresh(force=True)
+
+    def submit(self, player_uuid, count):
+        attempt = play(self, player_uuid, submit=False, count=count)
+        questions = Question.objects.in_bulk(
+            [aq["question_id"] for aq in attempt["attempt_questions"]]
+        )
+        answers = {
+            str(aq["id"]): answer_for(aq, questions[aq["question_id"]], True)
+            for aq in attempt["attempt_questions"]
+        }
+        # load the attempt and its rows; claim it and write every row in
+        # one UPDATE; index text answers; upsert the leaderboard and the
+        # question stats (an INSERT and an UPDATE each); SAVEPOINT/RELEASE
+        expected = 13 if search.available() else 12
+        with self.assertNumQueries(expected):
+            resp = self.client.post(
+                f"/api/play/submit/{attempt['id']}/",
+                {"answers": json.dumps({"answers": answers})},
+            )
+        self.assertEqual(resp.status_code, 200, resp.content)
+        self.assertEqual(resp.json()["score"], count)
+
+    def test_queries_do_not_grow_with_answers(self):
+        player_uuid = str(uuid.uuid4())
+        for count in (5, 30):
+            with self.subTest(count=count):
+                self.submit(player_uuid, count)
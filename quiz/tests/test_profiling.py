@@ -0,0 +1,57 @@
+"""Profiling middleware: Server-Timing metrics and per-view aggregates."""
+
+import re
+
+from django.test import TestCase, override_settings
+
+from quiz.middleware import view_stats
+from quiz.models import Category, Question
+
+from .utils import clear_caches
+
+
+@override_settings(QUIZ_PROFILING=True)
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Geo")
+        for i in range(20):
+            Question.objects.create(
+                prompt=f"Question {i}",
+                qtype=Question.TEXT,
+                text_answer="a",
+                category=category,
+                difficulty=Question.EASY,
+            )
+
+    def setUp(self):
+        clear_caches()
+        view_stats.reset()
+        self.addCleanup(view_stats.reset)
+
+    def timings(self, resp):
+        return {
+            name: float(dur)
+            for name, dur in re.findall(r"([\w-]+);dur=([\d.]+)", resp["Server-Timing"])
+        }
+
+    def test_serialization_is_its_own_metric(self):
+        resp = self.client.get("/api/questions/?include=stats")  # never cached
+        self.assertEqual(resp.status_code, 200)
+        timings = self.timings(resp)
+        self.assertEqual(
+            set(timings), {"db", "serialize", "render", "slowest-sql", "total"}
+        )
+        self.assertGreater(timings["serialize"], 0)
+        self.assertLess(timings["serialize"], timings["total"])
+
+        stats = view_stats.snapshot()["QuestionViewSet"]
+        self.assertEqual(stats["requests"], 1)
+        self.assertAlmostEqual(
+            stats["avg_serialize_ms"], timings["serialize"], places=1
+        )
+
+    def test_cached_payloads_skip_serialization(self):
+        self.client.get("/api/questions/")
+        resp = self.client.get("/api/questions/")
+        self.assertEqual(self.timings(resp)["serialize"], 0)
@@ -0,0 +1,319 @@
+"""EXPLAIN-based regression checks for the ORM queries on the hot paths.
+
+Each test fails when a query falls back to a full table scan or needs a
+temporary sort. Runs on SQLite (EXPLAIN QUERY PLAN) and on PostgreSQL
+(EXPLAIN (FORMAT JSON), with seq scans and sorts disabled so the planner
+reports whether an index path exists at all).
+"""
+
+import io
+import json
+import uuid
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Prefetch
+from django.test import RequestFactory, TestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+
+from quiz import leaderboard, search
+from quiz.models import (
+    Attempt,
+    AttemptQuestion,
+    BankChange,
+    Category,
+    CategoryStats,
+    Choice,
+    Player,
+    PlayerStats,
+    Question,
+)
+from quiz.pagination import AttemptCursorPagination
+from quiz.pool import QuestionPool
+
+
+def sqlite_problems(plan: str, allow_scan, allow_sort=False):
+    problems = []
+    for line in plan.splitlines():
+        # Django prefixes each row with "id parent notused"
+        detail = line.split(" ", 3)[-1]
+        if "TEMP B-TREE" in detail:
+            if not allow_sort:
+                problems.append(detail)
+        elif "VIRTUAL TABLE INDEX" in detail:
+            continue  # an FTS5 MATCH lookup
+        elif detail.startswith("SCAN ") and " USING " not in detail:
+            table = detail.split()[1]
+            if table not in allow_scan:
+                problems.append(detail)
+    return problems
+
+
+def postgres_problems(plan: str, allow_scan, allow_sort=False):
+    problems = []
+
+    def walk(node):
+        kind = node["Node Type"]
+        if kind == "Seq Scan" and node.get("Relation Name") not in allow_scan:
+            problems.append(f"Seq Scan on {node.get('Relation Name')}")
+        elif kind in ("Sort", "Incremental Sort") and not allow_sort:
+            problems.append(f"{kind} on {node.get('Sort Key')}")
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(json.loads(plan)[0]["Plan"])
+    return problems
+
+
+class QueryPlanTestCase(TestCase):
+    """Adds ``assertIndexedPlan(queryset, allow_scan=...)``."""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("seed_questions", stdout=io.StringIO())
+        cls.player = Player.objects.create(player_uuid=uuid.uuid4())
+        cls.attempt = Attempt.objects.create(player=cls.player)
+        AttemptQuestion.objects.bulk_create(
+            AttemptQuestion(attempt=cls.attempt, question=q, prompt=q.prompt)
+            for q in Question.objects.all()[:5]
+        )
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+                cursor.execute("SET enable_sort = off")
+
+    def assertIndexedPlan(self, qs, allow_scan=(), allow_sort=False):
+        if connection.vendor == "postgresql":
+            plan = qs.explain(format="json")
+            problems = postgres_problems(plan, set(allow_scan), allow_sort)
+        else:
+            plan = qs.explain()
+            problems = sqlite_problems(plan, set(allow_scan), allow_sort)
+        if problems:
+            self.fail(
+                "Query plan regressed:\n  "
+                + "\n  ".join(problems)
+                + f"\n\nSQL: {qs.query}\n\nPlan:\n{plan}"
+            )
+
+
+@skipUnlessDBFeature("supports_explaining_query_execution")
+class PlayStartPlanTests(QueryPlanTestCase):
+    def test_pool_rebuild_reads_only_the_stratum_index(self):
+        # a covering index scan, never the wide question rows
+        self.assertIndexedPlan(QuestionPool.rows())
+
+    def test_pool_incremental_reload(self):
+        # only the changed questions, by primary key
+        changed = set(Question.objects.values_list("id", flat=True)[:3])
+        self.assertIndexedPlan(QuestionPool.rows(changed))
+        # and the bumps since the pool's version
+        self.assertIndexedPlan(
+            BankChange.objects.filter(version__gte=1, version__lte=2).order_by(
+                "version"
+            )
+        )
+
+    def test_selected_questions_by_pk(self):
+        qs = Question.objects.only("id", "prompt", "qtype").filter(id__in=[1, 2, 3])
+        self.assertIndexedPlan(qs)
+
+    def test_selected_question_choices(self):
+        self.assertIndexedPlan(Choice.objects.filter(question_id__in=[1, 2, 3]))
+
+    def test_correct_choices(self):
+        qs = Choice.objects.filter(question_id__in=[1, 2, 3], is_correct=True)
+        self.assertIndexedPlan(qs)
+
+    def test_stratum_filter(self):
+        category = Category.objects.first()
+        qs = Question.objects.filter(
+            category=category, difficulty=Question.EASY, qtype=Question.TEXT
+        ).values_list("id", flat=True)
+        self.assertIndexedPlan(qs)
+
+
+@skipUnlessDBFeature("supports_explaining_query_execution")
+class AttemptPlanTests(QueryPlanTestCase):
+    def test_player_by_uuid(self):
+        qs = Player.objects.filter(player_uuid=self.player.player_uuid)
+        self.assertIndexedPlan(qs)
+
+    def test_attempts_first_page(self):
+        qs = Attempt.objects.filter(player_id=self.player.id).order_by(
+            *AttemptCursorPagination.ordering
+        )[:51]
+        self.assertIndexedPlan(qs)
+
+    def test_attempts_after_cursor(self):
+        qs = AttemptCursorPagination.filter_after(
+            Attempt.objects.filter(player_id=self.player.id),
+            self.attempt.created_at,
+            self.attempt.id,
+        ).order_by(*AttemptCursorPagination.ordering)[:51]
+        self.assertIndexedPlan(qs)
+
+    def test_attempt_questions_prefetch(self):
+        qs = AttemptQuestion.objects.filter(attempt_id__in=[self.attempt.id])
+        self.assertIndexedPlan(qs)
+
+    def test_attempt_questions_with_questions(self):
+        qs = self.attempt.attempt_questions.select_related("question")
+        self.assertIndexedPlan(qs)
+
+
+@skipUnlessDBFeature("supports_explaining_query_execution")
+class QuestionListingPlanTests(QueryPlanTestCase):
+    def test_listing_choices_prefetch(self):
+        # the listing itself returns every question, so only the driving
+        # table may be scanned; the nested choices must come from an index
+        questions = Question.objects.all().prefetch_related(
+            Prefetch("choices", queryset=Choice.objects.all())
+        )
+        self.assertIndexedPlan(questions, allow_scan={"quiz_question"})
+        ids = [q.id for q in questions]
+        self.assertIndexedPlan(Choice.objects.filter(question_id__in=ids))
+
+
+@skipUnlessDBFeature("supports_explaining_query_execution")
+class AdminSearchPlanTests(QueryPlanTestCase):
+    # icontains cannot use a B-tree, so the searched model's own table may
+    # be scanned; every join the search adds must still be indexed. Models
+    # with a full-text index must not scan at all.
+    def search(self, model, term="paris"):
+        model_admin = admin.site._registry[model]
+        request = RequestFactory().get("/")
+        qs, _ = model_admin.get_search_results(request, model.objects.all(), term)
+        return qs.order_by("-pk")[: model_admin.list_per_page]
+
+    def test_question_search(self):
+        table = Question._meta.db_table
+        allow_scan = set() if search.available() else {table}
+        self.assertIndexedPlan(self.search(Question), allow_scan=allow_scan)
+
+    def test_choice_search(self):
+        table = Choice._meta.db_table
+        self.assertIndexedPlan(self.search(Choice), allow_scan={table})
+
+    def test_attempt_search(self):
+        table = Attempt._meta.db_table
+        self.assertIndexedPlan(self.search(Attempt), allow_scan={table})
+
+    def test_attempt_question_search(self):
+        table = AttemptQuestion._meta.db_table
+        if search.available():
+            # OR of two index lookups; only the matching rows are sorted
+            self.assertIndexedPlan(self.search(AttemptQuestion), allow_sort=True)
+        else:
+            self.assertIndexedPlan(self.search(AttemptQuestion), allow_scan={table})
+
+
+@skipUnlessDBFeature("supports_explaining_query_execution")
+class AdminChangelistPlanTests(QueryPlanTestCase):
+    # the page itself is a LIMITed walk down the primary key (SQLite reports
+    # it as a SCAN); each computed column must be an indexed lookup
+    def changelist(self, model):
+        model_admin = admin.site._registry[model]
+        request = RequestFactory().get("/")
+        return model_admin.get_queryset(request).order_by("-pk")[
+            : model_admin.list_per_page
+        ]
+
+    def test_question_count_column(self):
+        table = Category._meta.db_table
+        self.assertIndexedPlan(self.changelist(Category), allow_scan={table})
+
+    def test_attempts_count_column(self):
+        table = Player._meta.db_table
+        self.assertIndexedPlan(self.changelist(Player), allow_scan={table})
+
+    def test_correct_ratio_column(self):
+        table = Attempt._meta.db_table
+        self.assertIndexedPlan(self.changelist(Attempt), allow_scan={table})
+
+
+class AdminChangelistQueryCountTests(TestCase):
+    """A changelist page costs the same number of queries at any size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("seed_questions", stdout=io.StringIO())
+        cls.user = get_user_model().objects.create_superuser("admin", "", "pw")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def add_attempts(self, n):
+        questions = list(Question.objects.all()[:5])
+        for _ in range(n):
+            attempt = Attempt.objects.create(
+                player=Player.objects.create(player_uuid=uuid.uuid4())
+            )
+            AttemptQuestion.objects.bulk_create(
+                AttemptQuestion(attempt=attempt, question=q, prompt=q.prompt)
+                for q in questions
+            )
+
+    def queries(self, model):
+        opts = model._meta
+        url = f"/admin/{opts.app_label}/{opts.model_name}/"
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(ctx)
+
+    def test_query_count_is_independent_of_rows(self):
+        models = [Category, Question, Choice, Player, Attempt, AttemptQuestion]
+        self.add_attempts(2)
+        before = {model: self.queries(model) for model in models}
+        self.add_attempts(10)
+        after = {model: self.queries(model) for model in models}
+        self.assertEqual(before, after)
+
+
+@skipUnlessDBFeature("supports_explaining_query_execution")
+class LeaderboardPlanTests(QueryPlanTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        category = Category.objects.first()
+        PlayerStats.objects.create(player=cls.player, best_score=3, correct=3)
+        CategoryStats.objects.create(player=cls.player, category=category, correct=3)
+        cls.category = category
+
+    def test_top(self):
+        qs = PlayerStats.objects.order_by("-best_score", "-correct", "player_id")
+        self.assertIndexedPlan(qs[: leaderboard.MAX_LIMIT])
+
+    def test_category_top(self):
+        qs = CategoryStats.objects.filter(category=self.category).order_by(
+            "-correct", "player_id"
+        )
+        self.assertIndexedPlan(qs[: leaderboard.MAX_LIMIT])
+
+    def assertBoundedCount(self, row, index, column):
+        # rank_of counts these rows: the walk must start at ``row``'s score,
+        # not at the top of the index or the category
+        self.assertIndexedPlan(leaderboard.ahead_of(row))
+        if connection.vendor != "sqlite":
+            return
+        with CaptureQueriesContext(connection) as ctx:
+            leaderboard.rank_of(self.player, getattr(row, "category_id", None))
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + ctx.captured_queries[-1]["sql"])
+            searches = [r[-1] for r in cursor.fetchall() if "SEARCH" in r[-1]]
+        self.assertTrue(searches)
+        for line in searches:
+            self.assertIn(f"COVERING INDEX {index} (", line)
+            self.assertRegex(line, rf"\b{column}[>=]")
+
+    def test_rank(self):
+        row = PlayerStats.objects.get(player=self.player)
+        self.assertBoundedCount(row, "leaderboard_idx", "best_score")
+
+    def test_category_rank(self):
+        row = CategoryStats.objects.get(player=self.player)
+        self.assertBoundedCount(row, "category_leaderboard_idx", "correct")
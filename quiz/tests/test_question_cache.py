@@ -0,0 +1,66 @@
+"""Question payloads: shared ETags, 304s, and bank edits invalidating them."""
+
+from django.test import TestCase, override_settings
+
+from quiz.models import Category, Question
+from quiz.versioning import get_bank_version
+
+from .utils import clear_caches
+
+
+class QuestionETagTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.question = Question.objects.create(
+            prompt="Capital of France?",
+            qtype=Question.TEXT,
+            text_answer="Paris",
+            category=Category.objects.create(name="Geo"),
+            difficulty=Question.EASY,
+        )
+
+    def setUp(self):
+        clear_caches()
+
+    def test_not_modified_until_an_edit(self):
+        for url in ("/api/questions/", f"/api/questions/{self.question.pk}/"):
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                self.assertEqual(first.status_code, 200)
+                etag = first["ETag"]
+                self.assertIn(str(get_bank_version()), etag)
+
+                resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(resp.status_code, 304)
+                self.assertEqual(resp["ETag"], etag)
+
+                prompt = f"Capital of France? ({url})"
+                with self.captureOnCommitCallbacks(execute=True):
+                    resp = self.client.patch(
+                        f"/api/questions/{self.question.pk}/",
+                        {"prompt": prompt},
+                        content_type="application/json",
+                    )
+                self.assertEqual(resp.status_code, 200, resp.content)
+
+                resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(resp.status_code, 200)
+                self.assertNotEqual(resp["ETag"], etag)
+                self.assertIn(prompt, resp.content.decode())
+
+    @override_settings(QUIZ_BANK_VERSION_TTL=60)
+    def test_cached_reads_skip_the_database(self):
+        url = f"/api/questions/{self.question.pk}/"
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(0):
+            resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        with self.assertNumQueries(0):
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["ETag"], etag)
+
+    def test_stats_are_never_cached(self):
+        resp = self.client.get("/api/questions/?include=stats")
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn("ETag", resp)
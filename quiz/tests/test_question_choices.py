@@ -0,0 +1,132 @@
+"""Nested choice writes: diffed by id, a fixed number of statements."""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from quiz import search
+from quiz.models import BankChange, Choice, Question
+
+
+class ChoiceSyncTests(TestCase):
+    def create(self, choices):
+        resp = self.client.post(
+            "/api/questions/",
+            {
+                "prompt": "Pick the primes",
+                "qtype": Question.MULTI,
+                "difficulty": Question.EASY,
+                "choices": choices,
+            },
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 201, resp.content)
+        return resp.json()
+
+    def choice_writes(self, queries):
+        return [
+            q["sql"].split()[0]
+            for q in queries
+            if "quiz_choice" in q["sql"]
+            and q["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+        ]
+
+    def test_create_inserts_choices_at_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            question = self.create(
+                [{"text": str(n), "is_correct": n in (2, 3, 5)} for n in range(1, 7)]
+            )
+        self.assertEqual(self.choice_writes(queries), ["INSERT"])
+        self.assertEqual(len(question["choices"]), 6)
+
+    def test_put_diffs_by_id(self):
+        question = self.create(
+            [
+                {"text": "2", "is_correct": True},
+                {"text": "4", "is_correct": False},
+                {"text": "9", "is_correct": True},
+                {"text": "1", "is_correct": False},
+            ]
+        )
+        two, four, nine, one = question["choices"]
+        payload = dict(
+            question,
+            choices=[
+                two,  # unchanged
+                dict(nine, text="7"),  # edited
+                {"text": "11", "is_correct": True},  # added
+                one,  # unchanged; "4" is removed
+            ],
+        )
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.put(
+                f"/api/questions/{question['id']}/",
+                payload,
+                content_type="application/json",
+            )
+        self.assertEqual(resp.status_code, 200, resp.content)
+        self.assertEqual(
+            sorted(self.choice_writes(queries)), ["DELETE", "INSERT", "UPDATE"]
+        )
+
+        choices = {c["text"]: c for c in resp.json()["choices"]}
+        self.assertEqual(set(choices), {"2", "7", "11", "1"})
+        self.assertEqual(choices["2"]["id"], two["id"])
+        self.assertEqual(choices["7"]["id"], nine["id"])
+        self.assertFalse(Choice.objects.filter(pk=four["id"]).exists())
+
+        if search.available():
+            self.assertEqual(
+                search.ranked_ids(search.QUESTIONS, "11"), [question["id"]]
+            )
+            self.assertEqual(search.ranked_ids(search.QUESTIONS, "9"), [])
+
+    def test_one_bump_per_edit(self):
+        question = self.create(
+            [{"text": str(n), "is_correct": n == 2} for n in range(1, 5)]
+        )
+        bumps = BankChange.objects.count()
+        payload = dict(
+            question,
+            prompt="Pick the prime",
+            choices=[dict(question["choices"][1], text="two")],  # 3 deleted
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.put(
+                f"/api/questions/{question['id']}/",
+                payload,
+                content_type="application/json",
+            )
+        self.assertEqual(resp.status_code, 200, resp.content)
+        self.assertEqual(BankChange.objects.count(), bumps + 1)
+        self.assertEqual(
+            BankChange.objects.latest("version").question_ids, [question["id"]]
+        )
+
+        # the same payload again changes nothing: no writes, no bump
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with CaptureQueriesContext(connection) as queries:
+                resp = self.client.put(
+                    f"/api/questions/{question['id']}/",
+                    resp.json(),
+                    content_type="application/json",
+                )
+        self.assertEqual(resp.status_code, 200, resp.content)
+        self.assertEqual(callbacks, [])
+        self.assertFalse(
+            [q for q in queries if q["sql"].startswith(("INSERT", "UPDATE", "DELETE"))]
+        )
+        self.assertEqual(BankChange.objects.count(), bumps + 1)
+
+    def test_foreign_ids_become_new_choices(self):
+        other = self.create([{"text": "a", "is_correct": True}])
+        question = self.create([{"text": "b", "is_correct": True}])
+        stolen = other["choices"][0]["id"]
+        resp = self.client.patch(
+            f"/api/questions/{question['id']}/",
+            {"choices": [{"id": stolen, "text": "c", "is_correct": True}]},
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 200, resp.content)
+        self.assertNotEqual(resp.json()["choices"][0]["id"], stolen)
+        self.assertEqual(Choice.objects.get(pk=stolen).text, "a")
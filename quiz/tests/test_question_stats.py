@@ -0,0 +1,84 @@
+"""Per-question counters: maintained by start/submit, equal to a rebuild."""
+
+import io
+import uuid
+
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+
+from quiz.models import Question, QuestionStats
+from quiz.pool import question_pool
+
+from .utils import clear_caches, play
+
+
+class QuestionStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("seed_questions", stdout=io.StringIO())
+
+    def setUp(self):
+        clear_caches()
+        # bank bumps wait for a commit that never comes inside a TestCase
+        question_pool.refresh(force=True)
+
+    def play(self, submit: bool = True):
+        # the whole bank, so every question type is answered
+        count = Question.objects.count()
+        return play(self, str(uuid.uuid4()), submit=submit, count=count)
+
+    def snapshot(self):
+        return list(
+            QuestionStats.objects.order_by("pk").values_list(
+                "question_id",
+                "served",
+                "answered",
+                "correct",
+                "responses",
+                "response_chars",
+            )
+        )
+
+    def test_counters_match_rebuild(self):
+        played = self.play()
+        self.play()
+        self.play(submit=False)
+        self.assertGreater(played["score"], 0)
+
+        first = QuestionStats.objects.get(
+            pk=played["attempt_questions"][0]["question_id"]
+        )
+        self.assertGreaterEqual(first.served, first.answered)
+        self.assertGreaterEqual(first.served, 1)
+        n = Question.objects.count()
+        self.assertEqual(
+            sum(QuestionStats.objects.values_list("served", flat=True)), 3 * n
+        )
+        self.assertEqual(
+            sum(QuestionStats.objects.values_list("answered", flat=True)), 2 * n
+        )
+
+        totals = QuestionStats.objects.aggregate(
+            correct=Sum("correct"), response_chars=Sum("response_chars")
+        )
+        self.assertGreater(totals["correct"], 0)
+        self.assertGreater(totals["response_chars"], 0)
+
+        incremental = self.snapshot()
+        call_command("rebuild_question_stats", chunk_size=2, stdout=io.StringIO())
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_include_stats(self):
+        question = Question.objects.order_by("pk").first()
+        resp = self.client.get(f"/api/questions/{question.pk}/")
+        self.assertNotIn("stats", resp.json())
+
+        resp = self.client.get(f"/api/questions/{question.pk}/?include=stats")
+        self.assertEqual(resp.json()["stats"]["served"], 0)
+        self.assertIsNone(resp.json()["stats"]["correct_rate"])
+
+        QuestionStats.objects.create(question=question, served=4, answered=4, correct=3)
+        rows = self.client.get("/api/questions/", {"include": "stats"}).json()
+        stats = next(row["stats"] for row in rows if row["id"] == question.pk)
+        self.assertEqual(stats["correct_rate"], 0.75)
@@ -0,0 +1,194 @@
+"""Question pool: stratified draws, alias tables and incremental refresh."""
+
+import random
+import uuid
+from array import array
+from collections import Counter
+from unittest import mock
+
+from django.test import TestCase
+
+from quiz.models import Attempt, Category, Question
+from quiz.play import parse_strata
+from quiz.pool import AliasTable, QuestionPool, Stratum, question_pool
+
+from .utils import clear_caches
+
+
+class SamplerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.science = Category.objects.create(name="Science")
+        cls.history = Category.objects.create(name="History")
+        for category in (cls.science, cls.history):
+            for difficulty, n in ((Question.EASY, 4), (Question.MED, 3)):
+                for i in range(n):
+                    Question.objects.create(
+                        prompt=f"{category.name} {difficulty} {i}",
+                        qtype=Question.TEXT,
+                        category=category,
+                        difficulty=difficulty,
+                    )
+        Question.objects.create(
+            prompt="Hard science",
+            qtype=Question.NUM,
+            category=cls.science,
+            difficulty=Question.HARD,
+        )
+
+    def setUp(self):
+        clear_caches()
+        # bank bumps wait for a commit that never comes inside a TestCase
+        question_pool.refresh(force=True)
+
+    def start(self, **body):
+        body["player_uuid"] = str(uuid.uuid4())
+        return self.client.post(
+            "/api/play/start/", body, content_type="application/json"
+        )
+
+    def drawn(self, resp):
+        self.assertEqual(resp.status_code, 201, resp.content)
+        ids = [aq["question_id"] for aq in resp.json()["attempt_questions"]]
+        return list(Question.objects.filter(pk__in=ids)), ids
+
+    def test_difficulty_mix_from_category(self):
+        resp = self.start(
+            category=self.science.pk, difficulty={"easy": 2, "med": 2, "hard": 1}
+        )
+        questions, ids = self.drawn(resp)
+        self.assertEqual(len(set(ids)), 5)
+        self.assertEqual({q.category_id for q in questions}, {self.science.pk})
+        self.assertEqual(
+            Counter(q.difficulty for q in questions),
+            {Question.EASY: 2, Question.MED: 2, Question.HARD: 1},
+        )
+
+    def test_overlapping_strata_never_repeat(self):
+        # 7 science questions are text; every one must be drawn exactly once
+        for _ in range(5):
+            resp = self.start(
+                strata=[
+                    {"count": 4, "category": self.science.pk, "qtype": "text"},
+                    {"count": 3, "qtype": "text", "category": self.science.pk},
+                ]
+            )
+            questions, ids = self.drawn(resp)
+            self.assertEqual(len(set(ids)), 7)
+
+    def test_errors(self):
+        resp = self.start(difficulty={"hard": 3})
+        self.assertEqual(resp.json(), {"error": "Not enough questions in bank"})
+        for body in (
+            {"difficulty": "impossible"},
+            {"difficulty": {"easy": 0}},
+            {"count": 500},
+            {"strata": "easy"},
+            {"difficulty": {"easy": 1}, "qtype": {"text": 1}},
+        ):
+            resp = self.start(**body)
+            self.assertEqual(resp.status_code, 400, body)
+            self.assertIn("error", resp.json())
+
+    def test_stale_pool_never_shortens_attempts(self):
+        # deleted, but the bump waits for a commit: the pool still has it
+        Question.objects.filter(category=self.history).first().delete()
+        total = Question.objects.count()
+        resp = self.start(count=total + 1)
+        self.assertEqual(resp.json(), {"error": "Not enough questions in bank"})
+        self.assertFalse(Attempt.objects.exists())
+        questions, ids = self.drawn(self.start(count=total))
+        self.assertEqual(len(set(ids)), total)
+
+    def test_parse_defaults(self):
+        self.assertEqual(parse_strata({}), [Stratum(5)])
+        self.assertEqual(
+            parse_strata({"category": "3", "qtype": {"text": 2}}),
+            [Stratum(2, category=3, qtype="text")],
+        )
+
+
+class AliasTableTests(TestCase):
+    def test_probabilities_match_weights(self):
+        weights = [1.0, 3.0, 0.5, 5.5]
+        table = AliasTable([array("q", [i]) for i in range(4)], weights)
+        n = len(weights)
+        mass = [p / n for p in table.prob]
+        for i, p in enumerate(table.prob):
+            mass[table.alias[i]] += (1 - p) / n
+        for got, weight in zip(mass, weights):
+            self.assertAlmostEqual(got, weight / sum(weights))
+
+    def test_small_stratum_is_exhausted_exactly(self):
+        table = AliasTable([array("q", [1, 2]), array("q", [3])], [2, 1])
+        taken = {3}
+        self.assertEqual(sorted(table.sample(2, taken)), [1, 2])
+        with self.assertRaises(ValueError):
+            table.sample(1, taken)
+
+    def test_draws_are_uniform_over_questions(self):
+        random.seed(7)
+        table = AliasTable([array("q", range(10)), array("q", [10])], [10, 1])
+        counts = Counter(table.draw() for _ in range(11_000))
+        self.assertTrue(all(800 < counts[pk] < 1200 for pk in range(11)))
+
+
+class IncrementalRefreshTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.category = Category.objects.create(name="Geo")
+        self.question = Question.objects.create(
+            prompt="Longest river?",
+            qtype=Question.TEXT,
+            category=self.category,
+            difficulty=Question.EASY,
+        )
+        self.pool = QuestionPool()
+        self.pool.refresh(force=True)
+
+    def test_changed_questions_move_between_buckets(self):
+        other = Question.objects.create(
+            prompt="Highest peak?",
+            qtype=Question.TEXT,
+            category=self.category,
+            difficulty=Question.EASY,
+        )
+        self.pool.refresh(force=True)
+        # one alias table spans the moved question, one does not
+        self.pool.sample(1, qtype=Question.TEXT)
+        with self.assertRaises(ValueError):
+            self.pool.sample(1, qtype=Question.NUM)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.difficulty = Question.HARD
+            self.question.save()
+        with mock.patch.object(QuestionPool, "_load") as load:
+            self.pool.refresh()
+        load.assert_not_called()
+        self.assertEqual(list(self.pool._state.tables), [(None, None, Question.NUM)])
+        self.assertEqual(self.pool.count(difficulty=Question.EASY), 1)
+        self.assertEqual(
+            self.pool.sample(1, category=self.category.pk, difficulty=Question.EASY),
+            [other.pk],
+        )
+        self.assertEqual(
+            self.pool.sample(1, category=self.category.pk, difficulty=Question.HARD),
+            [self.question.pk],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.delete()
+        self.pool.refresh()
+        self.assertEqual(self.pool.count(category=self.category.pk), 1)
+        self.assertEqual(self.pool.count(difficulty=Question.HARD), 0)
+        self.assertEqual(
+            self.pool._index,
+            {other.pk: ((self.category.pk, Question.EASY, Question.TEXT), 0)},
+        )
+
+    def test_choice_edits_keep_the_pool(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.choices.create(text="Nile")
+        with mock.patch.object(QuestionPool, "_load") as load:
+            self.pool.refresh()
+        load.assert_not_called()
+        self.assertEqual(self.pool.count(), 1)
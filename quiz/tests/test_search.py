@@ -0,0 +1,129 @@
+"""Full-text index: kept in sync with the bank and answers, used by the
+admin search and by ``GET /api/questions/?q=``."""
+
+import importlib
+import io
+import uuid
+from types import SimpleNamespace
+from unittest import mock
+
+from django.apps import apps
+from django.contrib import admin
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase
+
+from quiz import search
+from quiz.grading import grade_attempt
+from quiz.models import Attempt, AttemptQuestion, Choice, Player, Question
+
+from .utils import clear_caches
+
+migration = importlib.import_module("quiz.migrations.0007_search_index")
+
+
+class SearchIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("seed_questions", stdout=io.StringIO())
+
+    def setUp(self):
+        if not search.available():
+            self.skipTest("no full-text support on this database")
+        clear_caches()
+
+    def ranked(self, text):
+        return search.ranked_ids(search.QUESTIONS, text)
+
+    def test_prompts_and_choices_are_indexed(self):
+        capital = Question.objects.get(prompt__startswith="What is the capital")
+        primary = Question.objects.get(prompt__startswith="Select the primary")
+        self.assertEqual(self.ranked("capital franc"), [capital.pk])
+        self.assertEqual(self.ranked("blue"), [primary.pk])
+        self.assertEqual(self.ranked("!!"), [])
+
+    def test_signals_follow_edits_and_deletes(self):
+        question = Question.objects.create(
+            prompt="Largest ocean?", qtype=Question.SINGLE, difficulty=Question.EASY
+        )
+        choice = Choice.objects.create(question=question, text="Pacific")
+        self.assertEqual(self.ranked("pacific"), [question.pk])
+        choice.text = "Atlantic"
+        choice.save()
+        self.assertEqual(self.ranked("pacific"), [])
+        question.delete()
+        self.assertEqual(self.ranked("ocean"), [])
+
+    def test_rebuild_command(self):
+        before = self.ranked("select")
+        search.drop_tables(search.connections["default"])
+        call_command("rebuild_search_index", stdout=io.StringIO())
+        self.assertEqual(self.ranked("select"), before)
+        self.assertTrue(before)
+
+    def test_migration_backfills_in_batches(self):
+        question = Question.objects.get(prompt__startswith="What is the capital")
+        aq = AttemptQuestion.objects.create(
+            attempt=Attempt.objects.create(player=Player.objects.create()),
+            question=question,
+            prompt=question.prompt,
+            qtype=question.qtype,
+            text_response="Marseille",
+        )
+        before = [self.ranked(term) for term in ("select", "capital", "blue")]
+        search.drop_tables(connection)
+        with mock.patch.object(migration, "BATCH_SIZE", 2):
+            migration.create_index(apps, SimpleNamespace(connection=connection))
+        search._available.clear()  # the tables came back behind its back
+        self.assertEqual(
+            [self.ranked(term) for term in ("select", "capital", "blue")], before
+        )
+        self.assertEqual(search.ranked_ids(search.ANSWERS, "marseille"), [aq.pk])
+
+    def test_api_search_is_ranked(self):
+        Question.objects.create(
+            prompt="Capital of Spain? Not the capital of France.",
+            qtype=Question.TEXT,
+            difficulty=Question.EASY,
+        )
+        resp = self.client.get("/api/questions/", {"q": "capital"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.json()), 2)
+        resp = self.client.get("/api/questions/", {"q": "capital", "limit": 1})
+        self.assertEqual(len(resp.json()), 1)
+
+    def test_submitted_text_answers_are_searchable(self):
+        question = Question.objects.get(prompt__startswith="What is the capital")
+        attempt = Attempt.objects.create(player=Player.objects.create())
+        aq = AttemptQuestion.objects.create(
+            attempt=attempt,
+            question=question,
+            prompt=question.prompt,
+            qtype=question.qtype,
+            text_response="Lyon",
+        )
+        aq.text_response = "Marseille"
+        aq.question = question
+        grade_attempt(attempt, [aq])
+        self.assertEqual(search.ranked_ids(search.ANSWERS, "marseille"), [aq.pk])
+        self.assertEqual(search.ranked_ids(search.ANSWERS, "lyon"), [])
+
+        model_admin = admin.site._registry[AttemptQuestion]
+        request = RequestFactory().get("/")
+        for term in ("marseille", "capital", str(attempt.pk)):
+            qs, _ = model_admin.get_search_results(
+                request, AttemptQuestion.objects.all(), term
+            )
+            self.assertEqual(list(qs), [aq], term)
+
+        attempt.delete()
+        self.assertEqual(search.ranked_ids(search.ANSWERS, "marseille"), [])
+
+    def test_player_uuid_unaffected(self):
+        # models without an index keep the LIKE search
+        player = Player.objects.create(player_uuid=uuid.uuid4())
+        model_admin = admin.site._registry[Player]
+        qs, _ = model_admin.get_search_results(
+            RequestFactory().get("/"), Player.objects.all(), str(player.player_uuid)
+        )
+        self.assertEqual(list(qs), [player])
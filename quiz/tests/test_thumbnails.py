@@ -0,0 +1,93 @@
+"""Admin thumbnails: built off the request path, dropped with their blob."""
+
+import io
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from quiz.admin import thumbnail_html
+from quiz.models import Attempt, AttemptQuestion, Category, ImageBlob, Player, Question
+from quiz.storage import answer_storage
+from quiz.thumbnails import (
+    THUMBNAIL_SIZE,
+    ThumbnailPool,
+    build_thumbnail,
+    thumbnail_name,
+)
+
+
+def stored_image(size, color="red", fmt="PNG") -> str:
+    out = io.BytesIO()
+    Image.new("RGB", size, color).save(out, fmt)
+    return answer_storage.save(
+        f"answers/image.{fmt.lower()}", ContentFile(out.getvalue())
+    )
+
+
+def thumbnail_size(name: str):
+    with Image.open(answer_storage.open(thumbnail_name(name))) as img:
+        return img.format, img.size
+
+
+class ThumbnailTests(TestCase):
+    def setUp(self):
+        media = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        self.pool = ThumbnailPool(workers=1)
+
+    def test_rendered_within_the_fixed_size(self):
+        square = stored_image((1200, 1200))
+        wide = stored_image((1200, 300), "blue", "JPEG")
+        self.assertTrue(build_thumbnail(square))
+        self.assertFalse(build_thumbnail(square))  # already there
+        self.assertEqual(thumbnail_size(square), ("JPEG", THUMBNAIL_SIZE))
+        build_thumbnail(wide)
+        self.assertEqual(
+            thumbnail_size(wide), ("JPEG", (THUMBNAIL_SIZE[0], THUMBNAIL_SIZE[0] // 4))
+        )
+
+    def test_url_is_none_until_built(self):
+        name = stored_image((400, 400))
+        self.assertIsNone(self.pool.url(name))  # queues the build
+        self.pool.drain()
+        self.assertEqual(self.pool.url(name), answer_storage.url(thumbnail_name(name)))
+
+    def test_admin_shows_a_placeholder_meanwhile(self):
+        aq = AttemptQuestion(
+            image=stored_image((400, 400)), image_status=AttemptQuestion.IMAGE_PENDING
+        )
+        placeholder = static("quiz/thumb-placeholder.svg")
+        self.assertIn(placeholder, thumbnail_html(aq, ""))
+
+    def test_command_builds_missing_thumbnails(self):
+        question = Question.objects.create(
+            prompt="Draw a cat",
+            qtype=Question.IMAGE,
+            category=Category.objects.create(name="Art"),
+        )
+        attempt = Attempt.objects.create(player=Player.objects.create())
+        names = [stored_image((300, 200)), stored_image((200, 300), "green")]
+        for name in names:
+            AttemptQuestion.objects.create(
+                attempt=attempt, question=question, prompt="", qtype="image", image=name
+            )
+        build_thumbnail(names[0])
+
+        out = io.StringIO()
+        call_command("build_thumbnails", workers=1, stdout=out)
+        self.assertIn("1 built, 1 already present, 0 failed", out.getvalue())
+        for name in names:
+            self.assertTrue(answer_storage.exists(thumbnail_name(name)))
+
+    def test_discarded_with_its_blob(self):
+        name = stored_image((400, 400))
+        ImageBlob.objects.retain([name])
+        build_thumbnail(name)
+        with self.captureOnCommitCallbacks(execute=True):
+            ImageBlob.objects.release([name])
+        self.assertFalse(answer_storage.exists(name))
+        self.assertFalse(answer_storage.exists(thumbnail_name(name)))
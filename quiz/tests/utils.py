@@ -0,0 +1,59 @@
+"""Helpers shared by the API tests."""
+
+import json
+
+from django.core.cache import caches
+
+from quiz.cache import attempt_cache, question_cache
+from quiz.models import Question
+from quiz.versioning import forget_bank_version
+
+
+def clear_caches() -> None:
+    """Forget cached payloads: they are per-process and outlive each test's
+    rollback, which hands the same primary keys and bank version out again."""
+    for payloads in (question_cache, attempt_cache):
+        payloads.local.clear()
+    caches["default"].clear()
+    forget_bank_version()
+
+
+def answer_for(aq: dict, question: Question, correct: bool) -> dict:
+    """An answer payload for one attempt question, right or wrong."""
+    if question.qtype == Question.TEXT:
+        return {"text_response": question.text_answer if correct else "nope"}
+    if question.qtype == Question.NUM:
+        return {"numeric_response": question.numeric_answer + (0 if correct else 1)}
+    if question.qtype in (Question.SINGLE, Question.MULTI):
+        ids = [c["id"] for c in aq["choices"] if c["is_correct"] == correct]
+        return {"selected_choice_ids": ids[:1] if not correct else ids}
+    return {}  # image questions need an upload
+
+
+def play(test, player_uuid: str, correct: bool = True, submit: bool = True, **start):
+    """Start an attempt through the API and submit it; returns the JSON of
+    the last response (the started attempt when ``submit`` is False).
+    ``start`` adds fields to the start body (``count``, ``difficulty``...)."""
+    resp = test.client.post(
+        "/api/play/start/",
+        {"player_uuid": player_uuid, **start},
+        content_type="application/json",
+    )
+    test.assertEqual(resp.status_code, 201, resp.content)
+    attempt = resp.json()
+    if not submit:
+        return attempt
+    questions = Question.objects.in_bulk(
+        [aq["question_id"] for aq in attempt["attempt_questions"]]
+    )
+    answers = {
+        str(aq["id"]): answer_for(aq, questions[aq["question_id"]], correct)
+        for aq in attempt["attempt_questions"]
+    }
+    # the form field the SPA and bench_play send
+    resp = test.client.post(
+        f"/api/play/submit/{attempt['id']}/",
+        {"answers": json.dumps({"answers": answers})},
+    )
+    test.assertEqual(resp.status_code, 200, resp.content)
+    return resp.json()
@@ -0,0 +1,117 @@
+# quiz/thumbnails.py
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Iterable, Optional
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+from .cache import LRUCache
+from .storage import answer_storage
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = tuple(getattr(settings, "QUIZ_THUMBNAIL_SIZE", (160, 160)))
+THUMBNAIL_SUFFIX = f".thumb{THUMBNAIL_SIZE[0]}x{THUMBNAIL_SIZE[1]}.jpg"
+
+
+def thumbnail_name(name: str) -> str:
+    """Where the thumbnail of a stored image lives: next to the original."""
+    return os.path.splitext(name)[0] + THUMBNAIL_SUFFIX
+
+
+def render_thumbnail(fh, size=THUMBNAIL_SIZE) -> bytes:
+    """Fit an image inside ``size`` and encode it as JPEG."""
+    with Image.open(fh) as img:
+        img.draft("RGB", size)  # JPEG: let the decoder downscale for free
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail(size)
+        if img.mode != "RGB":
+            background = Image.new("RGB", img.size, "white")
+            background.paste(img, mask=img.getchannel("A") if "A" in img.mode else None)
+            img = background
+        out = io.BytesIO()
+        img.save(out, "JPEG", quality=80, optimize=True)
+        return out.getvalue()
+
+
+def build_thumbnail(name: str, force: bool = False) -> bool:
+    """Render one thumbnail; False if it already existed."""
+    target = thumbnail_name(name)
+    if not force and answer_storage.exists(target):
+        return False
+    with answer_storage.open(name, "rb") as fh:
+        answer_storage.put(target, render_thumbnail(fh))
+    return True
+
+
+class ThumbnailPool:
+    """Builds thumbnails on background threads (Pillow releases the GIL).
+
+    ``url()`` is what request code calls: it returns the thumbnail's URL when
+    it exists and otherwise queues a build and returns None.
+    """
+
+    def __init__(self, workers: int = 2):
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = {}  # name -> Future
+        self._ready = LRUCache(10_000)  # names known to have a thumbnail
+        self._failed = LRUCache(1_000)  # unreadable images, not retried
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # created on first use, i.e. after a pre-forking server has forked
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self.workers, thread_name_prefix="thumbnails"
+            )
+        return self._executor
+
+    def schedule(self, names: Iterable[str]) -> None:
+        with self._lock:
+            for name in names:
+                if (
+                    name
+                    and name not in self._pending
+                    and self._ready.get(name) is None
+                    and self._failed.get(name) is None
+                ):
+                    future = self._pool().submit(self._build, name)
+                    self._pending[name] = future
+
+    def _build(self, name: str) -> None:
+        try:
+            build_thumbnail(name)
+            self._ready.put(name, True)
+        except Exception:
+            logger.warning("Could not build thumbnail for %s", name, exc_info=True)
+            self._failed.put(name, True)
+        finally:
+            with self._lock:
+                self._pending.pop(name, None)
+
+    def url(self, name: str) -> Optional[str]:
+        if self._ready.get(name) is None:
+            if not answer_storage.exists(thumbnail_name(name)):
+                self.schedule([name])
+                return None
+            self._ready.put(name, True)
+        return answer_storage.url(thumbnail_name(name))
+
+    def discard(self, name: str) -> None:
+        """Delete the thumbnail of an image that is going away."""
+        self._ready.delete(name)
+        answer_storage.delete(thumbnail_name(name))
+
+    def drain(self, timeout: Optional[float] = None) -> None:
+        """Wait for queued builds (commands, tests)."""
+        with self._lock:
+            futures = list(self._pending.values())
+        wait(futures, timeout=timeout)
+
+
+thumbnails = ThumbnailPool(workers=getattr(settings, "QUIZ_THUMBNAIL_WORKERS", 2))
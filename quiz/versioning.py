@@ -0,0 +1,167 @@
+# quiz/versioning.py
+import threading
+import time
+from typing import Iterable, Optional, Set
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+
+from .models import BankChange
+
+# bumps kept for incremental catch-up; a process further behind rebuilds
+MAX_CHANGE_VERSIONS = 100
+# pg_advisory_xact_lock key serializing bumps ("quiz")
+BUMP_LOCK = 0x7175697A
+
+
+def _clock() -> int:
+    # Versions follow the clock (in µs) so one rolled back or restored
+    # with the database is never reused for different content.
+    return time.time_ns() // 1000
+
+
+# The last version this process read or bumped, and until when (monotonic
+# clock) it is trusted: hot reads (ETags, pool checks) skip the database,
+# and bumps made by other processes show up within QUIZ_BANK_VERSION_TTL.
+_memo = (0, 0.0)
+_memo_lock = threading.Lock()
+
+
+def _remember(version: int) -> int:
+    global _memo
+    now = time.monotonic()
+    with _memo_lock:
+        known, expires = _memo
+        if now < expires:
+            version = max(version, known)  # a slower read never goes back
+        _memo = (version, now + getattr(settings, "QUIZ_BANK_VERSION_TTL", 1.0))
+    return version
+
+
+def forget_bank_version() -> None:
+    """Drop the remembered version, so the next read asks the database."""
+    global _memo
+    with _memo_lock:
+        _memo = (0, 0.0)
+
+
+def _latest():
+    return BankChange.objects.order_by("-version").values_list("version", flat=True)
+
+
+def get_bank_version() -> int:
+    """Current question-bank version (0 before the first bump)."""
+    version, expires = _memo
+    if time.monotonic() < expires:
+        return version
+    return _remember(_latest().first() or 0)
+
+
+async def aget_bank_version() -> int:
+    version, expires = _memo
+    if time.monotonic() < expires:
+        return version
+    return _remember(await _latest().afirst() or 0)
+
+
+def _lock_bumps() -> None:
+    """Hold the bump lock until the transaction ends.
+
+    A version is picked before its row commits; unless bumps are
+    serialized, a smaller one could commit after a reader saw a larger
+    one, and readers would never catch up on its changes. SQLite is
+    covered by ``transaction_mode: IMMEDIATE`` (one writer at a time);
+    PostgreSQL takes a transaction-scoped advisory lock. Other backends
+    are not supported.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [BUMP_LOCK])
+
+
+def bump_bank_version(question_ids: Optional[Iterable[int]] = None) -> int:
+    """Invalidate everything derived from the question bank.
+
+    ``question_ids`` lists the questions whose category, difficulty or
+    type may have changed (or that were added or deleted); pass an empty
+    list when none did. Without it, readers assume the whole bank moved.
+    """
+    ids = None if question_ids is None else sorted(set(question_ids))
+    while True:
+        try:
+            with transaction.atomic():
+                _lock_bumps()
+                version = max((_latest().first() or 0) + 1, _clock())
+                BankChange.objects.create(version=version, question_ids=ids)
+                # readers in this process see the bump at once
+                transaction.on_commit(lambda: _remember(version))
+            break
+        except IntegrityError:
+            continue  # another process took this version
+    kept = BankChange.objects.order_by("-version").values_list("version", flat=True)
+    oldest = kept[MAX_CHANGE_VERSIONS:][:1]
+    if oldest:
+        BankChange.objects.filter(version__lte=oldest[0]).delete()
+    return version
+
+
+class _PendingBump:
+    """The bump a transaction owes: the first of its on_commit callbacks
+    to run bumps with every ``question_ids`` merged, the others no-op."""
+
+    def __init__(self):
+        self.question_ids: Optional[Set[int]] = set()
+        self.done = False
+
+    def add(self, question_ids: Optional[Iterable[int]]) -> None:
+        if question_ids is None:
+            self.question_ids = None  # the whole bank
+        elif self.question_ids is not None:
+            self.question_ids.update(question_ids)
+
+    def __call__(self) -> None:
+        if not self.done:
+            self.done = True
+            bump_bank_version(self.question_ids)
+
+
+def bump_on_commit(question_ids: Optional[Iterable[int]] = None) -> None:
+    """Bump the bank version once the current transaction commits.
+
+    Every write asking for a bump within one transaction (a question
+    save, each choice deleted, the choice sync) shares a single bump, with
+    their ``question_ids`` merged. Outside a transaction it bumps at once.
+    """
+    conn = transaction.get_connection()
+    pending = getattr(conn, "_quiz_pending_bump", None)
+    if (
+        pending is None
+        or pending.done
+        or not any(func is pending for _, func, _ in conn.run_on_commit)
+    ):
+        pending = conn._quiz_pending_bump = _PendingBump()
+    pending.add(question_ids)
+    # one callback per request, so a rolled back savepoint never takes
+    # the bump of the writes around it along
+    transaction.on_commit(pending)
+
+
+def bank_changes(since: int, until: int) -> Optional[Set[int]]:
+    """Questions changed by the bumps after ``since`` up to ``until``.
+
+    None when any of those bumps left no record (bulk writes, or ``since``
+    already pruned or never recorded): the caller must rebuild from scratch.
+    """
+    if since > until:
+        return None
+    rows = list(
+        BankChange.objects.filter(version__gte=since, version__lte=until)
+        .order_by("version")
+        .values_list("version", "question_ids")[: MAX_CHANGE_VERSIONS + 2]
+    )
+    if not rows or rows[0][0] != since or len(rows) > MAX_CHANGE_VERSIONS + 1:
+        return None
+    changes = [ids for _, ids in rows[1:]]
+    if any(ids is None for ids in changes):
+        return None
+    return set().union(*changes)
@@ -1,61 +1,63 @@
 # quiz/views.py
-import json
-import random
-import unicodedata
-from difflib import SequenceMatcher
-from math import isclose
+from urllib.parse import urlencode
 
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, Q, When
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, status, viewsets
+from rest_framework.authentication import SessionAuthentication
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Attempt, AttemptQuestion, Player, Question
-from .serializers import AttemptSerializer, QuestionSerializer
+from . import leaderboard, search, stats
+from .cache import attempt_cache, attempt_key, etag_matches, question_cache
+from .grading import grade_attempt, is_expired
+from .matching import text_matcher
+from .middleware import view_stats
+from .models import Attempt, AttemptQuestion, Category, Player, Question
+from .pagination import AttemptCursorPagination
+from .play import (
+    IMMUTABLE,
+    apply_answer,
+    closed_attempt_error,
+    discard_answer_image,
+    draw_questions,
+    is_frozen,
+    new_attempt_questions,
+    parse_answers,
+    parse_strata,
+    prime_attempt_questions,
+    store_answer_image,
+    submitted_entry,
+    upsert_player,
+    with_attempt_questions,
+)
+from .serializers import (
+    AttemptSerializer,
+    AttemptSummarySerializer,
+    CategoryStatsSerializer,
+    PlayerStatsSerializer,
+    QuestionSerializer,
+)
+from .versioning import get_bank_version
 
 # --- Helpers ------------------------------------------------------------
 
 
-def norm_text(s: str) -> str:
-    s = unicodedata.normalize("NFKC", s.strip().lower())
-    return " ".join(s.split())
+def _closed_attempt_response(attempt: Attempt) -> Response:
+    body, code = closed_attempt_error(attempt)
+    return Response(body, status=code)
 
 
-def fuzzy_equal(a: str, b: str, threshold: float = 0.85) -> bool:
-    return SequenceMatcher(None, norm_text(a), norm_text(b)).ratio() >= threshold
-
-
-def grade_attempt_question(aq: AttemptQuestion, q: Question) -> None:
-    """Grade one AttemptQuestion in place."""
-    if aq.qtype == Question.SINGLE:
-        correct_ids = list(
-            q.choices.filter(is_correct=True).values_list("id", flat=True)
-        )
-        aq.is_correct = set(aq.selected_choice_ids) == set(correct_ids)
-        aq.correct_choice_ids = correct_ids
-
-    elif aq.qtype == Question.MULTI:
-        correct_ids = list(
-            q.choices.filter(is_correct=True).values_list("id", flat=True)
-        )
-        aq.is_correct = set(aq.selected_choice_ids) == set(correct_ids)
-        aq.correct_choice_ids = correct_ids
-
-    elif aq.qtype == Question.NUM:
-        if aq.numeric_response is not None and q.numeric_answer is not None:
-            aq.is_correct = isclose(
-                aq.numeric_response, q.numeric_answer, rel_tol=0, abs_tol=1e-6
-            )
-
-    elif aq.qtype == Question.TEXT:
-        if aq.text_response and q.text_answer:
-            aq.is_correct = fuzzy_equal(aq.text_response, q.text_answer)
-
-    elif aq.qtype == Question.IMAGE:
-        aq.is_correct = bool(aq.image) and (not q.image_required or aq.image.size > 0)
-
-    aq.save()
+def _cache_submitted_attempt(attempt: Attempt, data) -> tuple:
+    """Freeze a submitted attempt's payload; returns the (etag, data) entry."""
+    entry = submitted_entry(attempt, data)
+    attempt_cache.set(attempt_key(attempt.pk), entry)
+    return entry
 
 
 # --- Views --------------------------------------------------------------
@@ -64,6 +66,66 @@ def grade_attempt_question(aq: AttemptQuestion, q: Question) -> None:
 class QuestionViewSet(viewsets.ModelViewSet):
     queryset = Question.objects.all().prefetch_related("choices")
     serializer_class = QuestionSerializer
+    search_limit = 50
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.include_stats():
+            qs = qs.select_related("stats")
+        term = self.request.query_params.get("q", "").strip()
+        if self.action != "list" or not term:
+            return qs
+        try:
+            limit = int(self.request.query_params["limit"])
+        except (KeyError, ValueError):
+            limit = self.search_limit
+        limit = max(1, min(limit, search.MAX_RESULTS))
+
+        ids = search.ranked_ids(search.QUESTIONS, term, limit)
+        if ids is None:
+            # no full-text index on this database: unranked LIKE search
+            matches = Question.objects.filter(
+                Q(prompt__icontains=term) | Q(choices__text__icontains=term)
+            ).values("pk")
+            return qs.filter(pk__in=matches).order_by("pk")[:limit]
+        if not ids:
+            return qs.none()
+        rank = Case(*(When(pk=pk, then=i) for i, pk in enumerate(ids)))
+        return qs.filter(pk__in=ids).order_by(rank)
+
+    def include_stats(self) -> bool:
+        include = self.request.query_params.get("include", "")
+        return "stats" in include.split(",")
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["include_stats"] = self.include_stats()
+        return context
+
+    def _cached(self, request, name, render):
+        """Serve a GET from the versioned payload cache, or a bare 304."""
+        if self.include_stats():
+            # live counters: they change with every play, not with the bank
+            return render()
+        version = get_bank_version()
+        etag = f'"questions-{name}-{version}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        query = urlencode(sorted(request.GET.lists()), doseq=True)
+        key = f"quiz:questions:{version}:{name}:{query}"
+        data = question_cache.get_or_set(key, lambda: render().data)
+        return Response(data, headers=headers)
+
+    def list(self, request, *args, **kwargs):
+        render = super().list
+        return self._cached(request, "list", lambda: render(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        render = super().retrieve
+        return self._cached(
+            request, kwargs["pk"], lambda: render(request, *args, **kwargs)
+        )
 
 
 class PlayStartView(APIView):
@@ -74,144 +136,200 @@ class PlayStartView(APIView):
         if not player_uuid:
             return Response({"error": "player_uuid is required"}, status=400)
 
-        player, _ = Player.objects.get_or_create(player_uuid=player_uuid)
+        try:
+            strata = parse_strata(request.data)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
 
-        # Pick 5 random questions
-        questions = list(Question.objects.all())
-        if len(questions) < 5:
+        # Draw the requested mix (5 random questions by default): one query
+        # for the questions, one for all of their choices
+        try:
+            selected = draw_questions(strata)
+        except ValueError:
             return Response({"error": "Not enough questions in bank"}, status=400)
-        selected = random.sample(questions, 5)
-
-        attempt = Attempt.objects.create(player=player, total=len(selected))
-        for q in selected:
-            aq = AttemptQuestion.objects.create(
-                attempt=attempt,
-                question=q,
-                prompt=q.prompt,
-                qtype=q.qtype,
-                correct_choice_ids=list(
-                    q.choices.filter(is_correct=True).values_list("id", flat=True)
-                ),
+
+        with transaction.atomic():
+            player = upsert_player(player_uuid)
+            attempt = Attempt.objects.create(player=player, total=len(selected))
+            aqs = AttemptQuestion.objects.bulk_create(
+                new_attempt_questions(attempt, selected)
             )
-            aq.save()
+            stats.record_served(q.pk for q in selected)
 
+        prime_attempt_questions(attempt, aqs)
         return Response(AttemptSerializer(attempt).data, status=201)
 
 
-def _coerce_to_dict(value):
-    # already a mapping (e.g., parsed JSON from application/json)
-    if isinstance(value, dict):
-        return value
-    # JSON string
-    if isinstance(value, str):
-        return json.loads(value or "{}")
-    # Uploaded file (e.g., answers.json)
-    if hasattr(value, "read"):
-        raw = value.read()
-        if isinstance(raw, bytes):
-            raw = raw.decode("utf-8", errors="strict")
-        return json.loads(raw or "{}")
-    # Fallback
-    return {}
-
-
 class PlaySubmitView(APIView):
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
     def _parse_answers(self, request):
-        """
-        Accepts:
-          - multipart/form-data with 'answers' as a text field (JSON string)
-          - multipart/form-data with 'answers' as a file part
-          - application/json body: either {"answers": {...}} or just {...}
-        Returns a dict mapping attemptQuestionId -> answer dict.
-        """
-        # 1) Try JSON body directly
-        data = request.data
-        # When JSON body: request.data is already a dict
-        if isinstance(data, dict) and data:
-            raw = data.get("answers", data)
-            if isinstance(raw, dict):
-                return raw
-
-        # 2) Try text field in multipart/form-data
-        raw_field = request.data.get("answers")
-        if isinstance(raw_field, (str, bytes)):
-            try:
-                return json.loads(raw_field)
-            except Exception:
-                pass
-
-        # 3) Try file part in multipart/form-data
-        f = request.FILES.get("answers")
-        if f:
-            try:
-                content = f.read()
-                return json.loads(content.decode("utf-8"))
-            except Exception:
-                pass
-
-        # Nothing usable
-        return {}
+        return parse_answers(request.data, request.FILES)
 
     def post(self, request, attempt_id, *args, **kwargs):
-        attempt = get_object_or_404(Attempt, id=attempt_id)
+        attempt = get_object_or_404(
+            Attempt.objects.select_related("player"), id=attempt_id
+        )
+        if attempt.status == Attempt.STARTED and is_expired(attempt):
+            Attempt.objects.filter(pk=attempt.pk, status=Attempt.STARTED).update(
+                status=Attempt.EXPIRED
+            )
+            attempt.status = Attempt.EXPIRED
+        if attempt.status != Attempt.STARTED:
+            return _closed_attempt_response(attempt)
+
         answers = self._parse_answers(request) or {}
         answers = answers.get("answers", {})
 
-        # Accept either {"123": {...}} or {"answers": {...}}
-        # (already normalized in _parse_answers)
-        for aq in attempt.attempt_questions.all():
-            # keys might be numeric or string
-            payload = answers.get(str(aq.id)) or answers.get(aq.id) or {}
-
-            # text
-            aq.text_response = payload.get("text_response")
-
-            # numeric (string -> float)
-            nr = payload.get("numeric_response", None)
-            if isinstance(nr, str):
-                nr = nr.strip()
-                nr = float(nr) if nr else None
-            if isinstance(nr, int):
-                nr = float(nr) if nr else None
-            aq.numeric_response = nr
+        # single image for the whole submission (optional), stored once
+        image_name = None
+        if "image" in request.FILES:
+            image_name = store_answer_image(request.FILES["image"])
+
+        try:
+            # the question carries the answer key; choices come from the snapshot
+            aqs = list(attempt.attempt_questions.select_related("question"))
+            # Accept either {"123": {...}} or {"answers": {...}}
+            # (already normalized in _parse_answers)
+            for aq in aqs:
+                # keys might be numeric or string
+                payload = answers.get(str(aq.id)) or answers.get(aq.id) or {}
+                apply_answer(aq, payload, image_name)
+
+            # grade in memory, then claim the submit and bulk_update the rows
+            claimed = grade_attempt(attempt, aqs)
+        except BaseException:
+            discard_answer_image(image_name)
+            raise
+        if not claimed:
+            # lost a race with another submit of the same attempt
+            discard_answer_image(image_name)
+            attempt.refresh_from_db(fields=["status"])
+            return _closed_attempt_response(attempt)
+
+        prime_attempt_questions(attempt, aqs)
+        data = AttemptSerializer(attempt).data
+        if is_frozen(attempt):
+            _cache_submitted_attempt(attempt, data)
+        return Response(data, status=status.HTTP_200_OK)
 
-            # multiple/single choices (-> list[int])
-            sel = payload.get("selected_choice_ids", [])
-            try:
-                sel = [int(x) for x in sel]
-            except Exception:
-                sel = []
-            aq.selected_choice_ids = sel
 
-            # single image for the whole submission (optional)
-            if "image" in request.FILES:
-                aq.image = request.FILES["image"]
-
-            aq.save()
-            grade_attempt_question(aq, aq.question)
-
-        # finalize score (and status if you added it)
-        attempt.score = sum(1 for x in attempt.attempt_questions.all() if x.is_correct)
-        # attempt.status = Attempt.SUBMITTED  # if using statuses
-        attempt.save()
+class AttemptsView(generics.ListAPIView):
+    """Attempts for a player; ``?view=summary`` drops the nested questions."""
 
-        return Response(AttemptSerializer(attempt).data, status=status.HTTP_200_OK)
+    pagination_class = AttemptCursorPagination
 
+    def is_summary(self) -> bool:
+        return self.request.query_params.get("view") == "summary"
 
-class AttemptsView(generics.ListAPIView):
-    serializer_class = AttemptSerializer
+    def get_serializer_class(self):
+        return AttemptSummarySerializer if self.is_summary() else AttemptSerializer
 
     def get_queryset(self):
         player_uuid = self.request.query_params.get("player_uuid")
         if not player_uuid:
             return Attempt.objects.none()
-        return Attempt.objects.filter(player__player_uuid=player_uuid).order_by(
-            "-created_at"
-        )
+        # resolve the player through the unique player_uuid index first,
+        # then page over the (player, created_at, id) index without a join
+        try:
+            player_id = Player.objects.values_list("id", flat=True).get(
+                player_uuid=player_uuid
+            )
+        except (Player.DoesNotExist, ValidationError):
+            return Attempt.objects.none()
+        qs = Attempt.objects.filter(player_id=player_id)
+        if self.is_summary():
+            return qs.only("id", "created_at", "score", "total")
+        return with_attempt_questions(qs)
 
 
 class AttemptDetailView(generics.RetrieveAPIView):
-    queryset = Attempt.objects.all()
+    """Attempt review; submitted attempts are served from a frozen payload."""
+
+    queryset = with_attempt_questions(Attempt.objects.all())
     serializer_class = AttemptSerializer
+
+    def retrieve(self, request, *args, **kwargs):
+        entry = attempt_cache.get(attempt_key(kwargs["pk"]))
+        if entry is None:
+            attempt = self.get_object()
+            data = self.get_serializer(attempt).data
+            if not is_frozen(attempt):
+                return Response(data)
+            entry = _cache_submitted_attempt(attempt, data)
+
+        etag, data = entry
+        headers = {"ETag": etag, "Cache-Control": IMMUTABLE}
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(data, headers=headers)
+
+
+def _leaderboard_category(request):
+    """``?category=`` as (id, error response); (None, None) for the global board."""
+    raw = request.query_params.get("category")
+    if not raw:
+        return None, None
+    try:
+        category_id = int(raw)
+    except ValueError:
+        return None, Response({"error": "category must be an id"}, status=400)
+    if not Category.objects.filter(pk=category_id).exists():
+        return None, Response({"error": "Category not found"}, status=404)
+    return category_id, None
+
+
+def _leaderboard_serializer(category_id):
+    return PlayerStatsSerializer if category_id is None else CategoryStatsSerializer
+
+
+class LeaderboardView(APIView):
+    """Top players overall, or by correct answers with ``?category=<id>``."""
+
+    default_limit = 10
+
+    def get(self, request, *args, **kwargs):
+        category_id, error = _leaderboard_category(request)
+        if error:
+            return error
+        try:
+            limit = int(request.query_params["limit"])
+        except (KeyError, ValueError):
+            limit = self.default_limit
+        limit = max(1, min(limit, leaderboard.MAX_LIMIT))
+        rows = leaderboard.top(limit, category_id)
+        return Response(_leaderboard_serializer(category_id)(rows, many=True).data)
+
+
+class PlayerRankView(APIView):
+    """A player's leaderboard entry and rank (``?category=<id>`` optional)."""
+
+    def get(self, request, player_uuid, *args, **kwargs):
+        category_id, error = _leaderboard_category(request)
+        if error:
+            return error
+        player = Player.objects.filter(player_uuid=player_uuid).first()
+        row = leaderboard.rank_of(player, category_id) if player else None
+        if row is None:
+            return Response({"error": "No submitted attempts yet"}, status=404)
+        return Response(_leaderboard_serializer(category_id)(row).data)
+
+
+class ProfilingStatsView(APIView):
+    """Rolling per-view request timings collected by ProfilingMiddleware."""
+
+    authentication_classes = [SessionAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(
+            {
+                "enabled": getattr(settings, "QUIZ_PROFILING", False),
+                "views": view_stats.snapshot(),
+                "text_matcher": text_matcher.stats(),
+            }
+        )
+
+    def delete(self, request, *args, **kwargs):
+        view_stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)